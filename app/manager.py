@@ -3,9 +3,13 @@
 # Import the necessary modules
 import tkinter as tk
 import logging
+import threading
+import time
 
 # Import the necessary classes
-from database.database_manager import DatabaseManager
+# (DatabaseManager, and with it SQLAlchemy, is imported by the db_manager property
+# or the warm-up thread, after the window is shown)
+from database import warmup
 from .views.base import MainView
 from .views.sidebar import Sidebar
 from .views.popups.connect_db import Connector
@@ -16,7 +20,32 @@ class AppManager(tk.Tk):
     Args:
         tk (_type_): _description_
     """
-    def __init__(self, *args, **kwargs):
+    # seconds after which a statement goes to logs/slow_queries.log
+    SLOW_QUERY_THRESHOLD = 1.0
+    # milliseconds between exports of logs/metrics.json
+    METRICS_INTERVAL = 30000
+    # bytes of SELECT results kept for repeated queries (0: off until turned on with
+    # "Cache SELECT results" in the query editor's menu)
+    RESULT_CACHE_SIZE = 0
+    # seconds a cached result is served before the query runs again
+    RESULT_CACHE_TTL = 60.0
+    # schema snapshots per connection, read on reconnect (None turns them off)
+    SCHEMA_SNAPSHOT_DIR = 'cache/schemas'
+    # milliseconds after the first paint before the heavy modules are preloaded
+    WARMUP_DELAY = 50
+    # views preloaded along with the database modules (the first query tab needs them)
+    WARMUP_MODULES = ("app.views.querytxt", "app.views.result_grid")
+
+    def __init__(self, *args, started: float = None, **kwargs):
+        """_summary_
+
+        Args:
+            started (float, optional): time.perf_counter() when the program started,
+                                       to measure the time to the first window. Defaults to now.
+        """
+        self.started = started if started is not None else time.perf_counter()
+        # seconds from start to each startup milestone (see startup_timings)
+        self.startup_timings = {"import": time.perf_counter() - self.started}
         tk.Tk.__init__(self, *args, **kwargs)
         # -------------------------------- window attr ------------------------------- #
         self.wm_title("Py-Db")
@@ -24,12 +53,14 @@ class AppManager(tk.Tk):
         self.geometry(f"{self.winfo_screenwidth()}x{self.winfo_screenheight()}+0+0")
 
         # --------------------------- initiating essentials -------------------------- #
-        self.db_manager = DatabaseManager()
+        # created on first use (see db_manager)
+        self._db_manager = None
+        self._db_manager_lock = threading.Lock()
 
         # ------------------------------- extra classes ------------------------------ #
         self.sidebar = Sidebar(self)
         self.sidebar.pack(side="left", fill="y")
-        self.main_view = MainView(self, self.db_manager)
+        self.main_view = MainView(self)
         self.main_view.pack(fill="both", expand=True)
 
         # open database view (overlay)
@@ -38,6 +69,57 @@ class AppManager(tk.Tk):
         # --------------------------------- logging ---------------------------------- #
         logging.basicConfig(filename='logs/database_manager.log', level=logging.INFO,
                             format='%(asctime)s - %(levelname)s - %(message)s')
+        # metrics snapshot readable without the GUI (e.g. by a monitoring script)
+        self.after(self.METRICS_INTERVAL, self.export_metrics)
+
+        # ---------------------------------- startup --------------------------------- #
+        self.startup_timings["window"] = time.perf_counter() - self.started
+        self.bind("<Map>", self._on_first_map, add="+")
+
+    @property
+    def db_manager(self):
+        """_summary_ : the DatabaseManager, created (and SQLAlchemy imported) on first use
+        """
+        if self._db_manager is None:
+            with self._db_manager_lock:
+                if self._db_manager is None:
+                    from database.database_manager import DatabaseManager
+                    self._db_manager = DatabaseManager(slow_query_threshold=self.SLOW_QUERY_THRESHOLD,
+                                                       slow_log_path='logs/slow_queries.log',
+                                                       result_cache_size=self.RESULT_CACHE_SIZE,
+                                                       result_cache_ttl=self.RESULT_CACHE_TTL,
+                                                       snapshot_dir=self.SCHEMA_SNAPSHOT_DIR)
+        return self._db_manager
+
+    def _on_first_map(self, event):
+        """_summary_ : records the first paint and starts preloading in the background
+        """
+        # children's <Map> events reach this binding too (the root is in their bindtags)
+        if event.widget is not self or "first_paint" in self.startup_timings:
+            return
+        self.startup_timings["first_paint"] = time.perf_counter() - self.started
+        logging.info("Startup: " + ", ".join(f"{k} {v * 1000:.0f} ms" for k, v in self.startup_timings.items()))
+        self.after(self.WARMUP_DELAY, self.warm_up)
+
+    def warm_up(self):
+        """_summary_ : imports the database modules, views and installed drivers on a
+                        background thread, then creates the DatabaseManager
+        """
+        def task():
+            timings = warmup.preload(self.WARMUP_MODULES)
+            self.db_manager
+            self.startup_timings["warm_up"] = time.perf_counter() - self.started
+            logging.info(f"Preloaded {len(timings)} modules in {sum(timings.values()) * 1000:.0f} ms")
+
+        threading.Thread(target=task, name="warm-up", daemon=True).start()
+
+    def export_metrics(self):
+        """_summary_ : writes the query metrics snapshot and schedules the next export
+        """
+        # nothing to export before the first connection
+        if self._db_manager is not None:
+            self._db_manager.export_metrics('logs/metrics.json')
+        self.after(self.METRICS_INTERVAL, self.export_metrics)
 
     # function to add the open database view to the main view
     def open_database_frame(self, event):
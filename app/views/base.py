@@ -2,11 +2,11 @@
 """
 # Import the necessary modules
 import tkinter as tk
-from tkinter import ttk
 
 # Import neccessary classes
 from .tabview import TabView
-from .querytxt import QueryTxt
+# QueryTxt and ResultGrid (and the database modules they pull in) are imported
+# when the first query / result tab opens, not at startup
 
 class MainView(tk.Frame):
     """_summary_
@@ -14,7 +14,7 @@ class MainView(tk.Frame):
     Args:
         tk (_type_): _description_
     """
-    def __init__(self, parent, db_manager):
+    def __init__(self, parent, db_manager=None):
         tk.Frame.__init__(self, parent, width=500)
         self.controller = parent
         # -------------------------------- main frame -------------------------------- #
@@ -40,8 +40,11 @@ class MainView(tk.Frame):
 
 
         # -------------------------------- temp result frame -------------------------------- #
-        self.temp_frame = tk.Frame(self.result_frame, bg="purple")
-        self.table_tree = ttk.Treeview(self.temp_frame, columns=())
+        # built with the first result tab that has no data of its own (see _temp_result_frame)
+        self.temp_frame = None
+        self.result_grid = None
+        # tab name -> ResultGrid of the result tabs that show data
+        self.result_grids = {}
 
     def add_tab(self, tab_type: str, tab_name: str = "Query", columns: list=None, data: list=None, tab_frame=None):
         """_summary_
@@ -49,6 +52,9 @@ class MainView(tk.Frame):
         Args:
             tab_name (str): _description_
             tab_frame (tk.Frame): _description_
+
+        Returns:
+            ResultGrid: the grid showing the data of a result tab (None for other tabs)
         """
         if tab_type == "query":
             if self.query_frame is None:
@@ -59,8 +65,13 @@ class MainView(tk.Frame):
                 if tab_name in [k for k, v in self.query_tab_view.open_tabs.items()]:
                     self.query_tab_view.custom_select(tab_name)
                 else:
+                    from .querytxt import QueryTxt
                     _frame = tk.Frame(self.query_frame)
-                    text_area = QueryTxt(parent=_frame, db_manager=self.controller.db_manager, result_controller=self)
+                    db_manager = self.controller.db_manager
+                    # tabs opened from a database node stay bound to that connection
+                    connection_name = tab_name if tab_name in db_manager.connection_names() else None
+                    text_area = QueryTxt(parent=_frame, db_manager=db_manager, result_controller=self,
+                                         connection_name=connection_name)
                     text_area.pack(fill="both", expand=True)
                     self.query_tab_view.add_tab(tab_name, _frame)
             else:
@@ -69,23 +80,76 @@ class MainView(tk.Frame):
 
         elif tab_type == "result":
             if self.result_frame is None:
-                if columns is not None and data is not None:
+                if data is not None:
                     self._result_frame()
                 # self._result_frame()
             
             if tab_frame is None:
-                if columns is not None and data is not None:
+                if data is not None:
+                    # each result tab gets its own grid, so a script's results stay side by side
+                    if tab_name not in self.result_grids:
+                        from .result_grid import ResultGrid
+                        _frame = tk.Frame(self.result_tab_view)
+                        self.result_grids[tab_name] = ResultGrid(_frame)
+                        self.result_grid = self.result_grids[tab_name]
+                        self._build_tree(columns, data)
+                        self.result_tab_view.add_tab(tab_name, _frame)
+                        return self.result_grid
+                    self.result_grid = self.result_grids[tab_name]
                     self._build_tree(columns, data)
                 # check if the tab is in the open_tab list
                 if tab_name in [k for k, v in self.result_tab_view.open_tabs.items()]:
                     self.result_tab_view.custom_select(tab_name)
                 else:
-                    self.result_tab_view.add_tab(tab_name, self.temp_frame)
+                    self.result_tab_view.add_tab(tab_name, self._temp_result_frame())
+                return self.result_grid
             else:
                 _frame = tab_frame
                 self.result_tab_view.add_tab(tab_name, _frame)
 
 
+    def add_plan_tab(self, tab_name: str, plan):
+        """_summary_ : shows a query plan in a result tab (replacing an older plan of the same name)
+
+        Args:
+            tab_name (str): _description_ (e.g. "users's Plan")
+            plan (QueryPlan): the parsed plan
+        """
+        from .plan_view import PlanView
+        if self.result_frame is None:
+            self._result_frame()
+        if tab_name in self.result_tab_view.open_tabs:
+            self.result_tab_view.forget(self.result_tab_view.open_tabs.pop(tab_name))
+        self.result_tab_view.add_tab(tab_name, PlanView(self.result_tab_view, plan))
+
+    def add_browse_tab(self, tab_name: str, browser, connection_name: str = None):
+        """_summary_ : browses a table page by page in a result tab (replacing an older
+                        tab of the same name)
+
+        Args:
+            tab_name (str): _description_ (e.g. "users Rows")
+            browser (TableBrowser | ResultStream): the table's pages
+            connection_name (str, optional): connection edits are saved through. Defaults to the active one.
+        """
+        from .table_view import TableView
+        if self.result_frame is None:
+            self._result_frame()
+        if tab_name in self.result_tab_view.open_tabs:
+            tab = self.result_tab_view.open_tabs.pop(tab_name)
+            self.result_tab_view.forget(tab)
+            self.result_tab_view.nametowidget(tab).destroy()
+        view = TableView(self.result_tab_view, browser, self.controller.db_manager, connection_name)
+        self.result_tab_view.add_tab(tab_name, view)
+
+    def _temp_result_frame(self) -> tk.Frame:
+        """_summary_ : frame (with an empty result grid) shown by result tabs without data
+        """
+        if self.temp_frame is None:
+            from .result_grid import ResultGrid
+            self.temp_frame = tk.Frame(self.result_frame, bg="purple")
+            self.result_grid = ResultGrid(self.temp_frame)
+        return self.temp_frame
+
     def _query_frame(self):
         """_summary_ : frame containing the text box for writing queries
         """
@@ -93,27 +157,17 @@ class MainView(tk.Frame):
         self.query_frame.pack(fill="both", padx=10, pady=5, expand=True, side="top")
         self.query_tab_view = TabView(self.query_frame)
     
-    def _build_tree(self, columns: list, data: list):
-        # treeview
-        self.table_tree.pack(fill="both", expand=True)
-
-        # add data to the table
-        self.table_tree.delete(*self.table_tree.get_children())
-        # get the column names and add them to the treeview
-        _columns = ([col["name"] for col in columns])
-        self.table_tree["columns"] = _columns
-        # format the columns
-        self.table_tree.column("#0", width=0, stretch=False)
-        for col in _columns:
-            self.table_tree.column(col, anchor="w", width=100)
-            self.table_tree.heading(col, text=col, anchor="w")
-
-        # add the data to the treeview
-        for i, row in enumerate(data):
-            # get the value from the row tuple
-            row = list(row)
-            # insert the row
-            self.table_tree.insert(parent='', index='end', iid=str(i), text="", values=row)
+    def _build_tree(self, columns: list, data):
+        """_summary_ : shows a result in the (virtual-scrolling) result grid
+
+        Args:
+            columns (list): column dicts with a "name" key (None: the columns data was described with)
+            data (list | ResultSet | ResultStream | QueryJob): rows, or a stream the grid pages rows in from
+        """
+        if columns is None:
+            columns = [column.as_dict() for column in data.description]
+        self.result_grid.pack(fill="both", expand=True)
+        self.result_grid.set_data(columns, data)
 
     def _result_frame(self):
         """_summary_ :
@@ -121,11 +175,4 @@ class MainView(tk.Frame):
         self.result_frame = tk.Frame(self._frame, bg="white", height=300)
         self.result_frame.pack(fill="both", padx=10, pady=5, expand=True, side="top")
 
-                # scrollbars
-        yscrollbar = ttk.Scrollbar(self.result_frame, orient="vertical", command=self.table_tree.yview)
-        yscrollbar.pack(side="right", fill="y")
-        xscrollbar = ttk.Scrollbar(self.result_frame, orient="horizontal", command=self.table_tree.xview)
-        xscrollbar.pack(side="bottom", fill="x")
-        self.table_tree.configure(yscrollcommand=yscrollbar.set, xscrollcommand=xscrollbar.set)
-
         self.result_tab_view = TabView(self.result_frame)
@@ -0,0 +1,83 @@
+"""_summary_ : A result tab showing a query plan as a tree, with costs, estimated vs
+                actual rows and timings, and full scans / misestimates highlighted.
+"""
+
+# import necessary modules
+import tkinter as tk
+from tkinter import ttk
+
+from database.explain import MISESTIMATE_RATIO
+
+
+class PlanView(tk.Frame):
+    """_summary_
+
+    Args:
+        tk (_type_): _description_
+    """
+
+    COLUMNS = ("cost", "estimated", "actual", "loops", "time", "notes")
+    HEADINGS = {
+        "cost": "Cost",
+        "estimated": "Est. rows",
+        "actual": "Actual rows",
+        "loops": "Loops",
+        "time": "Time (ms)",
+        "notes": "Notes",
+    }
+    # row backgrounds of flagged nodes
+    FULL_SCAN_COLOR = "#f8d7da"
+    MISESTIMATE_COLOR = "#fff3cd"
+
+    def __init__(self, parent, plan):
+        tk.Frame.__init__(self, parent)
+        self.controller = parent
+        self.plan = plan
+
+        self.summary = tk.Label(self, anchor="w", text=plan.summary())
+        self.summary.pack(side="top", fill="x")
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS)
+        self.tree.heading("#0", text="Step", anchor="w")
+        self.tree.column("#0", width=420, stretch=True)
+        for column in self.COLUMNS:
+            self.tree.heading(column, text=self.HEADINGS[column], anchor="w")
+            self.tree.column(column, width=260 if column == "notes" else 90, stretch=column == "notes")
+        self.tree.tag_configure("full_scan", background=self.FULL_SCAN_COLOR)
+        self.tree.tag_configure("misestimate", background=self.MISESTIMATE_COLOR)
+
+        yscrollbar = ttk.Scrollbar(self, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=yscrollbar.set)
+        yscrollbar.pack(side="right", fill="y")
+        self.tree.pack(fill="both", expand=True)
+
+        self._insert(plan.root, "")
+
+    def _insert(self, node, parent: str):
+        """_summary_ : adds a node and its children (opened) under parent
+        """
+        tags = []
+        if node.full_scan:
+            tags.append("full_scan")
+        ratio = node.misestimate
+        if ratio is not None and ratio >= MISESTIMATE_RATIO:
+            tags.append("misestimate")
+        notes = node.flags + [f"{key}: {value}" for key, value in node.details.items()]
+        item = self.tree.insert(parent, "end", text=node.label, open=True, tags=tags, values=(
+            _number(node.cost),
+            _number(node.estimated_rows),
+            _number(node.actual_rows),
+            _number(node.loops),
+            _number(node.time_ms, 3),
+            "; ".join(notes),
+        ))
+        for child in node.children:
+            self._insert(child, item)
+
+
+def _number(value, digits: int = 2) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and not value.is_integer():
+        return f"{value:,.{digits}f}"
+    return f"{int(value):,}"
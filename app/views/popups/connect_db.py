@@ -59,8 +59,8 @@ class Connector(tk.Toplevel):
                 # create the database
                 connected = self.controller.db_manager.connect(_conn_string)
                 if connected:
-                    # refresh the view
-                    self.controller.sidebar.refresh()
+                    # show the new connection
+                    self.controller.sidebar.add_connection(self.controller.db_manager.active_name)
                     # open a query window
                     # self.controller.main_view.add_tab(tab_name="Query", tab_type="query")
                     # close the window
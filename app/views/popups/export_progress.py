@@ -0,0 +1,97 @@
+"""_summary_ : Save dialog and progress window for exporting a result to a file
+"""
+
+# Import the necessary modules
+import tkinter as tk
+from tkinter import filedialog, ttk
+
+from database.export import available_formats
+
+# file dialog entries per export format
+_FILETYPES = {
+    "csv": ("CSV", "*.csv"),
+    "jsonl": ("JSON Lines", "*.jsonl"),
+    "parquet": ("Parquet (zstd)", "*.parquet"),
+}
+
+
+def start_export(parent, db_manager, sql: str, connection_name: str = None, default_name: str = "result"):
+    """_summary_ : asks where to save a query's result and exports it in the background
+
+    Args:
+        parent (tk.Widget): widget the dialog and progress window belong to
+        db_manager (DatabaseManager): _description_
+        sql (str): _description_ (e.g. "SELECT * FROM users")
+        connection_name (str, optional): connection to run the query on. Defaults to the active one.
+        default_name (str, optional): suggested file name. Defaults to "result".
+
+    Returns:
+        ExportProgress: the progress window, or None if the dialog was cancelled
+    """
+    path = filedialog.asksaveasfilename(
+        parent=parent,
+        initialfile=f"{default_name}.csv",
+        defaultextension=".csv",
+        filetypes=[_FILETYPES[fmt] for fmt in available_formats()],
+    )
+    if not path:
+        return None
+    with db_manager.using(connection_name):
+        job = db_manager.query_runner().export(sql, path)
+    return ExportProgress(parent, job)
+
+
+class ExportProgress(tk.Toplevel):
+    """_summary_ : shows the rows written by an export job and lets it be cancelled
+    """
+
+    # milliseconds between progress updates
+    POLL_INTERVAL = 200
+
+    def __init__(self, parent, job):
+        tk.Toplevel.__init__(self, parent)
+        self.controller = parent
+        self.job = job
+        self.resizable(False, False)
+        self.transient(parent)
+        self.title("Exporting")
+
+        tk.Label(self, text=job.path, anchor="w").pack(fill="x", padx=10, pady=(10, 0))
+        # the row count isn't known up front, so the bar only shows activity
+        self.progress = ttk.Progressbar(self, mode="indeterminate", length=300)
+        self.progress.pack(padx=10, pady=10)
+        self.progress.start()
+        self.status = tk.Label(self, text="Starting...", anchor="w")
+        self.status.pack(fill="x", padx=10)
+        self.button = tk.Button(self, text="Cancel", command=self._cancel)
+        self.button.pack(pady=10)
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+
+        self.after(self.POLL_INTERVAL, self._poll)
+
+    def _poll(self):
+        """_summary_ : refreshes the status until the job finishes
+        """
+        job = self.job
+        if job.running:
+            self.status.config(text=f"{job.rows:,} rows written ({job.elapsed:.1f}s)")
+            self.after(self.POLL_INTERVAL, self._poll)
+            return
+
+        self.progress.stop()
+        if job.state == "done":
+            self.status.config(text=f"Done: {job.rows:,} rows in {job.elapsed:.1f}s")
+        elif job.state == "cancelled":
+            self.status.config(text=f"Cancelled after {job.rows:,} rows")
+        else:
+            self.status.config(text=f"Error: {job.error.splitlines()[0]}")
+        self.button.config(text="Close", command=self.destroy)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+
+    def _cancel(self):
+        """_summary_ : cancels a running export (closes the window once it has finished)
+        """
+        if self.job.running:
+            self.job.cancel()
+        else:
+            self.destroy()
@@ -0,0 +1,121 @@
+"""_summary_ : Open dialog and progress window for importing a CSV or JSON Lines file
+                into a table
+"""
+
+# Import the necessary modules
+import os
+import threading
+import tkinter as tk
+from tkinter import filedialog, ttk
+
+# file dialog entries of the import formats
+_FILETYPES = [
+    ("CSV", "*.csv *.tsv"),
+    ("JSON Lines", "*.jsonl *.ndjson"),
+    ("All files", "*"),
+]
+
+
+def start_import(parent, db_manager, table_name: str = None, connection_name: str = None, on_done=None):
+    """_summary_ : asks for a file and imports it in the background
+
+    Args:
+        parent (tk.Widget): widget the dialog and progress window belong to
+        db_manager (DatabaseManager): _description_
+        table_name (str, optional): table to import into. Defaults to a table named after the
+                                    file, created from the file's columns if it doesn't exist.
+        connection_name (str, optional): connection to import on. Defaults to the active one.
+        on_done (callable, optional): called with the ImportReport (None on failure) once the
+                                      import has finished. Defaults to None.
+
+    Returns:
+        ImportProgress: the progress window, or None if the dialog was cancelled
+    """
+    path = filedialog.askopenfilename(parent=parent, filetypes=_FILETYPES)
+    if not path:
+        return None
+    return ImportProgress(parent, db_manager, path, table_name, connection_name, on_done)
+
+
+class ImportProgress(tk.Toplevel):
+    """_summary_ : runs DatabaseManager.import_file on a worker thread and shows the share
+                    of the file committed; a cancelled import resumes when started again
+    """
+
+    # milliseconds between progress updates
+    POLL_INTERVAL = 200
+
+    def __init__(self, parent, db_manager, path: str, table_name: str = None, connection_name: str = None,
+                 on_done=None):
+        tk.Toplevel.__init__(self, parent)
+        self.controller = parent
+        self.on_done = on_done
+        self.table_name = table_name or os.path.splitext(os.path.basename(path))[0]
+        self.report = None
+        self.result = None
+        self._stop = threading.Event()
+        self.resizable(False, False)
+        self.transient(parent)
+        self.title(f"Importing into {self.table_name}")
+
+        tk.Label(self, text=path, anchor="w").pack(fill="x", padx=10, pady=(10, 0))
+        self.progress = ttk.Progressbar(self, mode="determinate", length=300, maximum=1.0)
+        self.progress.pack(padx=10, pady=10)
+        self.status = tk.Label(self, text="Reading the file...", anchor="w", justify="left")
+        self.status.pack(fill="x", padx=10)
+        self.button = tk.Button(self, text="Cancel", command=self._cancel)
+        self.button.pack(pady=10)
+        self.protocol("WM_DELETE_WINDOW", self._cancel)
+
+        def run():
+            with db_manager.using(connection_name):
+                self.result = db_manager.import_file(path, self.table_name, create=table_name is None,
+                                                     progress=self._progress, should_stop=self._stop.is_set)
+
+        self.thread = threading.Thread(target=run, name="import", daemon=True)
+        self.thread.start()
+        self.after(self.POLL_INTERVAL, self._poll)
+
+    def _progress(self, report):
+        # called on the import thread; read by _poll on the Tk thread
+        self.report = report
+
+    def _poll(self):
+        """_summary_ : refreshes the progress until the import thread finishes
+        """
+        report = self.report
+        if self.thread.is_alive():
+            if report is not None:
+                self.progress["value"] = report.fraction
+                self.status.config(text=f"{report.inserted:,} rows imported, {report.failed:,} rejected "
+                                        f"({report.rows_per_second:,.0f} rows/s)")
+            self.after(self.POLL_INTERVAL, self._poll)
+            return
+
+        report = self.result
+        if report is None:
+            self.status.config(text="Import failed (see the log)")
+        else:
+            self.progress["value"] = report.fraction
+            text = f"{report.inserted:,} rows in {report.elapsed:.1f}s, {report.failed:,} rejected"
+            if report.cancelled:
+                text = f"Cancelled: {text}; importing the file again resumes"
+            elif not report.finished:
+                text = f"Stopped: {text}; {report.errors[-1][1].splitlines()[0]}"
+            if report.quarantine_path:
+                text += f"\nRejected records: {report.quarantine_path}"
+            self.status.config(text=text)
+        self.button.config(text="Close", command=self.destroy)
+        self.protocol("WM_DELETE_WINDOW", self.destroy)
+        if self.on_done is not None:
+            self.on_done(report)
+
+    def _cancel(self):
+        """_summary_ : stops a running import after the chunk being written (closes the
+                        window once it has finished)
+        """
+        if self.thread.is_alive():
+            self._stop.set()
+            self.status.config(text="Cancelling after the current chunk...")
+        else:
+            self.destroy()
@@ -0,0 +1,132 @@
+"""_summary_ : Dialogs to create an index on a table and to review the index advisor's
+                suggestions for the slow queries of a connection
+"""
+
+# Import the necessary modules
+import tkinter as tk
+from tkinter import ttk
+
+
+class CreateIndexDialog(tk.Toplevel):
+    """_summary_ : asks for the columns, name and options of a new index
+
+        on_create(columns, name, unique, online) is called with the entered values
+        when "Create" is pressed; name is None when left empty.
+    """
+
+    def __init__(self, parent, table: str, columns: list, on_create):
+        tk.Toplevel.__init__(self, parent)
+        self.controller = parent
+        self.on_create = on_create
+        self.resizable(False, False)
+        self.transient(parent)
+        self.title(f"Create index on {table}")
+
+        tk.Label(self, text="Columns (in index order):", anchor="w").pack(fill="x", padx=10, pady=(10, 0))
+        # columns in the order they are selected
+        self.selected = []
+        self.columns = tk.Listbox(self, selectmode="multiple", exportselection=False, height=min(len(columns), 10))
+        for column in columns:
+            self.columns.insert("end", column)
+        self.columns.bind("<<ListboxSelect>>", self._on_select)
+        self.columns.pack(fill="x", padx=10)
+        self.order = tk.Label(self, text="", anchor="w")
+        self.order.pack(fill="x", padx=10)
+
+        tk.Label(self, text="Name (optional):", anchor="w").pack(fill="x", padx=10, pady=(10, 0))
+        self.name = tk.Entry(self, width=40)
+        self.name.pack(fill="x", padx=10)
+
+        self.unique = tk.BooleanVar(value=False)
+        self.online = tk.BooleanVar(value=True)
+        tk.Checkbutton(self, text="Unique", variable=self.unique, anchor="w").pack(fill="x", padx=10, pady=(10, 0))
+        tk.Checkbutton(self, text="Build online (don't block writes)", variable=self.online,
+                       anchor="w").pack(fill="x", padx=10)
+
+        buttons = tk.Frame(self)
+        buttons.pack(pady=10)
+        tk.Button(buttons, text="Create", command=self._create).pack(side="left", padx=5)
+        tk.Button(buttons, text="Cancel", command=self.destroy).pack(side="left", padx=5)
+
+    def _on_select(self, event):
+        """_summary_ : keeps the selected columns in the order they were clicked
+        """
+        current = [self.columns.get(i) for i in self.columns.curselection()]
+        self.selected = [column for column in self.selected if column in current]
+        self.selected += [column for column in current if column not in self.selected]
+        self.order.config(text=", ".join(self.selected))
+
+    def _create(self):
+        if not self.selected:
+            self.order.config(text="Select at least one column")
+            return
+        self.on_create(list(self.selected), self.name.get().strip() or None, self.unique.get(), self.online.get())
+        self.destroy()
+
+
+class IndexAdvisorPopup(tk.Toplevel):
+    """_summary_ : lists suggested indexes (slowest statements first) and creates the
+                    selected ones through on_create(suggestion, done)
+
+        on_create starts the creation in the background and calls done(created) on the
+        Tk thread once it has finished; a suggestion is removed from the list only then,
+        and only if its index was created.
+    """
+
+    COLUMNS = ("table", "columns", "reason")
+
+    def __init__(self, parent, connection: str, suggestions: list, on_create):
+        tk.Toplevel.__init__(self, parent)
+        self.controller = parent
+        self.suggestions = suggestions
+        self.on_create = on_create
+        self.transient(parent)
+        self.title(f"Index suggestions for {connection}")
+
+        if not suggestions:
+            tk.Label(self, text="No index suggestions: the slow queries don't scan tables "
+                                "on unindexed filter or join columns.").pack(padx=10, pady=10)
+            tk.Button(self, text="Close", command=self.destroy).pack(pady=(0, 10))
+            return
+
+        self.tree = ttk.Treeview(self, columns=self.COLUMNS, show="headings", height=min(len(suggestions), 15))
+        for column, width in zip(self.COLUMNS, (140, 220, 320)):
+            self.tree.heading(column, text=column.capitalize(), anchor="w")
+            self.tree.column(column, width=width, stretch=column == "reason")
+        for i, suggestion in enumerate(suggestions):
+            self.tree.insert("", "end", iid=str(i), values=(
+                suggestion.table, ", ".join(suggestion.columns), suggestion.reason))
+        self.tree.pack(fill="both", expand=True, padx=10, pady=(10, 0))
+        self.tree.bind("<<TreeviewSelect>>", self._show_statement)
+
+        self.statement = tk.Label(self, text="", anchor="w", justify="left", wraplength=680)
+        self.statement.pack(fill="x", padx=10, pady=5)
+
+        buttons = tk.Frame(self)
+        buttons.pack(pady=(0, 10))
+        tk.Button(buttons, text="Create selected", command=self._create).pack(side="left", padx=5)
+        tk.Button(buttons, text="Close", command=self.destroy).pack(side="left", padx=5)
+
+    def _show_statement(self, event):
+        """_summary_ : shows the first slow statement behind the selected suggestion
+        """
+        selection = self.tree.selection()
+        if selection:
+            suggestion = self.suggestions[int(selection[0])]
+            self.statement.config(text=" ".join(suggestion.statements[0].split()))
+
+    def _create(self):
+        for item in self.tree.selection():
+            self.on_create(self.suggestions[int(item)], lambda created, item=item: self._created(item, created))
+
+    def _created(self, item, created: bool):
+        """_summary_ : removes a suggestion whose index was created, or says it failed
+        """
+        if not self.winfo_exists() or not self.tree.exists(item):
+            return
+        if created:
+            self.tree.delete(item)
+        else:
+            suggestion = self.suggestions[int(item)]
+            self.statement.config(text=f"Failed to create the index on {suggestion.table} "
+                                       f"({', '.join(suggestion.columns)})")
@@ -0,0 +1,125 @@
+"""_summary_ : Dialog asking for the values of a statement's :name parameters, either
+                one value each or one row of values per line to run the statement
+                for every row in a single executemany
+"""
+
+# Import the necessary modules
+import csv
+import tkinter as tk
+
+
+def parse_value(text: str):
+    """_summary_ : a typed-in parameter value: NULL is None, numbers become int or float,
+                    'quoted' text keeps its quotes off and anything else is a string
+
+    Args:
+        text (str): _description_ (e.g. "42", "NULL", "'007'")
+
+    Returns:
+        _type_: _description_ (e.g. 42, None, "007")
+    """
+    text = text.strip()
+    if text.upper() == "NULL":
+        return None
+    if len(text) > 1 and text[0] == text[-1] == "'":
+        return text[1:-1].replace("''", "'")
+    # a leading zero (e.g. a zip code) keeps it text
+    digits = text.lstrip("-")
+    if len(digits) > 1 and digits[0] == "0" and digits[1] != ".":
+        return text
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    return text
+
+
+class QueryParamsDialog(tk.Toplevel):
+    """_summary_ : asks for parameter values and calls on_run(params)
+
+        params is a dict ({"id": 7}) in single mode and a list of dicts in rows mode,
+        where each line holds one comma separated value per parameter, in the order
+        the parameters are listed.
+    """
+
+    def __init__(self, parent, names: list, on_run, values: dict = None):
+        """_summary_
+
+        Args:
+            parent (tk.Widget): _description_
+            names (list): the statement's parameter names (e.g. ["id", "name"])
+            on_run (callable): called with the parameters once "Run" is pressed
+            values (dict, optional): text last typed per name, prefilled and updated. Defaults to None.
+        """
+        tk.Toplevel.__init__(self, parent)
+        self.controller = parent
+        self.names = names
+        self.on_run = on_run
+        # updated with the typed-in text, so the caller can offer it again
+        self.values = values
+        self.transient(parent)
+        self.title("Query parameters")
+
+        self.single = tk.Frame(self)
+        self.entries = {}
+        for row, name in enumerate(names):
+            tk.Label(self.single, text=f":{name}", anchor="w").grid(row=row, column=0, sticky="w", padx=(0, 5))
+            entry = tk.Entry(self.single, width=40)
+            entry.insert(0, (values or {}).get(name, ""))
+            entry.grid(row=row, column=1, sticky="ew", pady=1)
+            entry.bind("<Return>", lambda event: self._run())
+            self.entries[name] = entry
+        self.single.columnconfigure(1, weight=1)
+
+        self.rows = tk.Frame(self)
+        tk.Label(self.rows, text=f"One row per line: {', '.join(names)}", anchor="w").pack(fill="x")
+        self.rows_text = tk.Text(self.rows, width=50, height=10)
+        self.rows_text.pack(fill="both", expand=True)
+
+        self.many = tk.BooleanVar(value=False)
+        tk.Checkbutton(self, text="Run once per row (executemany)", variable=self.many, anchor="w",
+                       command=self._switch).pack(fill="x", padx=10, pady=(10, 0))
+        self.single.pack(fill="both", expand=True, padx=10, pady=5)
+        self.message = tk.Label(self, text="NULL for no value, 'quotes' to keep a number as text",
+                                anchor="w", fg="gray")
+        self.message.pack(fill="x", padx=10)
+
+        buttons = tk.Frame(self)
+        buttons.pack(pady=10)
+        tk.Button(buttons, text="Run", command=self._run).pack(side="left", padx=5)
+        tk.Button(buttons, text="Cancel", command=self.destroy).pack(side="left", padx=5)
+        self.entries[names[0]].focus_set()
+
+    def _switch(self):
+        """_summary_ : swaps the single value entries for the rows text area
+        """
+        shown, hidden = (self.rows, self.single) if self.many.get() else (self.single, self.rows)
+        hidden.pack_forget()
+        shown.pack(fill="both", expand=True, padx=10, pady=5, before=self.message)
+
+    def _run(self):
+        try:
+            params = self._rows() if self.many.get() else {
+                name: parse_value(entry.get()) for name, entry in self.entries.items()
+            }
+        except ValueError as e:
+            self.message.config(text=str(e), fg="red")
+            return
+        if self.values is not None and not self.many.get():
+            self.values.update({name: entry.get() for name, entry in self.entries.items()})
+        self.destroy()
+        self.on_run(params)
+
+    def _rows(self) -> list:
+        """_summary_ : the rows text area as a list of parameter dicts
+        """
+        lines = [line for line in self.rows_text.get("1.0", "end").splitlines() if line.strip()]
+        if not lines:
+            raise ValueError("Enter at least one row")
+        rows = []
+        for number, values in enumerate(csv.reader(lines, skipinitialspace=True), start=1):
+            if len(values) != len(self.names):
+                raise ValueError(f"Line {number} has {len(values)} values, expected {len(self.names)}")
+            rows.append({name: parse_value(value) for name, value in zip(self.names, values)})
+        return rows
@@ -5,6 +5,11 @@
 # import necessary modules
 import tkinter as tk
 
+from database.script import split_script
+from database.sqltokens import SCHEMA_KINDS, bind_names, referenced_tables
+from .popups.export_progress import start_export
+from .popups.query_params import QueryParamsDialog
+
 class QueryTxt(tk.Text):
     """_summary_
 
@@ -12,13 +17,32 @@ class QueryTxt(tk.Text):
         tk (_type_): _description_
     """
 
-    def __init__(self, parent, db_manager, result_controller):
+    # rows fetched per chunk and caps on what a single result tab may hold
+    CHUNK_SIZE = 1000
+    ROW_LIMIT = 1_000_000
+    MEMORY_BUDGET = 256 * 1024 * 1024
+    # milliseconds between checks on a running query
+    POLL_INTERVAL = 100
+    # statements per commit when a script runs in batches
+    SCRIPT_BATCH_SIZE = 100
+
+    def __init__(self, parent, db_manager, result_controller, connection_name: str = None):
         tk.Text.__init__(self, parent)
         self.db_manager = db_manager
+        # connection the queries run on (None follows the active connection)
+        self.connection_name = connection_name
         # controller
         self.controller = parent
         self.result_controller = result_controller
+        # query currently running on the db manager's worker threads
+        self.job = None
+        # last typed value of each :name parameter, offered again by the parameter prompt
+        self.params = {}
+        # elapsed time / row count of the running query
+        self.status = tk.Label(parent, anchor="w", text="")
+        self.status.pack(side="bottom", fill="x")
         self.bind("<Button-3>", self.menu_frame)
+        self.bind("<Escape>", lambda event: self._cancel())
 
 
     def menu_frame(self, event):
@@ -26,6 +50,18 @@ class QueryTxt(tk.Text):
         """
         menu = tk.Menu(self, tearoff=0)
         menu.add_command(label="Run", command=self._run)
+        menu.add_command(label="Run script in batches",
+                         command=lambda: self._run(script_mode="batch"))
+        menu.add_command(label="Explain", command=self._explain)
+        menu.add_command(label="Explain Analyze", command=lambda: self._explain(analyze=True))
+        menu.add_command(label="Cancel", command=self._cancel,
+                         state="normal" if self.job is not None and self.job.running else "disabled")
+        menu.add_command(label="Export result...", command=self._export,
+                         state="normal" if self.tag_ranges(tk.SEL) else "disabled")
+        menu.add_separator()
+        cache_on = tk.BooleanVar(menu, value=self.db_manager.result_cache is not None)
+        menu.add_checkbutton(label="Cache SELECT results", variable=cache_on,
+                             command=lambda: self.db_manager.set_result_cache(cache_on.get()))
         # close menu when clicked outside
         menu.bind("<FocusOut>", lambda event: menu.destroy())
         # get the coordinates of the cursor
@@ -35,8 +71,11 @@ class QueryTxt(tk.Text):
         menu.focus_set()
 
 
-    def _run(self):
-        """_summary_ : runs the query
+    def _run(self, script_mode: str = "transaction"):
+        """_summary_ : runs the query (a selection of several statements runs as a script)
+
+        Args:
+            script_mode (str, optional): "transaction" or "batch" for scripts. Defaults to "transaction".
         """
 
         # check if a text is selected
@@ -44,36 +83,175 @@ class QueryTxt(tk.Text):
             # get the selected text
             selected_text = self.get(tk.SEL_FIRST, tk.SEL_LAST)
             print(f"selected q: {selected_text}")
-            result = self.db_manager.execute_query(selected_text)
-            print(f"result: {result}")
-            table_name = self.get_table_name()
-            # table_name = table_name[0] if len(table_name) > 0 else ""
-            cols = self.db_manager.get_columns(table_name=table_name)
-
-            test_anticipate = self.get_table_name()
-            print(f"test_anticipate: {test_anticipate}")
-
-            print(f"cols: {cols}")
-            
-            if result:
-                self.result_controller.add_tab(tab_name=f"{table_name}'s Result", tab_type="result", columns=cols, data=result)
-
-    def get_table_name(self):
-        """_summary_ : anticipates the table name
+            # a new run replaces the query still running in this editor
+            self._cancel()
+            if len(split_script(selected_text)) > 1 or script_mode == "batch":
+                self._run_script(selected_text, script_mode)
+                return
+            names = bind_names(selected_text)
+            if names:
+                QueryParamsDialog(self, names, lambda params: self._submit(selected_text, params),
+                                  values=self.params)
+                return
+            self._submit(selected_text)
+
+    def _submit(self, sql: str, params=None):
+        """_summary_ : runs one statement on the db manager's worker threads
+
+        Args:
+            sql (str): _description_ (e.g. "SELECT * FROM users WHERE id = :id")
+            params (dict | list, optional): values of its :name parameters, a list of dicts
+                                            for an executemany. Defaults to None.
         """
-        # get the selected text
+        self._cancel()
+        with self.db_manager.using(self.connection_name):
+            self.job = self.db_manager.query_runner().submit(sql,
+                                                             chunk_size=self.CHUNK_SIZE,
+                                                             limit=self.ROW_LIMIT,
+                                                             memory_budget=self.MEMORY_BUDGET,
+                                                             params=params)
+        # the grid's columns come from the cursor once the query runs, so naming
+        # the tab is the only thing the statement text is needed for
+        table_name = self.get_table_name(sql) or "Query"
+        self.after(self.POLL_INTERVAL, self._poll, self.job, f"{table_name}'s Result", None)
+
+    def _explain(self, analyze: bool = False):
+        """_summary_ : shows the plan of the selected statement in a result tab
+
+        Args:
+            analyze (bool, optional): execute the statement (rolled back) for actual rows and times.
+        """
+        if not self.tag_ranges(tk.SEL):
+            return
         selected_text = self.get(tk.SEL_FIRST, tk.SEL_LAST)
-        # list of keywords that usually have the table name
-        keywords = ["from", "join", "into", "update", "alter", "table"]
-        # check for query that usually have the table name
-        if any(x in selected_text.lower() for x in keywords):
-            # split the text
-            selected_text = selected_text.split()
-            # get the index of the keyword
-            index = [x for x in range(len(selected_text)) if selected_text[x].lower() in keywords]
-            # get the table name which is usually the next word after the keyword and space(s)
-            table_name = selected_text[index[0] + 1]
-            return table_name.strip().replace(";", "")
+        self._cancel()
+        with self.db_manager.using(self.connection_name):
+            self.job = self.db_manager.query_runner().explain(selected_text, analyze=analyze)
+        table_name = self.get_table_name(selected_text) or "Query"
+        self.after(self.POLL_INTERVAL, self._poll_explain, self.job, f"{table_name}'s Plan")
+
+    def _poll_explain(self, job, tab_name: str):
+        """_summary_ : waits for an explain job, then opens its plan tab
+        """
+        if job is not self.job:
+            return
+        if job.running:
+            self.status.config(text=f"Explaining... {job.elapsed:.1f}s")
+            self.after(self.POLL_INTERVAL, self._poll_explain, job, tab_name)
+            return
+        if job.state != "done":
+            self.status.config(text=f"Explain failed: {(job.error or job.state).splitlines()[0]}")
+            return
+        self.result_controller.add_plan_tab(tab_name, job.plan)
+        self.status.config(text=job.plan.summary())
+
+    def _export(self):
+        """_summary_ : streams the selected query's result to a file
+        """
+        if self.tag_ranges(tk.SEL):
+            selected_text = self.get(tk.SEL_FIRST, tk.SEL_LAST)
+            start_export(self, self.db_manager, selected_text,
+                         connection_name=self.connection_name,
+                         default_name=self.get_table_name(selected_text).replace(", ", "_") or "result")
+
+    def _poll(self, job, tab_name: str, grid):
+        """_summary_ : checks on a running query from the Tk event loop: opens the result
+                        tab once the query returns rows, refreshes the grid as chunks
+                        arrive and updates the status line
+
+        Args:
+            job (QueryJob): the query being polled
+            tab_name (str): name of the result tab
+            grid (ResultGrid): grid of the result tab (None until it has been opened)
+        """
+        if job is not self.job:
+            return
+
+        if grid is None and job.columns:
+            grid = self.result_controller.add_tab(tab_name=tab_name, tab_type="result", data=job)
+        elif grid is not None:
+            grid.refresh()
+
+        self._show_status(job)
+        if job.running:
+            self.after(self.POLL_INTERVAL, self._poll, job, tab_name, grid)
+        elif grid is not None:
+            # rows fetched between the last check and the end of the query
+            grid.refresh()
+
+    def _run_script(self, sql_script: str, mode: str):
+        """_summary_ : runs several statements in one pass on a worker thread
+
+        Args:
+            sql_script (str): the statements
+            mode (str): "transaction" (all or nothing) or "batch" (a commit every SCRIPT_BATCH_SIZE statements)
+        """
+        with self.db_manager.using(self.connection_name):
+            self.job = self.db_manager.query_runner().run_script(sql_script, mode=mode,
+                                                                 batch_size=self.SCRIPT_BATCH_SIZE,
+                                                                 limit=self.ROW_LIMIT,
+                                                                 memory_budget=self.MEMORY_BUDGET)
+        self.after(self.POLL_INTERVAL, self._poll_script, self.job)
+
+    def _poll_script(self, job):
+        """_summary_ : shows a script's progress, then one result tab per statement that returned rows
+        """
+        if job is not self.job:
+            return
+        if job.running:
+            self.status.config(text=f"Running statement {job.current + 1} of {len(job.statements)}... "
+                                    f"{job.elapsed:.1f}s")
+            self.after(self.POLL_INTERVAL, self._poll_script, job)
+            return
+
+        report = job.report
+        if report is None:
+            self.status.config(text=f"Script failed: {(job.error or job.state).splitlines()[0]}")
+            return
+        for result in report.row_results:
+            tables = self.get_table_name(result.sql) or "Result"
+            self.result_controller.add_tab(tab_name=f"{result.index + 1}. {tables}", tab_type="result",
+                                           data=result.rows)
+        # tables created, altered or dropped by the script
+        if any(result.kind in SCHEMA_KINDS and result.committed for result in report.results):
+            with self.db_manager.using(self.connection_name):
+                self.db_manager.refresh_schema()
+        prefix = "Cancelled: " if job.state == "cancelled" else "Script: "
+        self.status.config(text=prefix + report.summary())
+
+    def _show_status(self, job):
+        """_summary_ : writes the job's progress in the status line
+        """
+        if job.running:
+            text = f"Running... {job.elapsed:.1f}s, {job.rows:,} rows fetched"
+        elif job.state == "error":
+            text = f"Error: {job.error.splitlines()[0]}"
+        elif job.state == "cancelled":
+            text = f"Cancelled after {job.elapsed:.2f}s, {job.rows:,} rows fetched"
+        elif job.columns:
+            text = f"Done in {job.elapsed:.2f}s, {job.rows:,} rows" + (" (truncated)" if job.truncated else "")
         else:
-            # might trigger some error
-            return ""
+            text = f"Done in {job.elapsed:.2f}s, {job.rowcount} rows affected"
+        if job.cached:
+            text += " (cached)"
+        stats = self.db_manager.cache_stats()
+        if stats:
+            text += f"  |  result cache: {stats['hits']} hits, {stats['misses']} misses"
+        self.status.config(text=text)
+
+    def _cancel(self):
+        """_summary_ : cancels the query running in this editor
+        """
+        if self.job is not None and self.job.running:
+            self.job.cancel()
+
+    def get_table_name(self, sql: str) -> str:
+        """_summary_ : names the tables a statement uses, for tab and file names
+
+        Args:
+            sql (str): _description_ (e.g. "SELECT * FROM users u JOIN orders o ON ...")
+
+        Returns:
+            str: _description_ (e.g. "orders, users"), "" if it uses none
+        """
+        return ", ".join(sorted(referenced_tables(sql)))
@@ -0,0 +1,326 @@
+"""_summary_ : A virtual-scrolling grid for query results. Only the rows that are
+                visible (plus a small buffer) exist as Treeview items; scrolling
+                rewrites those items instead of inserting one item per result row.
+"""
+
+# import necessary modules
+import tkinter as tk
+from tkinter import ttk
+
+from database.resultset import ResultSet
+
+
+class RowSource:
+    """_summary_ : rows loaded so far plus, optionally, the stream more rows are paged in from
+    """
+
+    def __init__(self, rows=None, stream=None):
+        """_summary_
+
+        Args:
+            rows (list | ResultSet, optional): rows that are already in memory (read, not copied).
+                                               Defaults to None.
+            stream (ResultStream, optional): stream to page further rows from. Defaults to None.
+        """
+        if rows is None:
+            # paged-in rows are stored column by column instead of as row tuples
+            rows = ResultSet(getattr(stream, "description", None)) if stream is not None else []
+        self.rows = rows
+        self.stream = stream
+
+    @property
+    def exhausted(self) -> bool:
+        """_summary_ : True once no more rows can be paged in
+        """
+        return self.stream is None or self.stream.closed
+
+    def ensure(self, count: int):
+        """_summary_ : pages chunks in from the stream until count rows are loaded (or it ends)
+
+        Args:
+            count (int): number of rows needed
+        """
+        while len(self.rows) < count and not self.exhausted:
+            chunk = self.stream.fetch_chunk()
+            if not chunk:
+                break
+            self.rows.extend(chunk)
+
+    def slice(self, start: int, stop: int) -> list:
+        """_summary_ : rows [start, stop), paging them in first if needed
+        """
+        self.ensure(stop)
+        return self.rows[start:stop]
+
+    def close(self):
+        """_summary_ : stops paging and releases the stream's cursor
+        """
+        if self.stream is not None:
+            self.stream.close()
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class ResultGrid(tk.Frame):
+    """_summary_ : frame holding a Treeview that only materializes the visible window of rows
+
+    Args:
+        tk (_type_): _description_
+    """
+
+    # rows rendered past the bottom edge so partially visible rows are filled
+    BUFFER = 5
+    DEFAULT_ROW_HEIGHT = 20
+    HEADING_HEIGHT = 25
+    # row backgrounds of edited rows and rows marked for deletion
+    EDITED_COLOR = "#e7f1ff"
+    DELETED_COLOR = "#eeeeee"
+    # text of the row shown where rows that are still being read will appear
+    PLACEHOLDER = "Loading..."
+
+    def __init__(self, parent):
+        tk.Frame.__init__(self, parent)
+        self.controller = parent
+        self.source = RowSource()
+        self.columns = []
+        # index of the first visible row and number of rows that fit in the widget
+        self.offset = 0
+        self.visible = 1
+        # edits shown over the loaded rows: row index -> {column index: value}
+        self.edits = {}
+        self.deleted = set()
+        # True while the window shows the placeholder row instead of rows not read yet
+        self.waiting = False
+        self._on_edit = None
+        self._on_delete = None
+        self._editor = None
+
+        self.tree = ttk.Treeview(self, columns=(), show="headings")
+        self.tree.tag_configure("edited", background=self.EDITED_COLOR)
+        self.tree.tag_configure("deleted", background=self.DELETED_COLOR, foreground="gray")
+        self.tree.tag_configure("placeholder", foreground="gray")
+        self.yscrollbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scroll)
+        self.xscrollbar = ttk.Scrollbar(self, orient="horizontal", command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.xscrollbar.set)
+
+        self.yscrollbar.pack(side="right", fill="y")
+        self.xscrollbar.pack(side="bottom", fill="x")
+        self.tree.pack(fill="both", expand=True)
+
+        self.tree.bind("<Configure>", self._on_resize)
+        # windows/mac wheel and x11 buttons
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda event: self._scroll_by(3))
+        self.tree.bind("<Prior>", lambda event: self._scroll_by(-self.visible))
+        self.tree.bind("<Next>", lambda event: self._scroll_by(self.visible))
+
+    def set_data(self, columns: list, data):
+        """_summary_ : replaces the grid's content
+
+        Args:
+            columns (list): column dicts with a "name" key
+            data (list | ResultSet | ResultStream): rows, or a stream rows are paged in from while scrolling
+        """
+        self.source.close()
+        if hasattr(data, "fetch_chunk"):
+            self.source = RowSource(stream=data)
+        else:
+            self.source = RowSource(rows=data)
+
+        self.columns = [col["name"] for col in columns]
+        self.tree.delete(*self.tree.get_children())
+        self.tree["columns"] = self.columns
+        for col in self.columns:
+            self.tree.column(col, anchor="w", width=100)
+            self.tree.heading(col, text=col, anchor="w")
+
+        self.offset = 0
+        self.edits = {}
+        self.deleted = set()
+        self._render()
+
+    def enable_editing(self, on_edit, on_delete=None):
+        """_summary_ : lets cells be edited in place (double-click, Return to keep,
+                        Escape to cancel) and selected rows be deleted (Delete key)
+
+        Args:
+            on_edit (callable): (row index, column index, new text) -> True to show the edit
+            on_delete (callable, optional): (row index) -> True to mark the row deleted. Defaults to None.
+        """
+        self._on_edit = on_edit
+        self._on_delete = on_delete
+        self.tree.bind("<Double-Button-1>", self._begin_edit)
+        if on_delete is not None:
+            self.tree.bind("<Delete>", self._delete_selected)
+
+    def set_cell(self, row: int, column: int, value):
+        """_summary_ : shows a new value over a loaded row's cell
+        """
+        self.edits.setdefault(row, {})[column] = value
+        self._render()
+
+    def mark_deleted(self, row: int):
+        """_summary_ : greys out a loaded row
+        """
+        self.deleted.add(row)
+        self._render()
+
+    def clear_edits(self, cells: list = (), rows: list = ()):
+        """_summary_ : removes edits shown by set_cell() / mark_deleted()
+
+        Args:
+            cells (list, optional): (row, column) pairs to restore. Defaults to ().
+            rows (list, optional): deleted rows to restore. Defaults to ().
+        """
+        for row, column in cells:
+            self.edits.get(row, {}).pop(column, None)
+            if not self.edits.get(row, True):
+                del self.edits[row]
+        self.deleted.difference_update(rows)
+        self._render()
+
+    def close(self):
+        """_summary_ : releases the stream behind the grid
+        """
+        self.source.close()
+
+    def refresh(self):
+        """_summary_ : re-renders the window, e.g. after a background query delivered more rows
+        """
+        self._render()
+
+    def _total(self) -> int:
+        """_summary_ : row count the scrollbar is scaled to; while rows can still be paged in
+                        one extra page is assumed so the bottom of the scrollbar loads more
+        """
+        total = len(self.source)
+        if not self.source.exhausted:
+            total += self.visible
+        return max(total, 1)
+
+    def _render(self):
+        """_summary_ : writes the rows of the current window into the Treeview items
+        """
+        self._cancel_edit()
+        window = self.visible + self.BUFFER
+        rows = self.source.slice(self.offset, self.offset + window)
+        # rows that may still arrive (e.g. a page being read) get a placeholder row
+        self.waiting = len(rows) < window and not self.source.exhausted
+        if self.waiting:
+            rows = list(rows) + [(self.PLACEHOLDER,) + ("",) * (len(self.columns) - 1)]
+        items = self.tree.get_children()
+
+        # grow or shrink the pool of items to the window size
+        for i in range(len(items), len(rows)):
+            self.tree.insert(parent="", index="end", iid=str(i), text="")
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        for i, row in enumerate(rows):
+            index = self.offset + i
+            values = list(row)
+            tags = ()
+            if index >= len(self.source):
+                tags = ("placeholder",)
+            elif index in self.edits:
+                for column, value in self.edits[index].items():
+                    values[column] = value
+                tags = ("edited",)
+            if index in self.deleted:
+                tags = ("deleted",)
+            self.tree.item(str(i), values=values, tags=tags)
+
+        total = self._total()
+        self.yscrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+
+    def _begin_edit(self, event):
+        """_summary_ : opens an entry over the double-clicked cell
+        """
+        item = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+        if not item or not column:
+            return
+        bbox = self.tree.bbox(item, column)
+        if not bbox:
+            return
+        row = self.offset + int(item)
+        index = int(column[1:]) - 1
+        if row in self.deleted or row >= len(self.source):
+            return "break"
+        x, y, width, height = bbox
+        current = self.tree.item(item, "values")[index]
+
+        self._editor = tk.Entry(self.tree)
+        self._editor.insert(0, current)
+        self._editor.select_range(0, "end")
+        self._editor.place(x=x, y=y, width=width, height=height)
+        self._editor.focus_set()
+        self._editor.bind("<Return>", lambda e: self._finish_edit(row, index))
+        self._editor.bind("<Escape>", lambda e: self._cancel_edit())
+        self._editor.bind("<FocusOut>", lambda e: self._cancel_edit())
+        return "break"
+
+    def _finish_edit(self, row: int, column: int):
+        value = self._editor.get()
+        self._cancel_edit()
+        if self._on_edit(row, column, value):
+            self.set_cell(row, column, value)
+
+    def _cancel_edit(self):
+        if self._editor is not None:
+            self._editor.destroy()
+            self._editor = None
+
+    def _delete_selected(self, event):
+        """_summary_ : marks the selected rows deleted (if on_delete accepts them)
+        """
+        for item in self.tree.selection():
+            row = self.offset + int(item)
+            if row < len(self.source) and row not in self.deleted and self._on_delete(row):
+                self.deleted.add(row)
+        self._render()
+        return "break"
+
+    def _scroll_to(self, offset: int):
+        """_summary_ : moves the window so that row offset is at the top
+        """
+        # page rows in first so the clamp below sees everything that exists
+        self.source.ensure(offset + self.visible + self.BUFFER)
+        offset = max(0, min(offset, len(self.source) - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self._render()
+
+    def _scroll_by(self, rows: int) -> str:
+        """_summary_ : scrolls by a number of rows from an event binding
+
+        Returns:
+            str: "break" so the Treeview's own class binding doesn't scroll it as well
+        """
+        self._scroll_to(self.offset + rows)
+        return "break"
+
+    def _on_scroll(self, *args):
+        """_summary_ : scrollbar command ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        """
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * self._total()))
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self._scroll_to(self.offset + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        """_summary_ : mouse wheel scrolling (delta is a multiple of 120 on windows)
+        """
+        return self._scroll_by(-3 * int(event.delta / abs(event.delta or 1)))
+
+    def _on_resize(self, event):
+        """_summary_ : recomputes how many rows fit when the widget is resized
+        """
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or self.DEFAULT_ROW_HEIGHT
+        visible = max(1, (event.height - self.HEADING_HEIGHT) // int(row_height))
+        if visible != self.visible:
+            self.visible = visible
+            self._render()
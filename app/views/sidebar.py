@@ -3,7 +3,12 @@
 
 # Import the necessary modules
 import tkinter as tk
-from tkinter import ttk
+from tkinter import messagebox, ttk
+from concurrent.futures import ThreadPoolExecutor
+
+from .popups.export_progress import start_export
+from .popups.import_progress import start_import
+from .popups.index_dialogs import CreateIndexDialog, IndexAdvisorPopup
 
 
 class Sidebar(ttk.Treeview):
@@ -11,7 +16,19 @@ class Sidebar(ttk.Treeview):
 
         Args:
             ttk (_type_): _description_
+
+        The tree is loaded lazily: connections first, then a connection's schemas,
+        a schema's tables and a table's columns, indexes and keys, each only when
+        its node is opened. Loads run on background threads.
     """
+    # tables shown per page of a schema node (the rest sit behind a "load more" node)
+    PAGE_SIZE = 500
+    # nodes inserted per event loop turn
+    INSERT_BATCH = 100
+    # milliseconds between checks on a background load
+    POLL_INTERVAL = 50
+    PLACEHOLDER = "loading..."
+
     def __init__(self, parent):
         ttk.Treeview.__init__(self, parent)
         # controller
@@ -27,15 +44,27 @@ class Sidebar(ttk.Treeview):
         self.plus_button.config(height=1, width=1)
         # trigger on click event to controller open database frame
         self.plus_button.bind("<Button-1>", self.controller.open_database_frame)
-    
-        self._build()
+
+        # iid -> what the node is (kind, connection, schema, table ...)
+        self._nodes = {}
+        self._loader = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sidebar")
+
+        # no connection is open yet: nodes are added by add_connection() as they are
+        # opened, so building the sidebar doesn't need the database manager
         self.bind("<Button-3>", self.menu_frame)
+        self.bind("<Double-Button-1>", self.open_result)
         self.bind("<<TreeviewSelect>>", self.on_select)
+        self.bind("<<TreeviewOpen>>", self.on_open)
 
     def refresh(self):
         """_summary_: refreshes the treeview"""
         # get the selected item
         # selected_item = self.selection()[0]
+        # drop the cached schema so the rebuild reads the catalog again
+        db = self.controller.db_manager
+        for name in db.connection_names():
+            with db.using(name):
+                db.refresh_schema()
         # delete all children
         self.delete(*self.get_children())
         self._build()
@@ -50,12 +79,47 @@ class Sidebar(ttk.Treeview):
         # # reselect the selected item
         # self.selection_set(selected_item)
 
+    def add_connection(self, name: str):
+        """_summary_ : adds the node of a newly opened connection without dropping the
+                        cached schema of the others (a fresh connection is often filled
+                        from its schema snapshot) and reloads it if the snapshot was stale
+        """
+        if not self.exists(name):
+            self.insert("", index="end", iid=name, text=name)
+            self._nodes[name] = {"kind": "connection", "connection": name}
+            self._add_placeholder(name)
+        future = self.controller.db_manager.snapshot_sync(name)
+        if future is not None:
+            self.after(self.POLL_INTERVAL, self._check_snapshot, future, name)
+
+    def _check_snapshot(self, future, name: str):
+        """_summary_ : once a connection's snapshot is validated, reloads its node if
+                        tables changed since the snapshot was taken
+        """
+        if not future.done():
+            self.after(self.POLL_INTERVAL, self._check_snapshot, future, name)
+            return
+        if not self.exists(name) or not future.result():
+            return
+        self.delete(*self.get_children(name))
+        self.item(name, open=False)
+        self._nodes[name]["loaded"] = False
+        self._add_placeholder(name)
+
     def open_result(self, event):
-        """_summary_ : opens the result tab
+        """_summary_ : opens a table node's rows in a result tab, paged by its key
         """
         item = self.identify_row(event.y)
-        tr = str(self.item(item, "text"))
-        self.controller.main_view.add_tab(tab_name=f"{tr} Result", tab_type="result")
+        node = self._nodes.get(item, {})
+        if node.get("kind") != "table":
+            return
+        self._submit(node["connection"],
+                     lambda db: db.browse_table(node["table"], schema=node["schema"]),
+                     lambda browser: self._show_rows(node, browser))
+
+    def _show_rows(self, node, browser):
+        if browser is not None:
+            self.controller.main_view.add_browse_tab(f"{node['table']} Rows", browser, node["connection"])
 
 
     def menu_frame(self, event):
@@ -65,12 +129,30 @@ class Sidebar(ttk.Treeview):
         item = self.identify_row(event.y)
 
         if self.parent(item):
-            pass
+            node = self._nodes.get(item, {})
+            menu = tk.Menu(self, tearoff=0)
+            if node.get("kind") == "table":
+                menu.add_command(label="Browse rows", command=lambda: self.open_result(event))
+                menu.add_command(label="Export...", command=lambda: self._export(node))
+                menu.add_command(label="Import file...", command=lambda: self._import(node))
+                menu.add_command(label="Create index...", command=lambda: self._create_index(node))
+            elif node.get("kind") == "group" and node["group"] == "Indexes":
+                menu.add_command(label="Create index...", command=lambda: self._create_index(node))
+            elif node.get("kind") == "index":
+                menu.add_command(label="Drop index", command=lambda: self._drop_index(item, node))
+            else:
+                return
+            menu.bind("<FocusOut>", lambda event: menu.destroy())
+            menu.post(event.x_root, event.y_root)
+            menu.focus_set()
         else:
             if item:
                 menu = tk.Menu(self, tearoff=0)
                 menu.add_command(label="View details", command=self._run)
                 menu.add_command(label="Refresh", command=self.refresh)
+                menu.add_command(label="Import file...", command=lambda: self._import(self._nodes[item]))
+                menu.add_command(label="Suggest indexes...", command=lambda: self._suggest_indexes(item))
+                menu.add_command(label="Disconnect", command=lambda: self._disconnect(item))
                 # close menu when clicked outside
                 menu.bind("<FocusOut>", lambda event: menu.destroy())
                 # get the coordinates of the cursor
@@ -85,36 +167,244 @@ class Sidebar(ttk.Treeview):
         """
         pass
 
+    def _export(self, node):
+        """_summary_ : exports every row of a table node's table to a file
+        """
+        db = self.controller.db_manager
+        with db.using(node["connection"]):
+            preparer = db.engine.dialect.identifier_preparer
+        name = preparer.quote(node["table"])
+        if node.get("schema"):
+            name = f"{preparer.quote_schema(node['schema'])}.{name}"
+        start_export(self, db, f"SELECT * FROM {name}",
+                     connection_name=node["connection"], default_name=node["table"])
+
+    def _import(self, node):
+        """_summary_ : imports a CSV or JSON Lines file into a table node's table, or for a
+                        connection node into a table named after the file (created if needed)
+        """
+        table_name = node.get("table")
+        start_import(self, self.controller.db_manager, table_name, connection_name=node["connection"],
+                     on_done=None if table_name else lambda report: report is not None and self.refresh())
+
+    def _create_index(self, node):
+        """_summary_ : loads the columns of a table node's table in the background, then
+                        asks for the columns of a new index and creates it in the background
+        """
+        def create(columns, name, unique, online):
+            self._submit(node["connection"],
+                         lambda db: db.create_index(node["table"], columns, name=name, unique=unique, online=online),
+                         lambda created: self._reload_indexes(node))
+
+        self._submit(node["connection"], lambda db: db.get_columns(node["table"], schema=node["schema"]),
+                     lambda columns: CreateIndexDialog(self, node["table"], [column["name"] for column in columns],
+                                                       create))
+
+    def _drop_index(self, item, node):
+        """_summary_ : drops the index of an index node in the background
+        """
+        if not messagebox.askyesno("Drop index", f"Drop index {node['index']} on {node['table']}?", parent=self):
+            return
+        self._submit(node["connection"], lambda db: db.drop_index(node["index"], node["table"]),
+                     lambda dropped: self._reload_indexes(node))
+
+    def _suggest_indexes(self, item):
+        """_summary_ : runs the index advisor on a connection's slow queries and lists
+                        its suggestions
+        """
+        connection = self._nodes[item]["connection"]
+
+        def create(suggestion, done):
+            def finished(created):
+                done(created)
+                self._reload_indexes({"connection": connection, "table": suggestion.table})
+
+            self._submit(connection, lambda db: db.create_index(suggestion.table, suggestion.columns), finished)
+
+        self._submit(connection, lambda db: db.suggest_indexes(),
+                     lambda suggestions: IndexAdvisorPopup(self, connection, suggestions, create))
+
+    def _reload_indexes(self, node):
+        """_summary_ : reloads the opened Indexes node of a table after an index changed
+        """
+        for item, other in list(self._nodes.items()):
+            if (other.get("kind") == "group" and other["group"] == "Indexes" and other.get("loaded")
+                    and other["connection"] == node["connection"] and other["table"] == node["table"]
+                    and node.get("schema") in (None, other["schema"]) and self.exists(item)):
+                self._load(item, lambda db, other=other: db.get_indexes(other["table"], schema=other["schema"]),
+                           self._insert_indexes)
+
+    def _disconnect(self, item):
+        """_summary_ : closes the connection of a database node and removes it from the tree
+        """
+        self.controller.db_manager.disconnect(self.item(item, "text"))
+        self.delete(item)
+
     def _build(self):
-        """_summary_ : builds the treeview
+        """_summary_ : builds the treeview (one node per open connection)
         """
         print("build called")
-        # children = ["Database 1", "Database 2", "Database 3", "Database 4", "Database 5"]
         db = self.controller.db_manager
-        if db.session is not None:
-            children = db.get_db_and_table_names()
-        else:
-            children = {}
-
-        count = 0
-        for key, value in children.items():
+        self._nodes.clear()
+        for name in db.connection_names():
             # db name or parent
-            self.insert("", index="end", iid=key, text=key)
-            # check if parent exists
-            if self.exists(key):
-                for child in value:
-                    # table name or child
-                    # generate unique iid for child item
-                    child_iid = f"{key}_{child}_child_{count}"
-                    if self.exists(child_iid):
-                        pass
-                    else:
-                        self.insert(key, index="end", iid=child_iid, text=child)
-                        # trigger on select event
-            else:
-                pass
-            count += 1
+            self.insert("", index="end", iid=name, text=name)
+            self._nodes[name] = {"kind": "connection", "connection": name}
+            self._add_placeholder(name)
+
+    def _add_placeholder(self, item):
+        """_summary_ : gives a node a dummy child so it can be opened before it is loaded
+        """
+        self.insert(item, index="end", text=self.PLACEHOLDER)
+
+    def on_open(self, event):
+        """_summary_ : loads the children of a node the first time it is opened
+        """
+        item = self.focus()
+        node = self._nodes.get(item)
+        if node is None or node.get("loaded"):
+            return
+        node["loaded"] = True
+
+        if node["kind"] == "connection":
+            self._load(item, lambda db: db.get_schema_names(), self._insert_schemas)
+        elif node["kind"] == "schema":
+            self._load(item, lambda db: db.get_table_names(schema=node["schema"]), self._insert_tables)
+        elif node["kind"] == "table":
+            self._insert_groups(item, node)
+        elif node["kind"] == "group" and node["group"] == "Indexes":
+            self._load(item, lambda db: db.get_indexes(node["table"], schema=node["schema"]), self._insert_indexes)
+        elif node["kind"] == "group":
+            loaders = {
+                "Columns": self._column_labels,
+                "Keys": self._key_labels,
+            }
+            load = loaders[node["group"]]
+            self._load(item, lambda db: load(db, node), self._insert_leaves)
+
+    def _load(self, item, fetch, insert):
+        """_summary_ : runs fetch(db) on a background thread against the node's connection
+                        and hands the result to insert(item, result) on the Tk thread
+        """
+        db = self.controller.db_manager
+        connection = self._nodes[item]["connection"]
+
+        def task():
+            with db.using(connection):
+                return fetch(db)
+
+        future = self._loader.submit(task)
+        self.after(self.POLL_INTERVAL, self._check_load, future, item, insert)
+
+    def _submit(self, connection: str, task, callback):
+        """_summary_ : runs task(db) on a background thread against a connection and
+                        hands the result to callback(result) on the Tk thread
+        """
+        db = self.controller.db_manager
+
+        def run():
+            with db.using(connection):
+                return task(db)
 
+        future = self._loader.submit(run)
+        self.after(self.POLL_INTERVAL, self._check_task, future, callback)
+
+    def _check_task(self, future, callback):
+        if not future.done():
+            self.after(self.POLL_INTERVAL, self._check_task, future, callback)
+            return
+        try:
+            callback(future.result())
+        except Exception as e:
+            print(f"Background task failed: {str(e)}")
+
+    def _check_load(self, future, item, insert):
+        """_summary_ : polls a background load and inserts its result once it is done
+        """
+        if not future.done():
+            self.after(self.POLL_INTERVAL, self._check_load, future, item, insert)
+            return
+        # the node may have been removed (refresh/disconnect) while loading
+        if not self.exists(item):
+            return
+        self.delete(*self.get_children(item))
+        try:
+            insert(item, future.result())
+        except Exception as e:
+            print(f"Loading {self.item(item, 'text')} failed: {str(e)}")
+
+    def _insert_schemas(self, item, schemas: list):
+        connection = self._nodes[item]["connection"]
+        for schema in schemas:
+            child = self.insert(item, index="end", text=schema)
+            self._nodes[child] = {"kind": "schema", "connection": connection, "schema": schema}
+            self._add_placeholder(child)
+
+    def _insert_tables(self, item, tables: list, start: int = 0, stop: int = None):
+        """_summary_ : inserts tables[start:stop] a batch per event loop turn, then a
+                        "load more" node if the schema has more than one page of tables
+        """
+        node = self._nodes[item]
+        if stop is None:
+            stop = min(start + self.PAGE_SIZE, len(tables))
+        end = min(start + self.INSERT_BATCH, stop)
+        for table in tables[start:end]:
+            child = self.insert(item, index="end", text=table)
+            self._nodes[child] = {"kind": "table", "connection": node["connection"],
+                                  "schema": node["schema"], "table": table}
+            self._add_placeholder(child)
+
+        if end < stop:
+            self.after(1, self._insert_tables, item, tables, end, stop)
+        elif stop < len(tables):
+            more = self.insert(item, index="end", text=f"load more ({len(tables) - stop} remaining)")
+            self._nodes[more] = {"kind": "more", "connection": node["connection"],
+                                 "parent": item, "tables": tables, "start": stop}
+
+    def _insert_groups(self, item, node):
+        """_summary_ : columns / indexes / keys nodes under a table
+        """
+        self.delete(*self.get_children(item))
+        for group in ("Columns", "Indexes", "Keys"):
+            child = self.insert(item, index="end", text=group)
+            self._nodes[child] = dict(node, kind="group", group=group, loaded=False)
+            self._add_placeholder(child)
+
+    def _insert_leaves(self, item, labels: list):
+        for label in labels or ["(none)"]:
+            self.insert(item, index="end", text=label)
+
+    def _column_labels(self, db, node) -> list:
+        return [f"{col['name']} ({col['type']})" for col in db.get_columns(node["table"], schema=node["schema"])]
+
+    def _insert_indexes(self, item, indexes: list):
+        """_summary_ : index leaves, which can be dropped from their menu
+        """
+        if not indexes:
+            self._insert_leaves(item, [])
+        for index in indexes:
+            label = (f"{index['name']} ({', '.join(str(c) for c in index['column_names'])})"
+                     + (" unique" if index.get("unique") else ""))
+            child = self.insert(item, index="end", text=label)
+            self._nodes[child] = dict(self._nodes[item], kind="index", index=index["name"])
+
+    def _key_labels(self, db, node) -> list:
+        labels = []
+        pk = db.get_pk_constraint(node["table"], schema=node["schema"])
+        if pk.get("constrained_columns"):
+            name = f"PK {pk['name']}" if pk.get("name") else "PK"
+            labels.append(f"{name} ({', '.join(pk['constrained_columns'])})")
+        for fk in db.get_foreign_keys(node["table"], schema=node["schema"]):
+            labels.append(f"FK ({', '.join(fk['constrained_columns'])}) -> "
+                          f"{fk['referred_table']}({', '.join(fk['referred_columns'])})")
+        return labels
+
+    def _load_more(self, item):
+        """_summary_ : replaces a "load more" node with the next page of tables
+        """
+        node = self._nodes.pop(item)
+        self.delete(item)
+        self._insert_tables(node["parent"], node["tables"], node["start"])
 
     def on_select(self, event):
         """_summary_ : triggers when an item is selected
@@ -125,6 +415,10 @@ class Sidebar(ttk.Treeview):
         if self.item(selected_item):
             # check if the item is a child
             if self.parent(selected_item):
-                pass
+                node = self._nodes.get(selected_item)
+                if node is not None and node["kind"] == "more":
+                    self._load_more(selected_item)
             else:
+                # database node: make its connection the active one
+                self.controller.db_manager.use(self.item(selected_item)["text"])
                 self.controller.main_view.add_tab(tab_name=self.item(selected_item)["text"], tab_type="query")
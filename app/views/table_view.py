@@ -0,0 +1,167 @@
+"""_summary_ : A result tab browsing a table page by page (keyset pagination), with a
+                bar to jump to a key value. Cells can be edited and rows deleted; the
+                edits are queued in a WriteBuffer and saved together.
+"""
+
+# import necessary modules
+import tkinter as tk
+
+from database.write_buffer import WriteBuffer
+
+from .result_grid import ResultGrid
+
+
+class TableView(tk.Frame):
+    """_summary_
+
+    Args:
+        tk (_type_): _description_
+    """
+
+    # milliseconds between checks on a page being read in the background
+    POLL_INTERVAL = 100
+
+    def __init__(self, parent, browser, db_manager=None, connection_name: str = None):
+        tk.Frame.__init__(self, parent)
+        self.controller = parent
+        self.browser = browser
+        self.buffer = None
+        # grid edits not saved yet, restored by "Discard"
+        self._unsaved_cells = []
+        self._unsaved_rows = []
+
+        bar = tk.Frame(self)
+        bar.pack(side="top", fill="x")
+        # only TableBrowser can seek; a table without a key is streamed front to back
+        key_columns = getattr(browser, "key_columns", None)
+        if key_columns:
+            tk.Label(bar, text=f"Jump to {', '.join(key_columns)}:").pack(side="left", padx=(0, 5))
+            self.key = tk.Entry(bar, width=30)
+            self.key.pack(side="left")
+            self.key.bind("<Return>", lambda event: self.seek())
+            tk.Button(bar, text="Go", command=self.seek).pack(side="left", padx=5)
+            tk.Button(bar, text="First", command=self.first).pack(side="left")
+        else:
+            tk.Label(bar, text="No primary key: rows are streamed in table order").pack(side="left")
+        self.status = tk.Label(bar, text="", anchor="e")
+        self.status.pack(side="right")
+
+        self.grid_view = ResultGrid(self)
+        self.grid_view.pack(fill="both", expand=True)
+        self._show(browser)
+
+        # only rows with a key can be written back
+        if db_manager is not None and key_columns:
+            self.buffer = WriteBuffer(db_manager, connection_name, on_flush=self._on_flush)
+            self.buffer.attach(self)
+            tk.Button(bar, text="Discard", command=self.discard).pack(side="right", padx=5)
+            tk.Button(bar, text="Save", command=self.save).pack(side="right")
+            self.grid_view.enable_editing(self._edit, self._delete)
+
+    def seek(self):
+        """_summary_ : restarts browsing at the key typed in the bar (comma separated
+                        values for a composite key)
+        """
+        text = self.key.get().strip()
+        if not text:
+            return self.first()
+        values = [value.strip() for value in text.split(",")] if len(self.browser.key_columns) > 1 else [text]
+        try:
+            self._show(self.browser.seek(tuple(values)))
+        except ValueError as e:
+            self.status.config(text=str(e))
+
+    def first(self):
+        """_summary_ : restarts browsing at the first row
+        """
+        self.key.delete(0, "end")
+        self._show(self.browser.seek(None))
+
+    def save(self):
+        """_summary_ : writes the queued edits now
+        """
+        self.buffer.flush()
+
+    def discard(self):
+        """_summary_ : drops the queued edits and shows the rows as they were
+        """
+        dropped = self.buffer.discard()
+        self.grid_view.clear_edits(self._unsaved_cells, self._unsaved_rows)
+        self._unsaved_cells, self._unsaved_rows = [], []
+        self.status.config(text=f"{dropped} edits discarded")
+
+    def _edit(self, row: int, column: int, text: str) -> bool:
+        """_summary_ : queues a cell edit as an update of its row's key, with the text
+                        converted to the column's type (empty text is NULL)
+        """
+        name = self.browser.description[column].name
+        if name in self.browser.key_columns:
+            self.status.config(text=f"{name} is part of the key and can't be edited here")
+            return False
+        values = self.grid_view.source.rows[row]
+        shown = self.grid_view.edits.get(row, {}).get(column, values[column])
+        if text == str(shown):
+            # e.g. Return on a NULL cell, shown as "None"
+            return False
+        try:
+            value = self.browser.parse_value(name, text)
+        except ValueError as e:
+            self.status.config(text=f"{name}: {str(e)}")
+            return False
+        key = self.browser.key_of(values)
+        self._unsaved_cells.append((row, column))
+        self.buffer.update(self.browser.table_name, key, {name: value})
+        self._show_pending()
+        return True
+
+    def _delete(self, row: int) -> bool:
+        """_summary_ : queues the deletion of a row
+        """
+        self._unsaved_rows.append(row)
+        self.buffer.delete(self.browser.table_name, self.browser.key_of(self.grid_view.source.rows[row]))
+        self._show_pending()
+        return True
+
+    def _on_flush(self, written: int, error: str):
+        if error is None:
+            self._unsaved_cells, self._unsaved_rows = [], []
+            self.status.config(text=f"{written} edits saved")
+        else:
+            self.status.config(text=f"Save failed, {self.buffer.pending} edits kept: {error.splitlines()[0]}")
+
+    def _show_pending(self):
+        if self.buffer.pending:
+            self.status.config(text=f"{self.buffer.pending} unsaved edits")
+
+    def _show(self, browser):
+        if self.buffer is not None and self.buffer.pending and not self.buffer.flush():
+            # keep the rows the failed edits belong to on screen
+            return
+        self._unsaved_cells, self._unsaved_rows = [], []
+        if browser is not self.browser:
+            self.browser.close()
+            self.browser = browser
+        if getattr(browser, "key_columns", None):
+            self.status.config(text=f"{browser.page_size:,} rows per page")
+            # pages arrive in the background (see _poll) instead of blocking the window
+            browser.wait = False
+            self.after(self.POLL_INTERVAL, self._poll, browser)
+        self.grid_view.set_data([column.as_dict() for column in browser.description], browser)
+
+    def _poll(self, browser):
+        """_summary_ : shows a page once it has been read, while the grid is waiting for it
+        """
+        if not self.winfo_exists() or browser is not self.browser:
+            return
+        if browser.closed and not self.grid_view.waiting:
+            return
+        if self.grid_view.waiting and not browser.loading:
+            self.grid_view.refresh()
+        self.after(self.POLL_INTERVAL, self._poll, browser)
+
+    def destroy(self):
+        if self.buffer is not None:
+            self.buffer.detach(self)
+            self.buffer.flush()
+        self.grid_view.close()
+        tk.Frame.destroy(self)
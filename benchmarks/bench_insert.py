@@ -0,0 +1,74 @@
+"""_summary_ : compares insert_record with insert_many on a local SQLite file
+
+    Run from the project root:
+        python -m benchmarks.bench_insert --rows 100000
+"""
+
+# import necessary modules
+import argparse
+import os
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+
+
+def make_rows(count: int):
+    """_summary_ : generates synthetic rows without materializing them
+    """
+    for i in range(count):
+        yield {"name": f"user_{i}", "age": i % 90, "score": i * 0.5}
+
+
+def open_db(path: str) -> DatabaseManager:
+    """_summary_ : connects to a fresh SQLite file with the benchmark table
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    db = DatabaseManager()
+    db.connect(f"sqlite:///{path}")
+    db.execute_query("CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, score REAL)")
+    db.session.commit()
+    return db
+
+
+def bench_insert_record(path: str, count: int) -> float:
+    """_summary_ : rows per second with one insert_record call (and commit) per row
+    """
+    db = open_db(path)
+    start = time.perf_counter()
+    for row in make_rows(count):
+        db.insert_record("people", row)
+    elapsed = time.perf_counter() - start
+    db.disconnect()
+    return count / elapsed
+
+
+def bench_insert_many(path: str, count: int, batch_size: int) -> float:
+    """_summary_ : rows per second with insert_many
+    """
+    db = open_db(path)
+    report = db.insert_many("people", make_rows(count), batch_size=batch_size)
+    db.disconnect()
+    return report.rows_per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--single-rows", type=int, default=5000,
+                        help="rows for the (slow) insert_record baseline")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        single = bench_insert_record(path, args.single_rows)
+        many = bench_insert_many(path, args.rows, args.batch_size)
+
+    print(f"insert_record: {single:>12,.0f} rows/s ({args.single_rows} rows)")
+    print(f"insert_many:   {many:>12,.0f} rows/s ({args.rows} rows, batch {args.batch_size})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""_summary_ : Startup benchmark: how long the app modules take to import, how long
+                until the first window is painted, and which heavy modules were
+                imported before they were needed. Every run is a fresh interpreter.
+
+    Run from the project root:
+        python -m benchmarks.startup              # report (exit status 1 if a heavy module loads eagerly)
+        python -m benchmarks.startup --repeat 10
+
+    The import and first paint timings are also cases of benchmarks.suite, so they
+    are compared with the baseline like the other benchmarks.
+"""
+
+# import necessary modules
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that must not be imported before the first window is shown
+HEAVY_MODULES = ("sqlalchemy", "numpy", "pyarrow", "pygments", "database.database_manager")
+
+_IMPORT_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import app.manager
+elapsed = time.perf_counter() - start
+print(json.dumps({"import": elapsed, "eager": [m for m in %r if m in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+_FIRST_PAINT_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app.manager import AppManager
+root = AppManager(started=started)
+
+def check():
+    if "first_paint" not in root.startup_timings:
+        root.after(5, check)
+        return
+    timings = dict(root.startup_timings, eager=[m for m in %r if m in sys.modules])
+    print(json.dumps(timings))
+    root.destroy()
+
+root.after(5, check)
+root.mainloop()
+""" % (HEAVY_MODULES,)
+
+
+def display_available() -> bool:
+    """_summary_ : True if a Tk window can be opened (X display on Linux)
+    """
+    return not sys.platform.startswith("linux") or bool(os.environ.get("DISPLAY"))
+
+
+def _run_child(args: list) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable] + args, cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+def import_timings() -> dict:
+    """_summary_ : seconds to import app.manager in a fresh interpreter
+
+    Returns:
+        dict: _description_ (e.g. {"import": 0.031, "eager": []})
+    """
+    return json.loads(_run_child(["-c", _IMPORT_SCRIPT]).stdout.strip().splitlines()[-1])
+
+
+def first_paint_timings() -> dict:
+    """_summary_ : seconds from program start to each startup milestone of AppManager
+
+    Returns:
+        dict: _description_ (e.g. {"import": 0.03, "window": 0.09, "first_paint": 0.14, "eager": []})
+    """
+    return json.loads(_run_child(["-c", _FIRST_PAINT_SCRIPT]).stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str = "app.manager", count: int = 10) -> list:
+    """_summary_ : the modules with the largest cumulative import time (python -X importtime)
+
+    Returns:
+        list: _description_ (e.g. [("app.manager", 0.028), ("tkinter", 0.010), ...])
+    """
+    stderr = _run_child(["-X", "importtime", "-c", f"import {module}"]).stderr
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((name.strip(), int(cumulative) / 1e6))
+    return sorted(timings, key=lambda item: item[1], reverse=True)[:count]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Py-Db startup benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    runs = [import_timings() for _ in range(args.repeat)]
+    print(f"{'import app.manager':<30} {statistics.median(r['import'] for r in runs) * 1000:>10.2f} ms")
+    eager = set(runs[0]["eager"])
+
+    if display_available():
+        paints = [first_paint_timings() for _ in range(args.repeat)]
+        for milestone in ("import", "window", "first_paint"):
+            seconds = statistics.median(p[milestone] for p in paints)
+            print(f"{'startup ' + milestone:<30} {seconds * 1000:>10.2f} ms")
+        eager.update(paints[0]["eager"])
+    else:
+        print("No display: first paint not measured")
+
+    print("\nSlowest imports (cumulative):")
+    for name, seconds in slowest_imports():
+        print(f"  {name:<40} {seconds * 1000:>8.2f} ms")
+
+    if eager:
+        print(f"\nREGRESSION imported before the first window: {', '.join(sorted(eager))}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
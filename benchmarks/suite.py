@@ -0,0 +1,326 @@
+"""_summary_ : Benchmark suite for DatabaseManager and result rendering.
+
+    Everything runs against SQLite (in-memory and on a temporary file), so no
+    server or network is needed. Each case is run `--repeat` times and its median
+    is compared with benchmarks/baseline.json; cases slower than the baseline by
+    more than `--threshold` are reported as regressions (exit status 1).
+
+    Run from the project root:
+        python -m benchmarks.suite                  # compare with the baseline
+        python -m benchmarks.suite --save-baseline  # record new baseline numbers
+        python -m benchmarks.suite --only insert    # cases whose name contains "insert"
+"""
+
+# import necessary modules
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from database.database_manager import DatabaseManager
+from database.resultset import ResultSet
+from . import startup
+from .bench_insert import make_rows
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# name -> function(workdir) returning the measured seconds
+CASES = {}
+
+
+def case(name: str):
+    """_summary_ : registers a benchmark case under name
+    """
+    def register(func):
+        CASES[name] = func
+        return func
+    return register
+
+
+def sqlite_url(workdir: str, kind: str) -> str:
+    """_summary_ : url of a fresh in-memory or file database
+    """
+    if kind == "memory":
+        return "sqlite://"
+    path = os.path.join(workdir, f"bench_{time.perf_counter_ns()}.db")
+    return f"sqlite:///{path}"
+
+
+def connected(url: str) -> DatabaseManager:
+    db = DatabaseManager()
+    db.connect(url)
+    return db
+
+
+def measure(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+# ---------------------------------------------------------------------------- #
+#                                  Connections                                 #
+# ---------------------------------------------------------------------------- #
+for _kind in ("memory", "file"):
+    def _connect(workdir, kind=_kind):
+        url = sqlite_url(workdir, kind)
+        db = DatabaseManager()
+        elapsed = measure(lambda: db.connect(url))
+        db.disconnect()
+        return elapsed
+    case(f"connect[{_kind}]")(_connect)
+
+
+# ---------------------------------------------------------------------------- #
+#                                   Metadata                                   #
+# ---------------------------------------------------------------------------- #
+for _count in (10, 1000, 10000):
+    def _table_names(workdir, count=_count):
+        db = connected(sqlite_url(workdir, "memory"))
+        for i in range(count):
+            db.session.execute(f"CREATE TABLE t_{i} (id INTEGER PRIMARY KEY)")
+        db.session.commit()
+        # cold lookup: the schema cache is empty, so this is the catalog round trip
+        db.refresh_schema()
+        elapsed = measure(db.get_table_names)
+        db.disconnect()
+        return elapsed
+    case(f"get_table_names[{_count} tables]")(_table_names)
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Inserts                                   #
+# ---------------------------------------------------------------------------- #
+def _people_db(workdir) -> DatabaseManager:
+    db = connected(sqlite_url(workdir, "file"))
+    db.session.execute("CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, score REAL)")
+    db.session.commit()
+    return db
+
+
+@case("insert_record[2k rows]")
+def _insert_record(workdir):
+    db = _people_db(workdir)
+    rows = list(make_rows(2000))
+    elapsed = measure(lambda: [db.insert_record("people", row) for row in rows])
+    db.disconnect()
+    return elapsed
+
+
+@case("insert_record in transaction[2k rows]")
+def _insert_record_transaction(workdir):
+    db = _people_db(workdir)
+    rows = list(make_rows(2000))
+
+    def insert():
+        with db.transaction():
+            for row in rows:
+                db.insert_record("people", row)
+    elapsed = measure(insert)
+    db.disconnect()
+    return elapsed
+
+
+@case("insert_many[100k rows]")
+def _insert_many(workdir):
+    db = _people_db(workdir)
+    elapsed = measure(lambda: db.insert_many("people", make_rows(100000), batch_size=5000))
+    db.disconnect()
+    return elapsed
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Queries                                   #
+# ---------------------------------------------------------------------------- #
+def _large_db(workdir, kind: str) -> DatabaseManager:
+    db = connected(sqlite_url(workdir, kind))
+    db.session.execute("CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, age INTEGER, score REAL)")
+    db.session.commit()
+    db.insert_many("people", make_rows(200000), batch_size=20000)
+    return db
+
+
+@case("import_file csv[200k rows]")
+def _import_file(workdir):
+    db = _people_db(workdir)
+    path = os.path.join(workdir, "people.csv")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("name,age,score\n")
+        for row in make_rows(200000):
+            file.write(f"{row['name']},{row['age']},{row['score']}\n")
+    elapsed = measure(lambda: db.import_file(path, workers=1, resume=False, quarantine=False))
+    db.disconnect()
+    return elapsed
+
+
+@case("execute_query literals[5k lookups]")
+def _lookups_literal(workdir):
+    db = _people_db(workdir)
+    db.insert_many("people", make_rows(5000))
+    elapsed = measure(lambda: [db.execute_query(f"SELECT * FROM people WHERE id = {i}") for i in range(5000)])
+    db.disconnect()
+    return elapsed
+
+
+@case("execute_query params[5k lookups]")
+def _lookups_params(workdir):
+    db = _people_db(workdir)
+    db.insert_many("people", make_rows(5000))
+    elapsed = measure(lambda: [db.execute_query("SELECT * FROM people WHERE id = :id", {"id": i})
+                               for i in range(5000)])
+    db.disconnect()
+    return elapsed
+
+
+for _kind in ("memory", "file"):
+    def _execute_query(workdir, kind=_kind):
+        db = _large_db(workdir, kind)
+        elapsed = measure(lambda: db.execute_query("SELECT * FROM people"))
+        db.disconnect()
+        return elapsed
+    case(f"execute_query[200k rows, {_kind}]")(_execute_query)
+
+    def _first_chunk(workdir, kind=_kind):
+        db = _large_db(workdir, kind)
+
+        def first_chunk():
+            stream = db.stream_query("SELECT * FROM people", chunk_size=1000)
+            stream.fetch_chunk()
+            stream.close()
+        elapsed = measure(first_chunk)
+        db.disconnect()
+        return elapsed
+    case(f"stream_query first chunk[200k rows, {_kind}]")(_first_chunk)
+
+
+# ---------------------------------------------------------------------------- #
+#                                   ResultSet                                  #
+# ---------------------------------------------------------------------------- #
+def _result_rows(count: int) -> list:
+    return [(i, f"user_{i % 500}", i % 90, None if i % 10 == 0 else i * 0.5) for i in range(count)]
+
+
+@case("ResultSet.extend[1M rows]")
+def _resultset_extend(workdir):
+    rows = _result_rows(1000000)
+
+    def build():
+        result_set = ResultSet()
+        for start in range(0, len(rows), 10000):
+            result_set.extend(rows[start:start + 10000])
+    return measure(build)
+
+
+@case("ResultSet.column_stats[1M rows]")
+def _resultset_stats(workdir):
+    result_set = ResultSet()
+    result_set.extend(_result_rows(1000000))
+    return measure(result_set.column_stats)
+
+
+# ---------------------------------------------------------------------------- #
+#                                   Rendering                                  #
+# ---------------------------------------------------------------------------- #
+for _rows in (1000, 100000):
+    def _build_tree(workdir, rows=_rows):
+        from .widgets import headless_main_view
+        view = headless_main_view()
+        columns = [{"name": name} for name in ("id", "name", "age", "score")]
+        data = [(i, f"user_{i}", i % 90, i * 0.5) for i in range(rows)]
+        return measure(lambda: view._build_tree(columns, data))
+    case(f"MainView._build_tree[{_rows} rows]")(_build_tree)
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Startup                                   #
+# ---------------------------------------------------------------------------- #
+@case("startup import[app.manager]")
+def _startup_import(workdir):
+    return startup.import_timings()["import"]
+
+
+if startup.display_available():
+    @case("startup first paint")
+    def _startup_first_paint(workdir):
+        return startup.first_paint_timings()["first_paint"]
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Runner                                    #
+# ---------------------------------------------------------------------------- #
+def run(names: list, repeat: int) -> dict:
+    """_summary_ : runs the cases and returns their median seconds
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names:
+            # keep DatabaseManager's progress prints out of the report
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings = [CASES[name](workdir) for _ in range(repeat)]
+            results[name] = statistics.median(timings)
+            print(f"{name:<45} {results[name] * 1000:>10.2f} ms", flush=True)
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list:
+    """_summary_ : names of the cases slower than baseline * (1 + threshold) and by more
+                    than min_delta seconds (so sub-millisecond jitter isn't reported)
+    """
+    regressions = []
+    for name, seconds in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        change = (seconds - reference) / reference
+        if change > threshold and seconds - reference > min_delta:
+            regressions.append(name)
+            print(f"REGRESSION {name}: {reference * 1000:.2f} ms -> {seconds * 1000:.2f} ms ({change:+.0%})")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Py-Db benchmark suite")
+    parser.add_argument("--only", default="", help="run the cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta", type=float, default=0.001,
+                        help="ignore slowdowns smaller than this many seconds")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = [name for name in CASES if args.only in name]
+    results = run(names, args.repeat)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as file:
+                baseline = json.load(file).get("results", {})
+        baseline.update(results)
+        with open(args.baseline, "w") as file:
+            json.dump({
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "results": baseline,
+            }, file, indent=2, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline first")
+        return 0
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    return 1 if compare(results, baseline, args.threshold, args.min_delta) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
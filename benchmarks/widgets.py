@@ -0,0 +1,78 @@
+"""_summary_ : MainView for rendering benchmarks, on a real (withdrawn) Tk root when a
+                display is available (e.g. under Xvfb) and on fake widgets otherwise.
+"""
+
+# import necessary modules
+import os
+
+from app.views.base import MainView
+from app.views.result_grid import RowSource, ResultGrid
+
+# rows a maximized result pane shows
+VISIBLE_ROWS = 40
+
+
+class FakeTreeview:
+    """_summary_ : records what would be sent to a ttk.Treeview
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.options = {}
+
+    def insert(self, parent="", index="end", iid=None, text="", values=()):
+        self.items[iid] = list(values)
+        return iid
+
+    def item(self, iid, values=(), tags=()):
+        self.items[iid] = list(values)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.items.pop(iid, None)
+
+    def get_children(self):
+        return tuple(self.items)
+
+    def column(self, *args, **kwargs):
+        pass
+
+    def heading(self, *args, **kwargs):
+        pass
+
+    def __setitem__(self, key, value):
+        self.options[key] = value
+
+
+class FakeScrollbar:
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+def headless_main_view() -> MainView:
+    """_summary_ : MainView whose result grid is ready for _build_tree
+    """
+    if os.environ.get("DISPLAY"):
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        view = MainView(root)
+        view._temp_result_frame()
+        view.result_grid.visible = VISIBLE_ROWS
+        return view
+
+    grid = ResultGrid.__new__(ResultGrid)
+    grid.source = RowSource()
+    grid.columns = []
+    grid.offset = 0
+    grid.visible = VISIBLE_ROWS
+    grid.edits = {}
+    grid.deleted = set()
+    grid._editor = None
+    grid.tree = FakeTreeview()
+    grid.yscrollbar = FakeScrollbar()
+    grid.pack = lambda **kwargs: None
+
+    view = MainView.__new__(MainView)
+    view.result_grid = grid
+    return view
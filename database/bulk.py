@@ -0,0 +1,465 @@
+"""_summary_ : Batched bulk inserts with dialect specific fast paths, set-based
+                updates/deletes of many rows by key, and the table import_file keeps
+                its resume offsets in
+"""
+
+# import necessary modules
+import io
+import json
+import os
+import uuid
+from functools import lru_cache
+from itertools import islice
+
+from sqlalchemy import BigInteger, Column, MetaData, String, Table, and_, bindparam, exists, or_, tuple_
+
+from .instrumentation import QUIET_ERRORS
+
+
+# bind parameter limit per statement used to size multi-values inserts
+_MAX_PARAMS = {
+    "sqlite": 999,
+    "mysql": 65535,
+}
+
+
+# positional placeholder of each DBAPI paramstyle the multi-values text is built for
+_PLACEHOLDERS = {
+    "qmark": "?",
+    "format": "%s",
+    "pyformat": "%s",
+}
+
+
+# keys per IN (...) list (Oracle allows at most 1000 expressions in one)
+MAX_IN_KEYS = 1000
+# key lists longer than this are joined through a temporary table instead of IN batches
+TEMP_TABLE_THRESHOLD = 20000
+# dialects that accept (a, b) IN ((1, 2), (3, 4)) for composite keys
+_TUPLE_IN = {"postgresql", "mysql", "sqlite", "oracle"}
+# dialects the temporary table join is used on
+_TEMP_TABLE_DIALECTS = {"postgresql", "mysql", "sqlite"}
+# name of the expanding bind parameter holding a batch of keys
+_KEYS_PARAM = "_keys"
+# table holding the committed offset of each unfinished import (see import_state_table)
+IMPORT_STATE_TABLE = "pydb_import_state"
+
+
+class BulkInsertReport:
+    """_summary_ : outcome of an insert_many call
+    """
+
+    def __init__(self, method: str):
+        self.method = method
+        self.inserted = 0
+        self.failed = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        # (row offset, error message) for every batch or row that failed
+        self.errors = []
+
+    @property
+    def rows_per_second(self) -> float:
+        """_summary_ : insert throughput over the whole call
+        """
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def __repr__(self):
+        return (f"BulkInsertReport(method={self.method!r}, inserted={self.inserted}, "
+                f"failed={self.failed}, batches={self.batches}, "
+                f"rows_per_second={self.rows_per_second:.0f})")
+
+
+def batched(rows, batch_size: int):
+    """_summary_ : yields lists of at most batch_size rows from any iterable
+
+    Args:
+        rows (iterable): rows to split
+        batch_size (int): rows per batch
+
+    Yields:
+        list: the next batch
+    """
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def choose_method(dialect) -> str:
+    """_summary_ : picks the fastest insert path available for a dialect
+
+    Args:
+        dialect (Dialect): the engine's dialect
+
+    Returns:
+        str: one of "multi_values", "copy", "fast_executemany" or "executemany"
+    """
+    if dialect.name in _MAX_PARAMS:
+        return "multi_values"
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        return "copy"
+    if dialect.driver == "pyodbc":
+        return "fast_executemany"
+    return "executemany"
+
+
+def insert_batch(connection, table, columns: list, rows: list, method: str, options: dict = None):
+    """_summary_ : writes one batch of rows using the given method
+
+    Args:
+        connection (Connection): connection the batch is written through
+        table (Table): the reflected target table
+        columns (list): column names, in the order values are taken from each row
+        rows (list): list of dicts to insert
+        method (str): value returned by choose_method
+        options (dict, optional): execution options of the insert statements. Defaults to None.
+    """
+    options = options or {}
+    if method == "multi_values":
+        _insert_multi_values(connection, table, columns, rows, options)
+    elif method == "copy":
+        _insert_copy(connection, table, columns, rows)
+    elif method == "fast_executemany":
+        _insert_fast_executemany(connection, table, columns, rows)
+    else:
+        connection.execute(table.insert().execution_options(**options), [row_dict(columns, row) for row in rows])
+
+
+def insert_isolating(connection, table, columns: list, rows: list, method: str, offset: int = 0) -> tuple:
+    """_summary_ : writes a batch inside a savepoint; if it fails, writes each half in its
+                    own savepoint, down to single rows, so only the bad rows are left out
+                    and the surrounding transaction stays usable
+
+    Args:
+        connection (Connection): connection the batch is written through (inside its transaction)
+        table (Table): the reflected target table
+        columns (list): column names, in the order values are taken from each row
+        rows (list): list of dicts to insert
+        method (str): value returned by choose_method
+        offset (int, optional): index of rows[0], used in the reported errors. Defaults to 0.
+
+    Returns:
+        tuple: (rows inserted, [(index, error message) of each rejected row])
+    """
+    try:
+        with connection.begin_nested():
+            # failures are expected here and come back as rejected rows, so the
+            # instrumentation doesn't log each halving step as a query error
+            insert_batch(connection, table, columns, rows, method, {QUIET_ERRORS: True})
+        return len(rows), []
+    except Exception as e:
+        if len(rows) == 1:
+            return 0, [(offset, str(e))]
+    middle = len(rows) // 2
+    first = insert_isolating(connection, table, columns, rows[:middle], method, offset)
+    second = insert_isolating(connection, table, columns, rows[middle:], method, offset + middle)
+    return first[0] + second[0], first[1] + second[1]
+
+
+def batch_columns(rows: list) -> list:
+    """_summary_ : every key used by any row of a batch, in order of first appearance
+
+    Args:
+        rows (list): _description_ (e.g. [{"id": 1}, {"id": 2, "v": 7}])
+
+    Returns:
+        list: _description_ (e.g. ["id", "v"])
+    """
+    return list(dict.fromkeys(name for row in rows for name in row))
+
+
+def row_dict(columns: list, row: dict) -> dict:
+    """_summary_ : normalizes a row to exactly the batch's columns (missing keys become NULL)
+    """
+    return {name: row.get(name) for name in columns}
+
+
+def write_by_keys(connection, key_columns: list, keys: list, build) -> int:
+    """_summary_ : runs an UPDATE/DELETE for a list of primary key values, as a few
+                    statements: IN (...) batches, or one join against a temporary table
+                    holding the keys when the list is long
+
+    Args:
+        connection (Connection): connection the statements run on (inside its transaction)
+        key_columns (list): primary key Column objects of the table (e.g. [users.c.id])
+        keys (list): key values, tuples for a composite key (e.g. [1, 2, 3] or [(10, 1), (10, 2)])
+        build (callable): condition -> the UPDATE/DELETE construct restricted by it
+
+    Returns:
+        int: rows affected
+    """
+    keys = _normalize_keys(key_columns, keys)
+    if not keys:
+        return 0
+    dialect = connection.dialect
+    if len(keys) > TEMP_TABLE_THRESHOLD and dialect.name in _TEMP_TABLE_DIALECTS:
+        return _write_by_temp_table(connection, key_columns, keys, build)
+
+    width = len(key_columns)
+    batch_size = max(1, min(MAX_IN_KEYS, _max_params(dialect) // width))
+    if width == 1:
+        statement = build(key_columns[0].in_(bindparam(_KEYS_PARAM, expanding=True)))
+    elif dialect.name in _TUPLE_IN:
+        statement = build(tuple_(*key_columns).in_(bindparam(_KEYS_PARAM, expanding=True)))
+    else:
+        statement = None
+
+    affected = 0
+    for batch in batched(keys, batch_size):
+        if statement is not None:
+            result = connection.execute(statement, {_KEYS_PARAM: batch})
+        else:
+            # (a = 1 AND b = 2) OR (a = 3 AND b = 4) ... where tuple IN isn't supported
+            condition = or_(*[and_(*[column == value for column, value in zip(key_columns, key)])
+                              for key in batch])
+            result = connection.execute(build(condition))
+        affected += max(result.rowcount, 0)
+    return affected
+
+
+def _normalize_keys(key_columns: list, keys: list) -> list:
+    """_summary_ : scalars for a single column key, tuples of the right width otherwise,
+                    without duplicates
+    """
+    width = len(key_columns)
+    normalized = []
+    for key in keys:
+        if width == 1:
+            normalized.append(key[0] if isinstance(key, (tuple, list)) else key)
+            continue
+        if not isinstance(key, (tuple, list)) or len(key) != width:
+            names = ", ".join(column.name for column in key_columns)
+            raise ValueError(f"expected {width} values per key ({names}), got {key!r}")
+        normalized.append(tuple(key))
+    # a key listed twice is written once
+    return list(dict.fromkeys(normalized))
+
+
+def _write_by_temp_table(connection, key_columns: list, keys: list, build) -> int:
+    """_summary_ : loads the keys into a temporary table and runs the statement once,
+                    restricted with EXISTS (SELECT 1 FROM keys WHERE keys.k = table.k)
+    """
+    keys_table = Table(
+        f"_pydb_keys_{uuid.uuid4().hex[:12]}", MetaData(),
+        # keyed so the EXISTS lookup is an index probe per row
+        *[Column(column.name, column.type, primary_key=True) for column in key_columns],
+        prefixes=["TEMPORARY"],
+    )
+    keys_table.create(connection)
+    try:
+        names = [column.name for column in key_columns]
+        rows = [dict(zip(names, key if isinstance(key, tuple) else (key,))) for key in keys]
+        for batch in batched(rows, 5000):
+            connection.execute(keys_table.insert(), batch)
+        condition = exists().where(and_(*[keys_table.c[column.name] == column for column in key_columns]))
+        return max(connection.execute(build(condition)).rowcount, 0)
+    finally:
+        try:
+            keys_table.drop(connection)
+        except Exception as e:
+            print(f"Dropping temporary key table failed: {str(e)}")
+
+
+def import_state_table(connection) -> Table:
+    """_summary_ : the table import_file records its progress in, created on first use
+
+        A chunk's rows and the offset after it are written in the same transaction,
+        so a resumed import never inserts a committed chunk twice. Rows are keyed by
+        the input's path and the target table; size and mtime_ns identify the file
+        version the offset belongs to.
+
+    Args:
+        connection (Connection): _description_ (in a transaction)
+
+    Returns:
+        Table: _description_
+    """
+    table = Table(
+        IMPORT_STATE_TABLE, MetaData(),
+        # 500 + 255 characters keep the key under MySQL's 3072 byte limit in utf8mb4
+        Column("path", String(500), primary_key=True),
+        Column("table_name", String(255), primary_key=True),
+        Column("size", BigInteger, nullable=False),
+        Column("mtime_ns", BigInteger, nullable=False),
+        Column("byte_offset", BigInteger, nullable=False),
+        Column("inserted", BigInteger, nullable=False),
+        Column("failed", BigInteger, nullable=False),
+    )
+    table.create(connection, checkfirst=True)
+    return table
+
+
+def load_import_state(connection, state_table: Table, path: str, table_name: str) -> dict:
+    """_summary_ : the committed progress of an earlier import of the same, unchanged
+                    file into the same table, or None
+
+    Returns:
+        dict: _description_ (e.g. {"offset": 83886080, "inserted": 1200000, "failed": 3})
+    """
+    stat = os.stat(path)
+    row = connection.execute(state_table.select().where(and_(
+        state_table.c.path == os.path.abspath(path), state_table.c.table_name == table_name))).first()
+    if row is None or row.size != stat.st_size or row.mtime_ns != stat.st_mtime_ns:
+        return None
+    return {"offset": row.byte_offset, "inserted": row.inserted, "failed": row.failed}
+
+
+def save_import_state(connection, state_table: Table, path: str, table_name: str,
+                      offset: int, inserted: int, failed: int):
+    """_summary_ : records that everything before offset is imported; call it in the
+                    transaction that inserted the rows, so both commit or neither does
+    """
+    stat = os.stat(path)
+    key = and_(state_table.c.path == os.path.abspath(path), state_table.c.table_name == table_name)
+    values = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "byte_offset": offset,
+              "inserted": inserted, "failed": failed}
+    if connection.execute(state_table.update().where(key).values(**values)).rowcount == 0:
+        connection.execute(state_table.insert().values(path=os.path.abspath(path), table_name=table_name, **values))
+
+
+def clear_import_state(connection, state_table: Table, path: str, table_name: str):
+    """_summary_ : forgets the progress of a finished import
+    """
+    connection.execute(state_table.delete().where(and_(
+        state_table.c.path == os.path.abspath(path), state_table.c.table_name == table_name)))
+
+
+def _max_params(dialect) -> int:
+    """_summary_ : bind parameter limit for a single statement on this dialect
+    """
+    if dialect.name == "sqlite":
+        # SQLite raised its default limit from 999 to 32766 in 3.32.0
+        version = getattr(dialect.dbapi, "sqlite_version_info", (0, 0, 0))
+        return 32766 if version >= (3, 32, 0) else 999
+    return _MAX_PARAMS.get(dialect.name, 999)
+
+
+def _insert_multi_values(connection, table, columns, rows, options: dict):
+    """_summary_ : INSERT ... VALUES (...), (...), ... sized to the bind parameter limit
+
+        The statement text depends only on the table, the columns and the number of
+        rows, so it is built once per shape (see _values_sql) and run with flattened
+        positional parameters. Compiling table.insert().values([...]) instead costs
+        far more than the insert itself, and the identical text also lets the
+        driver reuse its prepared statement.
+    """
+    dialect = connection.dialect
+    placeholder = _PLACEHOLDERS.get(dialect.paramstyle)
+    rows_per_statement = max(1, _max_params(dialect) // max(1, len(columns)))
+    if placeholder is None or not columns:
+        for chunk in batched(rows, rows_per_statement):
+            connection.execute(table.insert().values([row_dict(columns, row) for row in chunk])
+                               .execution_options(**options))
+        return
+
+    preparer = dialect.identifier_preparer
+    target = preparer.format_table(table)
+    column_list = ", ".join(preparer.quote(name) for name in columns)
+    if placeholder == "%s":
+        # the driver %-formats the text, so a literal % in a name has to be doubled
+        target, column_list = target.replace("%", "%%"), column_list.replace("%", "%%")
+    processors = [table.c[name].type.dialect_impl(dialect).bind_processor(dialect) for name in columns]
+    for chunk in batched(rows, rows_per_statement):
+        parameters = []
+        for row in chunk:
+            for name, process in zip(columns, processors):
+                value = row.get(name)
+                parameters.append(value if process is None else process(value))
+        connection.exec_driver_sql(_values_sql(target, column_list, placeholder, len(columns), len(chunk)),
+                                   tuple(parameters), execution_options=options)
+
+
+@lru_cache(maxsize=256)
+def _values_sql(target: str, column_list: str, placeholder: str, width: int, count: int) -> str:
+    """_summary_ : the text of an INSERT of count rows of width values (e.g. count=2, width=2:
+                    INSERT INTO t (a, b) VALUES (?, ?), (?, ?)); full batches and the
+                    shorter last batch of an insert each get their own cached text
+    """
+    row = "(" + ", ".join([placeholder] * width) + ")"
+    return f"INSERT INTO {target} ({column_list}) VALUES " + ", ".join([row] * count)
+
+
+def _insert_copy(connection, table, columns, rows):
+    """_summary_ : COPY ... FROM STDIN through psycopg2's copy_expert
+
+        Values go through their column type's bind processor first, as they would
+        on the executemany path (JSON is serialized, Enum and TypeDecorator columns
+        convert their values), and are then written in COPY's text forms.
+    """
+    dialect = connection.dialect
+    processors = [table.c[name].type.dialect_impl(dialect).bind_processor(dialect) for name in columns]
+    buffer = io.StringIO()
+    for row in rows:
+        fields = []
+        for name, process in zip(columns, processors):
+            value = row.get(name)
+            if process is not None:
+                value = process(value)
+            fields.append(_copy_field(value))
+        buffer.write(",".join(fields))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    preparer = connection.dialect.identifier_preparer
+    column_list = ", ".join(preparer.quote(name) for name in columns)
+    sql = (f"COPY {preparer.format_table(table)} ({column_list}) "
+           f"FROM STDIN WITH (FORMAT csv)")
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+
+
+def _copy_field(value) -> str:
+    """_summary_ : formats a value for COPY csv (unquoted empty is NULL, quoted empty is '')
+    """
+    if value is None:
+        return ""
+    return '"' + _copy_text(value).replace('"', '""') + '"'
+
+
+def _copy_text(value) -> str:
+    """_summary_ : a bound value in the text form Postgres parses: bytea as hex, lists
+                    as array literals, dicts as JSON
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\x" + bytes(value).hex()
+    if isinstance(value, (list, tuple)):
+        return _array_literal(value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return str(value)
+
+
+def _array_literal(values) -> str:
+    """_summary_ : a Postgres array literal (e.g. [1, None, 'a"b'] -> {"1",NULL,"a\\"b"})
+    """
+    elements = []
+    for value in values:
+        if value is None:
+            elements.append("NULL")
+        elif isinstance(value, (list, tuple)):
+            elements.append(_array_literal(value))
+        else:
+            text = _copy_text(value)
+            elements.append('"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"')
+    return "{" + ",".join(elements) + "}"
+
+
+def _insert_fast_executemany(connection, table, columns, rows):
+    """_summary_ : executemany with pyodbc's fast_executemany (parameter arrays)
+    """
+    compiled = table.insert().compile(dialect=connection.dialect, column_keys=columns)
+    # the placeholders follow the table's column order, not the order of `columns`
+    names = compiled.positiontup
+    cursor = connection.connection.cursor()
+    try:
+        cursor.fast_executemany = True
+        cursor.executemany(str(compiled), [tuple(row.get(name) for name in names) for row in rows])
+    finally:
+        cursor.close()
+
@@ -1,22 +1,99 @@
-from sqlalchemy import create_engine, inspect, Table, Column, MetaData
-from sqlalchemy.orm import sessionmaker
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from sqlalchemy import and_, inspect, text, types, Table, Column, Index
+from sqlalchemy.engine import make_url
+from sqlalchemy.schema import CreateIndex, DropIndex
+
+from . import bulk, explain, export, importer, index_advisor, schema_snapshot, script, sqltokens
+from .connections import ConnectionRegistry
+from .instrumentation import QueryMetrics
+from .query_result import describe
+from .query_runner import QueryRunner
+from .result_cache import ResultCache
+from .resultset import ResultSet
+from .statements import StatementCache, execute
+from .streaming import ResultStream
+from .table_browser import TableBrowser
+
+# what each backend appends to CREATE / DROP INDEX to build the index online, without
+# blocking writes to the table (Postgres uses CONCURRENTLY instead, see create_index())
+ONLINE_INDEX_OPTIONS = {
+    "mysql": " ALGORITHM=INPLACE LOCK=NONE",
+    "mssql": " WITH (ONLINE = ON)",
+    "oracle": " ONLINE",
+}
+ONLINE_DROP_INDEX_OPTIONS = {
+    "mysql": " ALGORITHM=INPLACE LOCK=NONE",
+    "oracle": " ONLINE",
+}
+
+
+def type_from_name(data_type: str):
+    """_summary_ : a SQLAlchemy type from its name, with integer arguments if given
+                    (only sqlalchemy.types classes are accepted, unlike eval())
+
+    Args:
+        data_type (str): _description_ (e.g. "Integer", "String(50)", "Numeric(10, 2)")
+
+    Returns:
+        TypeEngine: _description_ (e.g. String(length=50))
+    """
+    name, _, arguments = data_type.strip().partition("(")
+    kind = getattr(types, name.strip(), None)
+    if not (isinstance(kind, type) and issubclass(kind, types.TypeEngine)):
+        raise ValueError(f"unknown column type: {data_type}")
+    arguments = [int(argument) for argument in arguments.rstrip(") ").split(",") if argument.strip()]
+    return kind(*arguments)
+
 
 class DatabaseManager:
     """_summary_: A class to manage database connections and operations
+
+        Several named connections can be open at once. Every method works on the
+        active connection, which is switched with use() or, for a block of code on
+        the current thread only, with `with db.using(name):`.
+
+        SELECT results can be cached (opt-in, see ResultCache) by passing a
+        result_cache_size in bytes or calling set_result_cache(); writes made
+        through the manager drop the cached results of the tables they touch.
+
+        With a snapshot_dir, each connection's schema is saved to disk; on the next
+        connect the schema cache is filled from the snapshot straight away and the
+        snapshot is validated in the background, re-reflecting only changed tables.
     """
-    def __init__(self):
-        self.engine = None
-        self.session = None
-        self.metadata = MetaData()
+    def __init__(self, slow_query_threshold: float = 1.0, slow_log_path: str = None,
+                 result_cache_size: int = 0, result_cache_ttl: float = 60.0, snapshot_dir: str = None):
+        self.connections = ConnectionRegistry()
+        # statement timings, errors and slow queries of every connection
+        self.metrics = QueryMetrics(slow_query_threshold=slow_query_threshold, slow_log_path=slow_log_path)
+        # cached SELECT results of every connection (None when caching is off)
+        self.result_cache = ResultCache(result_cache_size, result_cache_ttl) if result_cache_size else None
+        self.result_cache_ttl = result_cache_ttl
+        # text() constructs of the SQL run through execute_query and the query runners
+        self.statements = StatementCache()
+        # directory of the schema snapshots (None turns them off)
+        self.snapshot_dir = snapshot_dir
+        self._snapshot_sync = ThreadPoolExecutor(max_workers=2, thread_name_prefix="schema-sync")
+        self.active_name = None
+        # per-thread override of the active connection (see using())
+        self._local = threading.local()
 
 # ---------------------------------------------------------------------------- #
 #                                  Connections                                 #
 # ---------------------------------------------------------------------------- #
-    def connect(self, db_url: str) -> bool:
+    def connect(self, db_url: str, name: str = None, **pool_options) -> bool:
         """_summary_
 
             Args:
                 db_url (_type_): _description_ (e.g. "sqlite:///database.db")
+                name (str, optional): name to register the connection under.
+                                      Defaults to the database name in the url.
+                **pool_options: pool settings overriding connections.DEFAULT_POOL_OPTIONS
+                                (pool_size, max_overflow, pool_timeout, pool_recycle, pool_pre_ping)
 
             Returns:
                 _type_: _description_
@@ -35,55 +112,231 @@ class DatabaseManager:
             print(f"db_url (no driver specified): {db_url}")
 
         try:
-            self.engine = create_engine(db_url)
-            _session = sessionmaker(bind=self.engine)
-            self.session = _session()
+            if name is None:
+                name = self._connection_name(db_url)
+            entry = self.connections.open(name, db_url, pool_options)
+            self.metrics.attach(entry)
+            if self.snapshot_dir is not None and entry.snapshot_sync is None:
+                self._load_snapshot(entry)
+            self.active_name = name
             print("Connection sucessful")
             return True
         except Exception as e:
             print(f"Failed to connect: {str(e)}")
             return False
 
-    def disconnect(self):
+    def disconnect(self, name: str = None):
         """_summary_ : Disconnects from the database
+
+        Args:
+            name (str, optional): connection to close. Defaults to the active one.
+        """
+        name = name or self.active_name
+        if name is not None:
+            self.connections.close(name)
+            self.metrics.detach(name)
+            if self.result_cache is not None:
+                self.result_cache.invalidate(name)
+        if name == self.active_name:
+            names = self.connections.names()
+            self.active_name = names[-1] if names else None
+
+    def use(self, name: str) -> bool:
+        """_summary_ : makes an open connection the active one
+
+        Args:
+            name (str): name of the connection
+
+        Returns:
+            bool: False if no connection is open under that name
+        """
+        if name not in self.connections:
+            print(f"No open connection named '{name}'")
+            return False
+        self.active_name = name
+        return True
+
+    @contextmanager
+    def using(self, name: str):
+        """_summary_ : runs a block against another open connection without changing
+                        the active one for other threads
+
+        Args:
+            name (str): name of the connection (None keeps the active one)
+        """
+        previous = getattr(self._local, "name", None)
+        self._local.name = name or previous
+        try:
+            yield self
+        finally:
+            self._local.name = previous
+
+    def connection_names(self) -> list:
+        """_summary_ : names of the open connections
+        """
+        return self.connections.names()
+
+    def pool_status(self) -> dict:
+        """_summary_ : pool occupancy and checkout wait times of the active connection
+
+        Returns:
+            dict: _description_ (e.g. {"checked_out": 1, "checkouts": 12, "avg_wait": 0.0004, ...})
         """
-        if self.session:
-            self.session.close()
-        self.engine = None
-        self.session = None
+        entry = self.active
+        return entry.pool_status() if entry is not None else {}
+
+    def export_metrics(self, path: str, fmt: str = "json") -> bool:
+        """_summary_ : writes the query metrics of every connection to a file
+
+        Args:
+            path (str): _description_ (e.g. "logs/metrics.json")
+            fmt (str, optional): "json" or "prometheus". Defaults to "json".
+
+        Returns:
+            bool: _description_
+        """
+        try:
+            self.metrics.export(path, fmt)
+            return True
+        except Exception as e:
+            print(f"Exporting metrics failed: {str(e)}")
+            return False
+
+    def query_runner(self) -> QueryRunner:
+        """_summary_ : runner executing queries on worker threads for the active connection
+
+        Returns:
+            QueryRunner: the runner (created on first use)
+        """
+        entry = self.active
+        if entry.runner is None:
+            entry.runner = QueryRunner(entry.engine, result_cache=self.result_cache, name=entry.name,
+                                       statements=self.statements, holds_writes=lambda: entry.holds_writes,
+                                       on_schema_change=lambda: self._refresh_entry(entry))
+        return entry.runner
+
+    def set_result_cache(self, enabled: bool, max_bytes: int = None) -> bool:
+        """_summary_ : turns the SELECT result cache on or off for every connection
+                        (turning it off drops everything cached)
+
+        Args:
+            enabled (bool): _description_ (e.g. True)
+            max_bytes (int, optional): bytes of results kept. Defaults to the current
+                                       size, or ResultCache's default for a new cache.
+
+        Returns:
+            bool: True if the cache is on afterwards
+        """
+        if not enabled:
+            cache = None
+        elif self.result_cache is not None and max_bytes in (None, self.result_cache.max_bytes):
+            cache = self.result_cache
+        elif max_bytes is not None:
+            cache = ResultCache(max_bytes, self.result_cache_ttl)
+        else:
+            cache = ResultCache(ttl=self.result_cache_ttl)
+        self.result_cache = cache
+        # runners created earlier keep their own reference to the cache
+        for name in self.connections.names():
+            entry = self.connections.get(name)
+            if entry is not None and entry.runner is not None:
+                entry.runner.result_cache = cache
+        return cache is not None
+
+    def cache_stats(self) -> dict:
+        """_summary_ : hit/miss counts and size of the result cache
+
+        Returns:
+            dict: _description_ (e.g. {"hits": 10, "misses": 2, "hit_rate": 0.83, ...}), {} when caching is off
+        """
+        return self.result_cache.stats() if self.result_cache is not None else {}
+
+    @property
+    def active(self):
+        """_summary_ : ConnectionEntry the methods currently work on (None when not connected)
+        """
+        return self.connections.get(getattr(self._local, "name", None) or self.active_name)
+
+    @property
+    def engine(self):
+        entry = self.active
+        return entry.engine if entry is not None else None
+
+    @property
+    def session(self):
+        entry = self.active
+        return entry.session if entry is not None else None
+
+    @property
+    def metadata(self):
+        entry = self.active
+        return entry.metadata if entry is not None else None
+
+    @property
+    def schema_cache(self):
+        entry = self.active
+        return entry.schema_cache if entry is not None else None
+
+    @property
+    def tables(self):
+        entry = self.active
+        return entry.tables if entry is not None else None
+
+    def _connection_name(self, db_url: str) -> str:
+        """_summary_ : default connection name: the database name, made unique if a
+                        different url is already open under it
+        """
+        url = make_url(db_url)
+        # file databases (SQLite) are named after the file, not its whole path
+        base = os.path.basename(url.database or "") or url.host or url.get_backend_name()
+        name, count = base, 1
+        while name in self.connections and self.connections.get(name).url != db_url:
+            count += 1
+            name = f"{base}_{count}"
+        return name
 
 # ---------------------------------------------------------------------------- #
 #                                    Metadat                                   #
 # ---------------------------------------------------------------------------- #
-    def get_table_names(self) -> list:
+    def get_schema_names(self) -> list:
+        """_summary_ : Retrieves the names of the schemas in the database
+
+        Returns:
+            list: _description_ (e.g. ["information_schema", "public"])
+        """
+        try:
+            return self._inspect("schema_names")
+        except Exception as e:
+            print(f"Failed to retrieve schema names: {str(e)}")
+            return []
+
+    def get_table_names(self, schema: str = None) -> list:
         """_summary_ : Retrieves the names of all tables in the database
 
+        Args:
+            schema (str, optional): schema to list. Defaults to None (the default schema).
+
         Returns:
             _type_: _description_
         """
         try:
-            inspector = inspect(self.engine)
-            print(f"db names: {inspector.get_table_names()}")
-            tables = inspector.get_table_names()
-            return tables
+            return self._inspect("table_names", schema=schema)
         except Exception as e:
             print(f"Failed to retrieve table names: {str(e)}")
             return []
 
-    def get_columns(self, table_name) -> list:
+    def get_columns(self, table_name, schema: str = None) -> list:
         """_summary_ : Retrieves the names of all columns in a table
 
             Args:
                 table_name (_type_): _description_
+                schema (str, optional): schema of the table. Defaults to None.
 
             Returns:
                 _type_: _description_
         """
         try:
-            inspector = inspect(self.engine)
-            # print(f"col names: {inspector.get_columns(table_name)}")
-            print(f"tbl name: {table_name}")
-            return inspector.get_columns(table_name)
+            return self._inspect("columns", table_name, schema)
         except Exception as e:
             print(f"Failed to retrieve column names: {str(e)}")
             return []
@@ -98,28 +351,188 @@ class DatabaseManager:
             _type_: _description_
         """
         try:
-            inspector = inspect(self.engine)
-            return inspector.get_columns(table_name)
+            return self._inspect("columns", table_name)
         except Exception as e:
             print(f"Failed to retrieve table details: {str(e)}")
             return []
 
+    def get_indexes(self, table_name, schema: str = None) -> list:
+        """_summary_ : Retrieves the indexes of a table
+
+        Args:
+            table_name (_type_): _description_ (e.g. "users")
+            schema (str, optional): schema of the table. Defaults to None.
+
+        Returns:
+            list: _description_ (e.g. [{"name": "ix_users_email", "column_names": ["email"], "unique": True}])
+        """
+        try:
+            return self._inspect("indexes", table_name, schema)
+        except Exception as e:
+            print(f"Failed to retrieve indexes: {str(e)}")
+            return []
+
+    def get_pk_constraint(self, table_name, schema: str = None) -> dict:
+        """_summary_ : Retrieves the primary key of a table
+
+        Args:
+            table_name (_type_): _description_ (e.g. "users")
+            schema (str, optional): schema of the table. Defaults to None.
+
+        Returns:
+            dict: _description_ (e.g. {"name": "users_pkey", "constrained_columns": ["id"]})
+        """
+        try:
+            return self._inspect("pk_constraint", table_name, schema)
+        except Exception as e:
+            print(f"Failed to retrieve primary key: {str(e)}")
+            return {}
+
+    def get_foreign_keys(self, table_name, schema: str = None) -> list:
+        """_summary_ : Retrieves the foreign keys of a table
+
+        Args:
+            table_name (_type_): _description_ (e.g. "orders")
+            schema (str, optional): schema of the table. Defaults to None.
+
+        Returns:
+            list: _description_ (e.g. [{"constrained_columns": ["user_id"], "referred_table": "users", ...}])
+        """
+        try:
+            return self._inspect("foreign_keys", table_name, schema)
+        except Exception as e:
+            print(f"Failed to retrieve foreign keys: {str(e)}")
+            return []
+
     def get_db_and_table_names(self) -> dict:
-        """_summary_
+        """_summary_ : table names of every open connection
 
             Returns:
-                dict: _description_
+                dict: _description_ (e.g. {"db_prime": ["users", "orders"]})
         """
         try:
-            inspector = inspect(self.engine)
-            # tbl_names = inspector.get_table_names()
-            return {
-                self.engine.url.database: inspector.get_table_names()
-            }
+            children = {}
+            for name in self.connections.names():
+                with self.using(name):
+                    children[name] = self._inspect("table_names")
+            return children
         except Exception as e:
             print(f"Failed to retrieve database and table names: {str(e)}")
             return {}
 
+    def refresh_schema(self, table_name: str = None):
+        """_summary_ : drops cached schema data (and cached results) so the next lookup
+                        goes to the server
+
+        Args:
+            table_name (str, optional): only refresh this table. Defaults to None (everything).
+        """
+        if self.active is None:
+            return
+        self._refresh_entry(self.active, table_name)
+
+    def _refresh_entry(self, entry, table_name: str = None):
+        """_summary_ : refresh_schema() for a given connection (e.g. a runner's, from its worker thread)
+        """
+        entry.schema_cache.invalidate(table_name)
+        entry.tables.invalidate(table_name)
+        if self.result_cache is not None:
+            self.result_cache.invalidate(entry.name, None if table_name is None else [table_name])
+
+    def sync_snapshot(self, name: str = None) -> set:
+        """_summary_ : brings a connection's schema snapshot up to date, re-reflecting
+                        (in parallel) only the tables that changed, and saves it
+
+        Args:
+            name (str, optional): connection to sync. Defaults to the active one.
+
+        Returns:
+            set: _description_ (e.g. {"users"}: tables added, changed or dropped since the last snapshot)
+        """
+        entry = self.connections.get(name) if name is not None else self.active
+        if entry is None:
+            return set()
+        try:
+            generation = entry.schema_cache.generation
+            snapshot, changed = schema_snapshot.update_snapshot(entry.engine, entry.snapshot, entry.url)
+            # DDL made while the catalog was read (e.g. create_table) may postdate the snapshot
+            current = entry.schema_cache.generation == generation
+            if entry.snapshot is not None:
+                for table_name in changed:
+                    self._refresh_entry(entry, table_name)
+            if current:
+                generation = entry.schema_cache.generation
+                for key, value in schema_snapshot.cache_entries(snapshot, entry.engine.dialect).items():
+                    if not entry.schema_cache.set_if_current(key, value, generation):
+                        break
+            entry.snapshot = snapshot
+            if self.snapshot_dir is not None:
+                schema_snapshot.save_snapshot(
+                    schema_snapshot.snapshot_path(self.snapshot_dir, entry.name, entry.url), snapshot)
+            return changed
+        except Exception as e:
+            print(f"Schema snapshot sync failed: {str(e)}")
+            return set()
+
+    def snapshot_sync(self, name: str = None):
+        """_summary_ : the background validation started when a connection was opened
+
+        Args:
+            name (str, optional): connection. Defaults to the active one.
+
+        Returns:
+            Future: resolves to the set of changed tables (None without snapshots)
+        """
+        entry = self.connections.get(name) if name is not None else self.active
+        return entry.snapshot_sync if entry is not None else None
+
+    def _load_snapshot(self, entry):
+        """_summary_ : fills a new connection's schema cache from its snapshot on disk
+                        and starts validating the snapshot in the background
+        """
+        snapshot = schema_snapshot.load_snapshot(
+            schema_snapshot.snapshot_path(self.snapshot_dir, entry.name, entry.url))
+        if snapshot is not None:
+            for key, value in schema_snapshot.cache_entries(snapshot, entry.engine.dialect).items():
+                entry.schema_cache.set(key, value)
+            entry.snapshot = snapshot
+        entry.snapshot_sync = self._snapshot_sync.submit(self.sync_snapshot, entry.name)
+
+    def _invalidate_results(self, table_name: str = None):
+        """_summary_ : drops the active connection's cached results that read table_name
+        """
+        if self.result_cache is not None:
+            self.result_cache.invalidate(self.active.name, None if table_name is None else [table_name])
+
+    def _forget_table(self, table_name):
+        """_summary_ : removes a dropped table from every cache and the shared metadata
+        """
+        self.refresh_schema(table_name)
+        if table_name in self.metadata.tables:
+            self.metadata.remove(self.metadata.tables[table_name])
+
+    def _inspect(self, kind: str, table_name: str = None, schema: str = None):
+        """_summary_ : runs inspector.get_<kind>() through the schema cache
+
+        Args:
+            kind (str): inspector lookup (e.g. "columns" for get_columns)
+            table_name (str, optional): table the lookup is about. Defaults to None.
+            schema (str, optional): schema of the table or listing. Defaults to None.
+        """
+        def load():
+            inspector = inspect(self.engine)
+            method = getattr(inspector, f"get_{kind}")
+            if kind == "schema_names":
+                return method()
+            # name the default schema implicitly, as some dialects (e.g. SQLite's temp
+            # table lookups) don't expect it to be spelled out
+            lookup_schema = None if schema == inspector.default_schema_name else schema
+            if table_name is None:
+                return method(schema=lookup_schema)
+            return method(table_name, schema=lookup_schema)
+
+        return self.schema_cache.get((kind, table_name, schema), load)
+
 # ---------------------------------------------------------------------------- #
 #                                    Tables                                    #
 # ---------------------------------------------------------------------------- #
@@ -128,14 +541,14 @@ class DatabaseManager:
 
             Args:
                 table_name (_type_): _description_ (e.g. "users")
-                column_details (_type_): _description_ (e.g. [("id", "Integer", "NOT NULL"), ("name", "String", "NULL")])
+                column_details (_type_): _description_ (e.g. [("id", "Integer", "NOT NULL"), ("name", "String(50)", "NULL")])
 
             Returns:
                 _type_: _description_ (e.g. True)
         """
         try:
             columns = [
-                Column(name, eval(data_type), nullable=constraint.lower() == 'nullable')
+                Column(name, type_from_name(data_type), nullable=constraint.lower() == 'nullable')
                 for name, data_type, constraint in column_details
             ]
 
@@ -145,6 +558,7 @@ class DatabaseManager:
                 *columns
             )
             table.create(self.engine)
+            self.refresh_schema(table_name)
             return True
         except Exception as e:
             print(f"Table creation failed: {str(e)}")
@@ -160,8 +574,9 @@ class DatabaseManager:
             bool: _description_
         """
         try:
-            table = Table(table_name, self.metadata, autoload=True, autoload_with=self.engine)
+            table = self.tables.get(table_name)
             table.drop(self.engine)
+            self._forget_table(table_name)
             return True
         except Exception as e:
             print(f"Table dropping failed: {str(e)}")
@@ -177,20 +592,27 @@ class DatabaseManager:
             bool: _description_
         """
         try:
-            self.metadata.reflect(only=[table_name], views=True)
+            self.metadata.reflect(bind=self.engine, only=[table_name], views=True)
             return True
         except Exception as e:
             print(f"Reflecting table failed: {str(e)}")
             return False
 
-    def refresh_metadata(self) -> bool:
-        """_summary_
+    def refresh_metadata(self, max_workers: int = 4) -> bool:
+        """_summary_ : reflects every table and view into the metadata, several at a
+                        time over pooled connections
+
+        Args:
+            max_workers (int, optional): tables reflected at once. Defaults to 4.
 
         Returns:
             bool: _description_
         """
         try:
-            self.metadata.reflect(views=True)
+            inspector = inspect(self.engine)
+            names = inspector.get_table_names() + inspector.get_view_names()
+            schema_snapshot.reflect_metadata(self.engine, self.metadata, names, max_workers=max_workers)
+            self.refresh_schema()
             return True
         except Exception as e:
             print(f"Refreshing metadata failed: {str(e)}")
@@ -205,20 +627,21 @@ class DatabaseManager:
         Args:
             table_name (_type_): _description_ (e.g. "users")
             column_name (_type_): _description_ (e.g. "name")
-            column_type (_type_): _description_ (e.g. "String")
+            column_type (_type_): _description_ (e.g. "String" or "String(50)")
             nullable (bool, optional): _description_. Defaults to True. (e.g. True)
 
         Returns:
             bool: _description_
         """
         try:
-            table = Table(table_name, self.metadata, autoload=True, autoload_with=self.engine)
+            table = self.tables.get(table_name)
 
             # Check if the column already exists
             if column_name not in table.columns:
-                new_column = Column(column_name, eval(column_type), nullable=nullable)
+                new_column = Column(column_name, type_from_name(column_type), nullable=nullable)
                 new_column.create(table)
                 self.metadata.create_all(self.engine)
+                self.refresh_schema(table_name)
                 return True
             else:
                 print(f"Column '{column_name}' already exists in table '{table_name}'.")
@@ -238,12 +661,13 @@ class DatabaseManager:
             bool: _description_
         """
         try:
-            table = Table(table_name, self.metadata, autoload=True, autoload_with=self.engine)
+            table = self.tables.get(table_name)
 
             # Check if the column exists
             if column_name in table.columns:
                 table.c[column_name].drop()
                 self.metadata.create_all(self.engine)
+                self.refresh_schema(table_name)
                 return True
             else:
                 print(f"Column '{column_name}' does not exist in table '{table_name}'.")
@@ -252,28 +676,518 @@ class DatabaseManager:
             print(f"Removing column failed: {str(e)}")
             return False
 
+# ---------------------------------------------------------------------------- #
+#                                    Indexes                                   #
+# ---------------------------------------------------------------------------- #
+    def list_indexes(self, table_name: str = None, schema: str = None) -> list:
+        """_summary_ : the indexes of a table, or of every table of a schema
+
+        Args:
+            table_name (str, optional): _description_ (e.g. "users"). Defaults to None (every table).
+            schema (str, optional): schema of the tables. Defaults to None.
+
+        Returns:
+            list: _description_ (e.g. [{"table": "users", "name": "ix_users_email",
+                  "column_names": ["email"], "unique": True}])
+        """
+        tables = [table_name] if table_name is not None else self.get_table_names(schema)
+        indexes = []
+        for table in tables:
+            for index in self.get_indexes(table, schema):
+                indexes.append(dict(index, table=table))
+        return indexes
+
+    def create_index(self, table_name, columns, name: str = None, unique: bool = False,
+                     online: bool = True) -> bool:
+        """_summary_ : creates an index, online where the backend can
+
+            online builds use CREATE INDEX CONCURRENTLY on Postgres (outside of a
+            transaction), ALGORITHM=INPLACE LOCK=NONE on MySQL, and ONLINE on SQL
+            Server and Oracle editions that support it; other backends build it
+            the usual way.
+
+        Args:
+            table_name (_type_): _description_ (e.g. "users")
+            columns (str | list): _description_ (e.g. ["last_name", "first_name"])
+            name (str, optional): _description_ (e.g. "ix_users_name"). Defaults to ix_<table>_<columns>.
+            unique (bool, optional): _description_. Defaults to False.
+            online (bool, optional): build without blocking writes. Defaults to True.
+
+        Returns:
+            bool: _description_
+        """
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        name = name or index_advisor.index_name(table_name, columns)
+        concurrently = online and self.engine.dialect.name == "postgresql"
+        try:
+            table = self.tables.get(table_name)
+            missing = [column for column in columns if column not in table.columns]
+            if missing:
+                print(f"Column '{missing[0]}' does not exist in table '{table_name}'.")
+                return False
+            index = Index(name, *[table.c[column] for column in columns], unique=unique,
+                          postgresql_concurrently=concurrently)
+            statement = str(CreateIndex(index).compile(dialect=self.engine.dialect))
+            if online:
+                statement += ONLINE_INDEX_OPTIONS.get(self.engine.dialect.name, "")
+            self._execute_ddl(statement, autocommit=concurrently)
+            return True
+        except Exception as e:
+            print(f"Creating index failed: {str(e)}")
+            if concurrently:
+                self._drop_invalid_index(name, table_name)
+            return False
+        finally:
+            self.refresh_schema(table_name)
+
+    def drop_index(self, index_name, table_name, online: bool = True) -> bool:
+        """_summary_ : drops an index, online where the backend can (see create_index())
+
+        Args:
+            index_name (_type_): _description_ (e.g. "ix_users_email")
+            table_name (_type_): _description_ (e.g. "users")
+            online (bool, optional): drop without blocking the table. Defaults to True.
+
+        Returns:
+            bool: _description_
+        """
+        concurrently = online and self.engine.dialect.name == "postgresql"
+        try:
+            table = self.tables.get(table_name)
+            index = next((index for index in table.indexes if index.name == index_name), None)
+            if index is None:
+                print(f"Index '{index_name}' does not exist on table '{table_name}'.")
+                return False
+            index.dialect_options["postgresql"]["concurrently"] = concurrently
+            statement = str(DropIndex(index).compile(dialect=self.engine.dialect))
+            if online:
+                statement += ONLINE_DROP_INDEX_OPTIONS.get(self.engine.dialect.name, "")
+            self._execute_ddl(statement, autocommit=concurrently)
+            return True
+        except Exception as e:
+            print(f"Dropping index failed: {str(e)}")
+            return False
+        finally:
+            self.refresh_schema(table_name)
+
+    def suggest_indexes(self, statements: list = None, max_columns: int = 3) -> list:
+        """_summary_ : candidate indexes for the slow queries of the active connection
+
+            Each slow statement is explained; the columns it filters and joins on are
+            suggested for the tables its plan scans in full, unless an index or the
+            primary key already starts with them. Statements with bind parameters
+            can't be explained and are advised on from their text alone.
+
+        Args:
+            statements (list, optional): _description_ (e.g. ["SELECT ..."]). Defaults to the slow-query log.
+            max_columns (int, optional): longest suggested index. Defaults to 3.
+
+        Returns:
+            list: _description_ (e.g. [IndexSuggestion("orders", ["user_id"], "full scan in 2 slow statements (3.10 s)")])
+        """
+        if self.active is None:
+            return []
+        if statements is None:
+            statements = [query for query in self.metrics.slow_queries if query["connection"] == self.active.name]
+
+        # catalog tables (e.g. sqlite_master) aren't advised on
+        user_tables = set(self.get_table_names())
+
+        def existing_indexes(table):
+            indexes = [index["column_names"] for index in self.get_indexes(table)]
+            primary_key = self.get_pk_constraint(table).get("constrained_columns")
+            return indexes + [primary_key] if primary_key else indexes
+
+        try:
+            return index_advisor.suggest_indexes(
+                statements,
+                explain_plan=self.explain_query,
+                existing_indexes=existing_indexes,
+                columns_of=lambda table: [column["name"] for column in self.get_columns(table)]
+                if table in user_tables else [],
+                max_columns=max_columns,
+            )
+        except Exception as e:
+            print(f"Suggesting indexes failed: {str(e)}")
+            return []
+
+    def _drop_invalid_index(self, index_name, table_name):
+        """_summary_ : drops the invalid index a failed CREATE INDEX CONCURRENTLY leaves
+                        behind on Postgres (an index of that name that is valid, or on
+                        another table, is left alone)
+        """
+        try:
+            with self.engine.connect() as connection:
+                invalid = connection.execute(text(
+                    "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                    "WHERE c.relname = :index_name AND i.indrelid = CAST(:table_name AS regclass) "
+                    "AND NOT i.indisvalid"
+                ), {"index_name": index_name, "table_name": table_name}).first()
+            if invalid is not None:
+                quote = self.engine.dialect.identifier_preparer.quote
+                self._execute_ddl(f"DROP INDEX CONCURRENTLY IF EXISTS {quote(index_name)}", autocommit=True)
+        except Exception as e:
+            print(f"Dropping invalid index failed: {str(e)}")
+
+    def _execute_ddl(self, statement: str, autocommit: bool = False):
+        """_summary_ : runs a DDL statement in its own transaction, or with autocommit
+                        for statements that can't run inside one (CREATE INDEX CONCURRENTLY)
+        """
+        if autocommit:
+            with self.engine.connect() as connection:
+                connection.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql(statement)
+        else:
+            with self.engine.begin() as connection:
+                connection.exec_driver_sql(statement)
+
+# ---------------------------------------------------------------------------- #
+#                                 Transactions                                 #
+# ---------------------------------------------------------------------------- #
+    @contextmanager
+    def transaction(self):
+        """_summary_ : groups writes of the active connection into one transaction
+
+            The outermost block commits once at the end (with anything still pending
+            from manual mode); a block opened inside another is a savepoint. Inside a
+            block, a write method that fails raises instead of returning False, and
+            the exception leaving a block rolls back to where that block began: the
+            savepoint for a nested block, everything for the outermost one.
+
+                with db.transaction():
+                    db.insert_record("orders", {...})
+                    with db.transaction():      # savepoint
+                        db.update_many("stock", {...}, keys=[...])
+
+        Yields:
+            DatabaseManager: self
+        """
+        entry = self.active
+        session = entry.session
+        nested = session.begin_nested() if entry.transaction_depth else None
+        entry.transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            if nested is not None:
+                nested.rollback()
+            else:
+                session.rollback()
+                # cached results may have been read from the rolled back changes
+                self._invalidate_results()
+            raise
+        else:
+            if nested is not None:
+                nested.commit()
+            else:
+                session.commit()
+        finally:
+            entry.transaction_depth -= 1
+
+    @property
+    def in_transaction(self) -> bool:
+        """_summary_ : True inside a transaction() block of the active connection
+        """
+        return self.active is not None and self.active.transaction_depth > 0
+
+    @property
+    def autocommit(self) -> bool:
+        """_summary_ : the active connection's commit mode (True: each write commits)
+        """
+        return self.active.autocommit
+
+    def set_autocommit(self, enabled: bool, name: str = None) -> bool:
+        """_summary_ : switches a connection between autocommit and manual mode
+
+            In manual mode writes stay pending until commit() or rollback(); a failed
+            write only undoes itself (each write runs in a savepoint). Switching back
+            to autocommit commits whatever is pending. Manual mode covers the manager's
+            own write methods only: statements run through query_runner() commit on
+            their own, so the runner refuses those that write while manual mode is on.
+
+        Args:
+            enabled (bool): _description_ (e.g. False for manual mode)
+            name (str, optional): connection name. Defaults to the active connection.
+
+        Returns:
+            bool: _description_
+        """
+        with self.using(name):
+            entry = self.active
+            if entry is None:
+                print("Setting commit mode failed: no active connection")
+                return False
+            if entry.transaction_depth:
+                print("Setting commit mode failed: a transaction is open")
+                return False
+            if enabled and not entry.autocommit and not self.commit():
+                return False
+            entry.autocommit = enabled
+            return True
+
+    def commit(self) -> bool:
+        """_summary_ : commits the pending writes of the active connection (manual mode)
+
+        Returns:
+            bool: _description_
+        """
+        try:
+            self.session.commit()
+            return True
+        except Exception as e:
+            print(f"Commit failed: {str(e)}")
+            self.rollback()
+            return False
+
+    def rollback(self) -> bool:
+        """_summary_ : discards the pending writes of the active connection (manual mode)
+
+        Returns:
+            bool: _description_
+        """
+        try:
+            self.session.rollback()
+            self._invalidate_results()
+            return True
+        except Exception as e:
+            print(f"Rollback failed: {str(e)}")
+            return False
+
+    @contextmanager
+    def _writing(self):
+        """_summary_ : runs one write method's statements the way the connection commits:
+                        committed on their own in autocommit mode, left pending in a
+                        savepoint in manual mode, and as part of the block inside
+                        transaction(); a failure rolls back only the write itself
+        """
+        entry = self.active
+        session = entry.session
+        if entry.transaction_depth:
+            yield session
+        elif entry.autocommit:
+            try:
+                yield session
+                session.commit()
+            except BaseException:
+                session.rollback()
+                raise
+        else:
+            savepoint = session.begin_nested()
+            try:
+                yield session
+                savepoint.commit()
+            except BaseException:
+                savepoint.rollback()
+                raise
+
+    def _write_failed(self, message: str, error: Exception):
+        """_summary_ : reports a failed write, or raises it inside transaction() so the
+                        block rolls back
+        """
+        if self.in_transaction:
+            raise error
+        print(f"{message}: {str(error)}")
+
 # ---------------------------------------------------------------------------- #
 #                                     CRUD                                     #
 # ---------------------------------------------------------------------------- #
-    def execute_query(self, query) -> list:
+    def execute_query(self, query, params=None) -> ResultSet:
         """_summary_
 
+            SQL text is run as a cached text() construct, so running it again with other
+            :name parameters reuses the compiled statement (and the driver's prepared one)
+            instead of sending a new statement with the values written into it.
+
             Args:
-                query (_type_): _description_ (e.g. "SELECT * FROM users")
+                query (_type_): _description_ (e.g. "SELECT * FROM users WHERE id = :id")
+                params (dict | list, optional): values of the :name parameters (e.g. {"id": 7}), or a
+                                                list of such dicts to run the statement once per dict
+                                                in one executemany call. Defaults to None.
 
             Returns:
-                list: _description_
+                ResultSet: the rows, stored column by column, with their names and types
+                           (taken from the cursor, no catalog lookup), None if nothing was returned
         """
+        sql = query if isinstance(query, str) else None
+        if sql is not None:
+            query = self.statements.get(sql)
+        # an executemany never returns rows worth caching
+        cache = self.result_cache if sql is not None and not isinstance(params, (list, tuple)) else None
         try:
-            result = self.session.execute(query)
-            if result.returns_rows:
-                return result.fetchall()
-            else:
-                return None
+            key = cache.key(self.active.name, sql, params) if cache is not None else None
+            if key is not None:
+                cached = cache.get(key)
+                if cached is not None:
+                    return cached.rows
+            with self._writing() as session:
+                result = execute(session, query, params)
+                # by statement kind: INSERT ... RETURNING returns rows and still writes
+                if self.result_cache is not None and sql is not None and not sqltokens.is_read_only(sql):
+                    self.result_cache.invalidate_for(self.active.name, sql)
+                # DDL: table listings and reflected tables (used by insert_record ...) are stale
+                if sql is not None and sqltokens.changes_schema(sql):
+                    self.refresh_schema()
+                if result.returns_rows:
+                    description = describe(result)
+                    rows = ResultSet.from_result(result, description)
+                    if key is not None:
+                        cache.put(key, description, rows)
+                    return rows
+                else:
+                    return None
+        except Exception as e:
+            self._write_failed("Query execution failed", e)
+            return None
+
+    def explain_query(self, query: str, analyze: bool = False):
+        """_summary_ : the query plan of a statement, in the dialect's EXPLAIN form
+
+        Args:
+            query (str): _description_ (e.g. "SELECT * FROM users WHERE email = 'a@b.c'")
+            analyze (bool, optional): execute the statement (in a transaction that is
+                                      rolled back) for actual rows and times. Defaults to False.
+
+        Returns:
+            QueryPlan: the plan tree, or None if it couldn't be explained
+        """
+        try:
+            with self.engine.connect() as connection:
+                return explain.explain(connection, query, analyze)
+        except Exception as e:
+            print(f"Explain failed: {str(e)}")
+            return None
+
+    def stream_query(self, query, chunk_size: int = 1000, limit: int = None, memory_budget: int = None):
+        """_summary_ : executes a query with a server-side cursor and returns a stream
+                        that fetches the rows chunk by chunk instead of all at once
+
+        Args:
+            query (str): _description_ (e.g. "SELECT * FROM users")
+            chunk_size (int, optional): rows per chunk (and per driver fetch). Defaults to 1000.
+            limit (int, optional): maximum rows fetched. Defaults to None.
+            memory_budget (int, optional): approximate bytes fetched before stopping. Defaults to None.
+
+        Returns:
+            ResultStream: the stream, on its own pooled connection (call close() to stop
+                          early and return it), or None if execution failed
+        """
+        # a connection of its own: a commit of the session (e.g. by a write made while
+        # the stream is being read) would otherwise close the cursor under it
+        connection = None
+        try:
+            connection = self.engine.connect()
+            result = connection.execution_options(
+                stream_results=True, max_row_buffer=chunk_size
+            ).execute(self.statements.get(query))
+            return ResultStream(result, chunk_size=chunk_size, limit=limit, memory_budget=memory_budget,
+                                connection=connection)
         except Exception as e:
             print(f"Query execution failed: {str(e)}")
+            if connection is not None:
+                connection.close()
+            return None
+
+    def browse_table(self, table_name, schema: str = None, page_size: int = 500, start=None):
+        """_summary_ : pages through a table with keyset pagination on its primary key
+
+            Each page is read with "WHERE key > last key ORDER BY key LIMIT page_size",
+            so every page costs the same however far into the table it is, and the
+            next page is prefetched in the background. Tables without a primary key
+            use a unique index on not-null columns; tables with neither are streamed
+            with a server-side cursor instead (forward only, no seek).
+
+        Args:
+            table_name (_type_): _description_ (e.g. "users")
+            schema (str, optional): schema of the table. Defaults to None.
+            page_size (int, optional): rows per page. Defaults to 500.
+            start (tuple, optional): key to start at (e.g. (1000,)). Defaults to the first row.
+
+        Returns:
+            TableBrowser | ResultStream: the pages (call close() to stop early), or None on failure
+        """
+        try:
+            columns = self.get_columns(table_name, schema)
+            if not columns:
+                print(f"Table '{table_name}' has no columns to browse.")
+                return None
+            key = self._browse_key(table_name, schema, columns)
+            if key:
+                return TableBrowser(self.engine, table_name, columns, key, schema=schema,
+                                    page_size=page_size, start=start)
+        except Exception as e:
+            print(f"Browsing table failed: {str(e)}")
+            return None
+
+        preparer = self.engine.dialect.identifier_preparer
+        name = preparer.quote(table_name)
+        if schema:
+            name = f"{preparer.quote_schema(schema)}.{name}"
+        return self.stream_query(f"SELECT * FROM {name}", chunk_size=page_size)
+
+    def _browse_key(self, table_name, schema: str, columns: list) -> list:
+        """_summary_ : the columns a table is paged by: its primary key, else the
+                        shortest unique index on not-null columns, else []
+        """
+        primary_key = self.get_pk_constraint(table_name, schema).get("constrained_columns")
+        if primary_key:
+            return primary_key
+        not_null = {col["name"] for col in columns if not col.get("nullable", True)}
+        unique = [index["column_names"] for index in self.get_indexes(table_name, schema)
+                  if index.get("unique") and all(name in not_null for name in index["column_names"])]
+        return min(unique, key=len) if unique else []
+
+    def export_query(self, query, path: str, fmt: str = None, chunk_size: int = 5000) -> int:
+        """_summary_ : streams a query's result to a CSV, JSONL or Parquet file without
+                        holding more than one chunk in memory
+
+        Args:
+            query (str): _description_ (e.g. "SELECT * FROM users")
+            path (str): _description_ (e.g. "exports/users.csv")
+            fmt (str, optional): "csv", "jsonl" or "parquet". Defaults to the path's extension.
+            chunk_size (int, optional): rows per fetched chunk. Defaults to 5000.
+
+        Returns:
+            int: rows written, or None if the export failed
+        """
+        stream = self.stream_query(query, chunk_size=chunk_size)
+        if stream is None:
+            return None
+        try:
+            return export.export_stream(stream, path, fmt)
+        except Exception as e:
+            print(f"Export failed: {str(e)}")
             return None
 
+    def execute_script(self, sql_script: str, mode: str = "transaction", batch_size: int = 100,
+                       stop_on_error: bool = True, row_limit: int = None):
+        """_summary_ : splits a script into statements and runs them in one pass
+
+        Args:
+            sql_script (str): _description_ (e.g. "CREATE TABLE a (id int); INSERT INTO a VALUES (1);")
+            mode (str, optional): "transaction" (all or nothing) or "batch" (a commit every
+                                  batch_size statements); a script with its own BEGIN / COMMIT
+                                  commits where it says instead. Defaults to "transaction".
+            batch_size (int, optional): statements per commit in "batch" mode. Defaults to 100.
+            stop_on_error (bool, optional): stop at the first failed statement. Defaults to True.
+            row_limit (int, optional): rows kept per row-returning statement. Defaults to None.
+
+        Returns:
+            ScriptReport: per-statement timing, row counts and rows, or None if the script couldn't run
+        """
+        try:
+            with self.engine.connect() as connection:
+                report = script.run_statements(connection, script.split_script(sql_script), mode, batch_size,
+                                               stop_on_error=stop_on_error, row_limit=row_limit)
+        except Exception as e:
+            print(f"Script execution failed: {str(e)}")
+            return None
+        if self.result_cache is not None:
+            for result in report.results:
+                if result.error is None:
+                    self.result_cache.invalidate_for(self.active.name, result.sql)
+        if any(result.kind in sqltokens.SCHEMA_KINDS and result.committed for result in report.results):
+            self.refresh_schema()
+        return report
+
     def insert_record(self, table_name, data) -> bool:
         """_summary_
 
@@ -285,32 +1199,243 @@ class DatabaseManager:
             bool: _description_
         """
         try:
-            table = Table(table_name, self.metadata, autoload=True, autoload_with=self.engine)
-            self.session.execute(table.insert().values(data))
-            self.session.commit()
+            with self._writing() as session:
+                session.execute(self.tables.insert(table_name, data), data)
+            self._invalidate_results(table_name)
             return True
         except Exception as e:
-            print(f"Record insertion failed: {str(e)}")
+            self._write_failed("Record insertion failed", e)
             return False
 
+    def insert_many(self, table_name, rows, batch_size: int = 5000, on_error: str = "isolate"):
+        """_summary_ : streams rows into a table in batches, committing once per batch
+                        (in autocommit mode; see transaction() and set_autocommit())
+
+        The columns of each batch are every key used by any of its rows; a row
+        without one of them writes NULL there. Each batch goes through the fastest path the
+        dialect offers (multi-values INSERT, COPY FROM STDIN or fast_executemany).
+
+        Args:
+            table_name (str): name of the table (e.g. "users")
+            rows (iterable): dicts to insert, consumed lazily (e.g. a generator)
+            batch_size (int, optional): rows per batch and commit. Defaults to 5000.
+            on_error (str, optional): what to do when a batch fails. Defaults to "isolate".
+                "isolate" retries the batch row by row and records only the bad rows,
+                "skip" drops the whole batch and carries on,
+                "stop" stops at the failed batch.
+
+        Returns:
+            BulkInsertReport: rows inserted/failed, errors and rows per second
+        """
+        report = bulk.BulkInsertReport(method="executemany")
+        try:
+            table = self.tables.get(table_name)
+            report.method = bulk.choose_method(self.engine.dialect)
+        except Exception as e:
+            print(f"Bulk insertion failed: {str(e)}")
+            report.errors.append((0, str(e)))
+            return report
+
+        start = time.perf_counter()
+        offset = 0
+        for batch in bulk.batched(rows, batch_size):
+            columns = bulk.batch_columns(batch)
+            try:
+                with self._writing() as session:
+                    bulk.insert_batch(session.connection(), table, columns, batch, report.method)
+                report.inserted += len(batch)
+            except Exception as e:
+                if self.in_transaction:
+                    # the whole transaction() block rolls back
+                    raise
+                if on_error == "isolate":
+                    self._insert_rows_one_by_one(table, columns, batch, offset, report)
+                else:
+                    report.errors.append((offset, str(e)))
+                    report.failed += len(batch)
+                    if on_error == "stop":
+                        break
+            report.batches += 1
+            offset += len(batch)
+
+        report.elapsed = time.perf_counter() - start
+        if report.inserted:
+            self._invalidate_results(table_name)
+        print(f"Inserted {report.inserted} rows into {table_name} "
+              f"({report.rows_per_second:.0f} rows/s, {report.failed} failed)")
+        return report
+
+    def _insert_rows_one_by_one(self, table, columns, batch, offset, report):
+        """_summary_ : retries a failed batch row by row so only the bad rows are lost
+        """
+        for i, row in enumerate(batch):
+            try:
+                with self._writing() as session:
+                    session.execute(table.insert(), bulk.row_dict(columns, row))
+                report.inserted += 1
+            except Exception as e:
+                report.failed += 1
+                report.errors.append((offset + i, str(e)))
+
+    def import_file(self, path: str, table_name: str = None, fmt: str = None, create: bool = False,
+                    header: bool = True, delimiter: str = None, workers: int = None,
+                    chunk_bytes: int = importer.CHUNK_BYTES, batch_size: int = 5000, resume: bool = True,
+                    quarantine: bool = True, progress=None, should_stop=None):
+        """_summary_ : loads a CSV or JSON Lines file into a table
+
+            The file is cut into line-aligned chunks that worker processes parse and
+            convert to the table's column types, so parsing runs on every core while the
+            chunks are written in file order with the dialect's fastest insert path (see
+            bulk.choose_method). Each chunk is committed in one transaction; a failing
+            batch is split down to the rows that fail (in savepoints), and those rows, like
+            records that can't be parsed, are appended to a quarantine file next to the
+            input instead of stopping the import.
+
+            Each chunk's transaction also records the offset after it (in the
+            bulk.IMPORT_STATE_TABLE table, created on first use); an interrupted or
+            cancelled import of the unchanged file resumes from there without inserting
+            a committed chunk twice.
+
+        Args:
+            path (str): _description_ (e.g. "imports/users.csv")
+            table_name (str, optional): target table. Defaults to the file name without extension.
+            fmt (str, optional): "csv" or "jsonl". Defaults to the path's extension.
+            create (bool, optional): create the table, with column types inferred from the first
+                                     records, when it doesn't exist. Defaults to False.
+            header (bool, optional): the first CSV record names the columns (otherwise columns
+                                     are matched by position). Defaults to True.
+            delimiter (str, optional): CSV delimiter. Defaults to sniffing it.
+            workers (int, optional): parsing processes. Defaults to the number of CPUs.
+            chunk_bytes (int, optional): bytes parsed and committed per chunk. Defaults to 8 MiB.
+            batch_size (int, optional): rows per insert batch. Defaults to 5000.
+            resume (bool, optional): continue from the offset an earlier import committed. Defaults to True.
+            quarantine (bool, optional): write rejected records to "<name>.rejected<ext>". Defaults to True.
+            progress (callable, optional): called with the ImportReport after each chunk. Defaults to None.
+            should_stop (callable, optional): checked between chunks; True cancels. Defaults to None.
+
+        Returns:
+            ImportReport: rows inserted/rejected, bytes done and errors, or None if the import couldn't start
+        """
+        table_name = table_name or os.path.splitext(os.path.basename(path))[0]
+        try:
+            fmt = fmt or importer.format_for_path(path)
+            sample = importer.read_sample(path, fmt, header=header, delimiter=delimiter)
+            if not sample.columns:
+                print(f"No columns found in {path}.")
+                return None
+            report = importer.ImportReport(path, table_name)
+            if create and table_name not in self.get_table_names():
+                kinds = importer.infer_kinds(sample)
+                details = [(name, importer.TYPE_NAMES[kind], "nullable") for name, kind in zip(sample.columns, kinds)]
+                if not self.create_table(table_name, details):
+                    return None
+                report.created = True
+            table = self.tables.get(table_name)
+            fields, report.skipped_columns = importer.plan_fields(
+                sample, [(column.name, importer.column_kind(column.type)) for column in table.columns])
+            if not fields:
+                print(f"None of the columns of {path} are in {table_name}.")
+                return None
+            columns = [name for _, name, _ in fields]
+            report.method = bulk.choose_method(self.engine.dialect)
+            with self.engine.begin() as connection:
+                state_table = bulk.import_state_table(connection)
+                state = bulk.load_import_state(connection, state_table, path, table_name) if resume else None
+            # the state table shows up in the table listings once it exists
+            self.schema_cache.invalidate(bulk.IMPORT_STATE_TABLE)
+        except Exception as e:
+            print(f"Import failed: {str(e)}")
+            return None
+
+        start = sample.data_start
+        if state is not None:
+            start = report.resumed_from = state["offset"]
+            report.inserted, report.failed = state["inserted"], state["failed"]
+        report.bytes_done = start
+        report.workers = workers or os.cpu_count() or 1
+        rejected = None
+        if quarantine:
+            stem, extension = os.path.splitext(path)
+            rejected = importer.Quarantine(f"{stem}.rejected{extension or '.csv'}",
+                                           header=importer.header_text(path, sample))
+            if state is None and os.path.exists(rejected.path):
+                # a new import starts a new quarantine file
+                os.remove(rejected.path)
+
+        began = time.perf_counter()
+        try:
+            for chunk in importer.parse_file(path, fmt, fields, start, sample.dialect, multiline=sample.multiline,
+                                             workers=workers, chunk_bytes=chunk_bytes, should_stop=should_stop):
+                failed = []
+                with self.engine.begin() as connection:
+                    for offset in range(0, len(chunk.rows), batch_size):
+                        inserted, errors = bulk.insert_isolating(connection, table, columns,
+                                                                 chunk.rows[offset:offset + batch_size],
+                                                                 report.method, offset)
+                        report.inserted += inserted
+                        failed += errors
+                    bad = list(chunk.bad) + [
+                        (chunk.offsets[i], message, importer.record_text(path, chunk.offsets[i], fmt, sample.dialect))
+                        for i, message in failed
+                    ]
+                    for offset, message, text_of_record in sorted(bad):
+                        report.add_error(offset, message)
+                        if rejected is not None:
+                            rejected.add(text_of_record)
+                    # rejected records are flushed before the commit: a crash in between
+                    # repeats them in the quarantine file rather than losing them
+                    if rejected is not None:
+                        rejected.close()
+                    bulk.save_import_state(connection, state_table, path, table_name,
+                                           chunk.end, report.inserted, report.failed)
+                report.bytes_done = chunk.end
+                report.chunks += 1
+                report.elapsed = time.perf_counter() - began
+                if progress is not None:
+                    progress(report)
+        except Exception as e:
+            print(f"Import failed at byte {report.bytes_done}: {str(e)}")
+            report.errors.append((report.bytes_done, str(e)))
+            report.elapsed = time.perf_counter() - began
+            return report
+        finally:
+            if report.inserted:
+                self._invalidate_results(table_name)
+
+        report.elapsed = time.perf_counter() - began
+        report.cancelled = report.bytes_done < report.total_bytes and should_stop is not None and should_stop()
+        if not report.cancelled:
+            report.finished = True
+            try:
+                with self.engine.begin() as connection:
+                    bulk.clear_import_state(connection, state_table, path, table_name)
+            except Exception as e:
+                print(f"Failed to clear the import state of {path}: {str(e)}")
+        if rejected is not None and rejected.count:
+            report.quarantine_path = rejected.path
+        print(f"Imported {report.inserted} rows into {table_name} "
+              f"({report.rows_per_second:.0f} rows/s, {report.failed} rejected)")
+        return report
+
     def update_record(self, table_name, primary_key, data) -> bool:
         """_summary_
 
         Args:
             table_name (_type_): _description_ (e.g. "users")
-            primary_key (_type_): _description_ (e.g. 1)
+            primary_key (_type_): _description_ (e.g. 1, or (10, 2) for a composite key)
             data (_type_): _description_ (e.g. {"name": "John Doe", "age": 25})
 
         Returns:
             bool: _description_
         """
         try:
-            table = Table(table_name, self.metadata, autoload=True, autoload_with=self.engine)
-            self.session.execute(table.update().where(table.c.id == primary_key).values(data))
-            self.session.commit()
+            params = dict(data, **self.tables.key_params(table_name, primary_key))
+            with self._writing() as session:
+                session.execute(self.tables.update(table_name, data), params)
+            self._invalidate_results(table_name)
             return True
         except Exception as e:
-            print(f"Record update failed: {str(e)}")
+            self._write_failed("Record update failed", e)
             return False
 
     def delete_record(self, table_name, primary_key) -> bool:
@@ -318,16 +1443,92 @@ class DatabaseManager:
 
         Args:
             table_name (_type_): _description_ (e.g. "users")
-            primary_key (_type_): _description_ (e.g. 1)
+            primary_key (_type_): _description_ (e.g. 1, or (10, 2) for a composite key)
 
         Returns:
             bool: _description_
         """
         try:
-            table = Table(table_name, self.metadata, autoload=True, autoload_with=self.engine)
-            self.session.execute(table.delete().where(table.c.id == primary_key))
-            self.session.commit()
+            with self._writing() as session:
+                session.execute(
+                    self.tables.delete(table_name),
+                    self.tables.key_params(table_name, primary_key)
+                )
+            self._invalidate_results(table_name)
             return True
         except Exception as e:
-            print(f"Record deletion failed: {str(e)}")
+            self._write_failed("Record deletion failed", e)
             return False
+
+    def update_many(self, table_name, data: dict, keys: list = None, where=None) -> int:
+        """_summary_ : sets the same values on many rows in one transaction, picked either
+                        by a list of primary key values or by a condition
+
+            A key list runs as a few UPDATE ... WHERE key IN (...) statements (or a
+            single join against a temporary table of the keys when it is long), not
+            one statement per row.
+
+        Args:
+            table_name (_type_): _description_ (e.g. "users")
+            data (dict): _description_ (e.g. {"active": False})
+            keys (list, optional): primary key values, tuples for a composite key
+                                   (e.g. [1, 2, 3] or [(10, 1), (10, 2)]). Defaults to None.
+            where (str | dict | ClauseElement, optional): condition instead of keys
+                                   (e.g. "last_login < '2020-01-01'" or {"status": "stale"}). Defaults to None.
+
+        Returns:
+            int: rows updated, or None if the update failed (nothing is changed then)
+        """
+        return self._write_many("update", table_name, keys, where, data)
+
+    def delete_many(self, table_name, keys: list = None, where=None) -> int:
+        """_summary_ : deletes many rows in one transaction, picked either by a list of
+                        primary key values or by a condition (see update_many())
+
+        Args:
+            table_name (_type_): _description_ (e.g. "users")
+            keys (list, optional): primary key values (e.g. [1, 2, 3]). Defaults to None.
+            where (str | dict | ClauseElement, optional): condition instead of keys
+                                   (e.g. {"status": "stale"}). Defaults to None.
+
+        Returns:
+            int: rows deleted, or None if the delete failed (nothing is deleted then)
+        """
+        return self._write_many("delete", table_name, keys, where)
+
+    def _write_many(self, kind: str, table_name, keys, where, data: dict = None) -> int:
+        """_summary_ : runs update_many() / delete_many()
+        """
+        if (keys is None) == (where is None):
+            print(f"{kind.capitalize()} failed: pass either keys or where")
+            return None
+        try:
+            table = self.tables.get(table_name)
+
+            def build(condition):
+                statement = table.update().values(data) if kind == "update" else table.delete()
+                return statement.where(condition)
+
+            with self._writing() as session:
+                connection = session.connection()
+                if keys is not None:
+                    affected = bulk.write_by_keys(connection, self.tables.primary_key(table_name), list(keys), build)
+                else:
+                    affected = max(connection.execute(build(self._condition(table, where))).rowcount, 0)
+            self._invalidate_results(table_name)
+            return affected
+        except Exception as e:
+            self._write_failed(f"{kind.capitalize()} failed", e)
+            return None
+
+    def _condition(self, table, where):
+        """_summary_ : a where argument as a SQLAlchemy condition: SQL text, a dict of
+                        column = value pairs, or a condition already built on the table
+        """
+        if isinstance(where, str):
+            return text(where)
+        if isinstance(where, dict):
+            if not where:
+                raise ValueError("an empty where matches every row")
+            return and_(*[table.c[name] == value for name, value in where.items()])
+        return where
@@ -0,0 +1,347 @@
+"""_summary_ : EXPLAIN / EXPLAIN ANALYZE in each dialect's own form, parsed into a
+                tree of PlanNodes with costs, estimated and actual rows and timings.
+"""
+
+# import necessary modules
+import json
+import re
+
+
+# estimated and actual rows differing by more than this factor are flagged
+MISESTIMATE_RATIO = 10.0
+
+# "(cost=1.10 rows=2)" and "(actual time=0.044..0.051 rows=2 loops=1)" in MySQL's tree format
+_TREE_COST = re.compile(r"\(cost=([\d.e+-]+)(?:\.\.([\d.e+-]+))?\s+rows=([\d.e+-]+)\)")
+_TREE_ACTUAL = re.compile(r"\(actual time=([\d.e+-]+)\.\.([\d.e+-]+)\s+rows=([\d.e+-]+)\s+loops=(\d+)\)")
+# MySQL JSON keys that describe a node rather than nest another one
+_MYSQL_DETAIL_KEYS = {"cost_info", "used_columns", "used_key_parts", "possible_keys", "attached_condition",
+                      "ref", "message", "key", "key_length", "r_loops", "r_filtered", "r_other_time_ms"}
+
+
+class PlanNode:
+    """_summary_ : one step of a query plan
+
+        Row counts are per loop (as Postgres and MySQL report them); cost is the
+        planner's cumulative cost and time_ms the actual inclusive time over all
+        loops. Values a dialect doesn't report are None.
+    """
+
+    def __init__(self, label: str, node_type: str = None, relation: str = None):
+        self.label = label
+        self.node_type = node_type or label
+        self.relation = relation
+        self.cost = None
+        self.startup_cost = None
+        self.estimated_rows = None
+        self.actual_rows = None
+        self.loops = None
+        self.time_ms = None
+        # dialect specific figures shown next to the node (e.g. {"index": "ix_users_email"})
+        self.details = {}
+        self.full_scan = False
+        self.children = []
+
+    @property
+    def misestimate(self) -> float:
+        """_summary_ : how many times the actual rows exceed or fall short of the
+                        estimate (1.0 when accurate, None without actual rows)
+        """
+        if self.estimated_rows is None or self.actual_rows is None:
+            return None
+        high = max(self.estimated_rows, self.actual_rows)
+        low = max(min(self.estimated_rows, self.actual_rows), 1)
+        return high / low
+
+    @property
+    def flags(self) -> list:
+        """_summary_ : warnings worth highlighting (e.g. ["full scan", "rows x42"])
+        """
+        flags = []
+        if self.full_scan:
+            flags.append("full scan")
+        ratio = self.misestimate
+        if ratio is not None and ratio >= MISESTIMATE_RATIO:
+            flags.append(f"rows x{ratio:.0f}")
+        return flags
+
+    def walk(self):
+        """_summary_ : yields (depth, node) for this node and every node below it
+        """
+        stack = [(0, self)]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            stack.extend((depth + 1, child) for child in reversed(node.children))
+
+    def __repr__(self):
+        return f"PlanNode({self.label!r}, {len(self.children)} children)"
+
+
+class QueryPlan:
+    """_summary_ : a parsed plan: its root node and statement-wide figures
+    """
+
+    def __init__(self, root: PlanNode, dialect: str, analyzed: bool, sql: str, raw=None):
+        self.root = root
+        self.dialect = dialect
+        self.analyzed = analyzed
+        self.sql = sql
+        # what the server returned (JSON document or text), for copying elsewhere
+        self.raw = raw
+        self.planning_time = None
+        self.execution_time = None
+
+    @property
+    def flagged(self) -> list:
+        """_summary_ : nodes with at least one flag
+        """
+        return [node for _, node in self.root.walk() if node.flags]
+
+    def summary(self) -> str:
+        """_summary_ : one line description (e.g. "Postgres plan, 7 nodes, 2 flagged, executed in 3.41 ms")
+        """
+        nodes = sum(1 for _ in self.root.walk())
+        text = f"{self.dialect} plan, {nodes} nodes, {len(self.flagged)} flagged"
+        if self.planning_time is not None:
+            text += f", planned in {self.planning_time:.2f} ms"
+        if self.execution_time is not None:
+            text += f", executed in {self.execution_time:.2f} ms"
+        return text
+
+
+def explain_sql(dialect, sql: str, analyze: bool = False) -> str:
+    """_summary_ : the dialect's EXPLAIN statement for sql
+
+    Args:
+        dialect (Dialect): the engine's dialect
+        sql (str): _description_ (e.g. "SELECT * FROM users WHERE email = 'a@b.c'")
+        analyze (bool, optional): run the statement and report actual rows and times. Defaults to False.
+
+    Returns:
+        str: _description_ (e.g. "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) SELECT ...")
+    """
+    sql = sql.strip().rstrip(";")
+    name = dialect.name
+    if name == "sqlite":
+        # SQLite has no EXPLAIN ANALYZE; its plan carries no costs or row counts
+        return f"EXPLAIN QUERY PLAN {sql}"
+    if name == "postgresql":
+        return f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}" if analyze else f"EXPLAIN (FORMAT JSON) {sql}"
+    if name in ("mysql", "mariadb"):
+        if not analyze:
+            return f"EXPLAIN FORMAT=JSON {sql}"
+        if getattr(dialect, "is_mariadb", False):
+            return f"ANALYZE FORMAT=JSON {sql}"
+        # MySQL reports actual figures only in its tree format (8.0.18+)
+        return f"EXPLAIN ANALYZE {sql}"
+    raise ValueError(f"EXPLAIN isn't supported for {name}")
+
+
+def explain(connection, sql: str, analyze: bool = False) -> QueryPlan:
+    """_summary_ : runs the dialect's EXPLAIN for a statement and parses the plan
+
+        EXPLAIN ANALYZE executes the statement, so it runs in a transaction that is
+        always rolled back: explaining an UPDATE or DELETE doesn't change any rows.
+
+    Args:
+        connection (Connection): connection without a transaction in progress
+        sql (str): _description_ (e.g. "SELECT * FROM users WHERE email = 'a@b.c'")
+        analyze (bool, optional): execute it and report actual rows and times. Defaults to False.
+
+    Returns:
+        QueryPlan: _description_
+    """
+    dialect = connection.dialect
+    statement = explain_sql(dialect, sql, analyze)
+    transaction = connection.begin()
+    try:
+        # raw driver execution: ":name" in a literal isn't a bind parameter
+        rows = connection.execution_options(no_parameters=True).exec_driver_sql(statement).fetchall()
+    finally:
+        transaction.rollback()
+
+    name = dialect.name
+    if name == "sqlite":
+        return parse_sqlite(rows, sql)
+    if name == "postgresql":
+        return parse_postgres(rows[0][0], sql, analyze)
+    if analyze and not getattr(dialect, "is_mariadb", False):
+        return parse_mysql_tree("\n".join(row[0] for row in rows), sql)
+    return parse_mysql_json(rows[0][0], sql, analyze)
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Parsers                                   #
+# ---------------------------------------------------------------------------- #
+def parse_sqlite(rows: list, sql: str = None) -> QueryPlan:
+    """_summary_ : EXPLAIN QUERY PLAN rows (id, parent, notused, detail) as a tree
+
+    Args:
+        rows (list): _description_ (e.g. [(2, 0, 0, "SCAN users")])
+        sql (str, optional): the explained statement. Defaults to None.
+
+    Returns:
+        QueryPlan: _description_
+    """
+    root = PlanNode("QUERY PLAN")
+    nodes = {0: root}
+    for row in rows:
+        node_id, parent, detail = row[0], row[1], row[-1]
+        words = detail.split()
+        node = PlanNode(detail, node_type=words[0] if words else detail)
+        if words and words[0] in ("SCAN", "SEARCH"):
+            # "SCAN users", "SCAN TABLE users" (before 3.36), "SEARCH users USING INDEX ..."
+            node.relation = words[2] if len(words) > 2 and words[1] == "TABLE" else words[1] if len(words) > 1 else None
+            node.full_scan = words[0] == "SCAN" and "INDEX" not in words
+        nodes[node_id] = node
+        nodes.get(parent, root).children.append(node)
+    return QueryPlan(root, "SQLite", False, sql, raw=[tuple(row) for row in rows])
+
+
+def parse_postgres(document, sql: str = None, analyzed: bool = False) -> QueryPlan:
+    """_summary_ : EXPLAIN (FORMAT JSON) output as a tree
+
+    Args:
+        document (list | str): the JSON document (drivers return it parsed or as text)
+        sql (str, optional): the explained statement. Defaults to None.
+        analyzed (bool, optional): ANALYZE was used. Defaults to False.
+
+    Returns:
+        QueryPlan: _description_
+    """
+    if isinstance(document, str):
+        document = json.loads(document)
+    top = document[0] if isinstance(document, list) else document
+
+    def build(plan: dict) -> PlanNode:
+        node_type = plan.get("Node Type", "?")
+        relation = plan.get("Relation Name")
+        label = node_type
+        if plan.get("Index Name"):
+            label += f" using {plan['Index Name']}"
+        if relation:
+            label += f" on {relation}"
+            if plan.get("Alias") and plan["Alias"] != relation:
+                label += f" {plan['Alias']}"
+        node = PlanNode(label, node_type=node_type, relation=relation)
+        node.cost = plan.get("Total Cost")
+        node.startup_cost = plan.get("Startup Cost")
+        node.estimated_rows = plan.get("Plan Rows")
+        node.actual_rows = plan.get("Actual Rows")
+        node.loops = plan.get("Actual Loops")
+        if plan.get("Actual Total Time") is not None:
+            node.time_ms = plan["Actual Total Time"] * (node.loops or 1)
+        node.full_scan = node_type == "Seq Scan"
+        for key, detail in (("Shared Hit Blocks", "hit"), ("Shared Read Blocks", "read"),
+                            ("Filter", "filter"), ("Index Cond", "index cond"),
+                            ("Rows Removed by Filter", "removed")):
+            if plan.get(key):
+                node.details[detail] = plan[key]
+        node.children = [build(child) for child in plan.get("Plans", [])]
+        return node
+
+    result = QueryPlan(build(top["Plan"]), "Postgres", analyzed, sql, raw=document)
+    result.planning_time = top.get("Planning Time")
+    result.execution_time = top.get("Execution Time")
+    return result
+
+
+def parse_mysql_json(document, sql: str = None, analyzed: bool = False) -> QueryPlan:
+    """_summary_ : EXPLAIN FORMAT=JSON (MySQL) or ANALYZE FORMAT=JSON (MariaDB) output as a tree
+
+    Args:
+        document (dict | str): the JSON document
+        sql (str, optional): the explained statement. Defaults to None.
+        analyzed (bool, optional): MariaDB's ANALYZE was used. Defaults to False.
+
+    Returns:
+        QueryPlan: _description_
+    """
+    if isinstance(document, str):
+        document = json.loads(document)
+
+    def build(key: str, value: dict) -> PlanNode:
+        if key == "table":
+            name = value.get("table_name")
+            access = value.get("access_type", "")
+            label = f"{access} on {name}" if access else f"table {name}"
+            if value.get("key"):
+                label += f" using {value['key']}"
+            node = PlanNode(label, node_type=access or "table", relation=name)
+            node.full_scan = access == "ALL"
+            node.estimated_rows = value.get("rows_produced_per_join", value.get("rows_examined_per_scan",
+                                                                                  value.get("rows")))
+            node.actual_rows = value.get("r_rows")
+            node.loops = value.get("r_loops")
+            node.time_ms = value.get("r_total_time_ms")
+            if value.get("filtered") is not None:
+                node.details["filtered"] = f"{value['filtered']}%"
+            if value.get("attached_condition"):
+                node.details["condition"] = value["attached_condition"]
+        else:
+            node = PlanNode(key.replace("_", " "), node_type=key)
+            node.time_ms = value.get("r_total_time_ms")
+        cost_info = value.get("cost_info", {})
+        cost = cost_info.get("prefix_cost", cost_info.get("query_cost"))
+        node.cost = float(cost) if cost is not None else None
+
+        for child_key, child in value.items():
+            if child_key in _MYSQL_DETAIL_KEYS:
+                continue
+            if isinstance(child, dict):
+                node.children.append(build(child_key, child))
+            elif isinstance(child, list):
+                for item in child:
+                    if not isinstance(item, dict):
+                        continue
+                    # nested_loop: [{"table": {...}}, ...] and similar single-key wrappers
+                    if len(item) == 1 and isinstance(next(iter(item.values())), dict):
+                        item_key, item = next(iter(item.items()))
+                        node.children.append(build(item_key, item))
+                    else:
+                        node.children.append(build(child_key, item))
+        return node
+
+    key = "query_block" if "query_block" in document else next(iter(document))
+    return QueryPlan(build(key, document[key]), "MySQL", analyzed, sql, raw=document)
+
+
+def parse_mysql_tree(text: str, sql: str = None) -> QueryPlan:
+    """_summary_ : MySQL's EXPLAIN ANALYZE tree ("-> step  (cost=..) (actual time=..)") as a tree
+
+    Args:
+        text (str): _description_ (e.g. "-> Table scan on users  (cost=0.35 rows=1) (actual time=...)")
+        sql (str, optional): the explained statement. Defaults to None.
+
+    Returns:
+        QueryPlan: _description_
+    """
+    root = PlanNode("QUERY PLAN")
+    # (indent, node) of the current branch
+    stack = [(-1, root)]
+    for line in text.splitlines():
+        stripped = line.lstrip()
+        if not stripped.startswith("->"):
+            continue
+        indent = len(line) - len(stripped)
+        body = stripped[2:].strip()
+        label = re.split(r"\s+\((?:cost|actual)", body, maxsplit=1)[0].strip()
+        node = PlanNode(label, node_type=label.split(" on ")[0])
+        node.full_scan = label.startswith("Table scan")
+        if " on " in label:
+            node.relation = label.split(" on ", 1)[1].split()[0]
+        cost = _TREE_COST.search(body)
+        if cost:
+            node.cost = float(cost.group(2) or cost.group(1))
+            node.estimated_rows = float(cost.group(3))
+        actual = _TREE_ACTUAL.search(body)
+        if actual:
+            node.actual_rows = float(actual.group(3))
+            node.loops = int(actual.group(4))
+            node.time_ms = float(actual.group(2)) * node.loops
+
+        while stack[-1][0] >= indent:
+            stack.pop()
+        stack[-1][1].children.append(node)
+        stack.append((indent, node))
+    return QueryPlan(root, "MySQL", True, sql, raw=text)
@@ -0,0 +1,153 @@
+"""_summary_ : Streams query results to CSV, JSON Lines or (when pyarrow is
+                installed) zstd-compressed Parquet files, one chunk at a time.
+"""
+
+# import necessary modules
+import csv
+import json
+import os
+
+from .lazy import LazyModule
+
+# imported when a Parquet file is written, not when the exporter is loaded
+pyarrow = LazyModule("pyarrow", submodules=("pyarrow.parquet",))
+
+
+# file extension -> export format
+FORMATS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".parquet": "parquet",
+}
+
+
+def available_formats() -> list:
+    """_summary_ : formats that can be written with the installed libraries
+    """
+    return [fmt for fmt in FORMATS.values() if fmt != "parquet" or pyarrow.available]
+
+
+def format_for_path(path: str) -> str:
+    """_summary_ : export format implied by a file name (csv when the extension is unknown)
+    """
+    return FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+
+
+class CsvWriter:
+    def __init__(self, path: str, columns: list):
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows: list):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class JsonlWriter:
+    def __init__(self, path: str, columns: list):
+        self._file = open(path, "w", encoding="utf-8")
+        self._columns = columns
+
+    def write(self, rows: list):
+        for row in rows:
+            self._file.write(json.dumps(dict(zip(self._columns, row)), default=str))
+            self._file.write("\n")
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """_summary_ : writes each chunk as a Parquet row group. The schema is inferred once
+                    every column has shown a non-NULL value (chunks are held back until
+                    then, up to SCHEMA_SAMPLE_ROWS rows; still untyped columns become strings)
+    """
+
+    SCHEMA_SAMPLE_ROWS = 50000
+
+    def __init__(self, path: str, columns: list):
+        if not pyarrow.available:
+            raise RuntimeError("Parquet export needs the pyarrow package")
+        self._path = path
+        self._columns = columns
+        self._writer = None
+        self._pending = []
+
+    def write(self, rows: list):
+        table = self._to_table(rows)
+        if self._writer is not None:
+            self._writer.write_table(table.cast(self._writer.schema))
+            return
+
+        self._pending.append(table)
+        untyped = any(
+            all(pyarrow.types.is_null(t.schema.field(i).type) for t in self._pending)
+            for i in range(len(self._columns))
+        )
+        if not untyped or sum(t.num_rows for t in self._pending) >= self.SCHEMA_SAMPLE_ROWS:
+            self._flush_pending()
+
+    def close(self):
+        self._flush_pending()
+        self._writer.close()
+
+    def _to_table(self, rows: list):
+        arrays = [pyarrow.array([row[i] for row in rows]) for i in range(len(self._columns))]
+        return pyarrow.Table.from_arrays(arrays, names=self._columns)
+
+    def _flush_pending(self):
+        """_summary_ : fixes the schema from the held back chunks and writes them
+        """
+        if self._writer is not None:
+            return
+        fields = []
+        for i, name in enumerate(self._columns):
+            types = [t.schema.field(i).type for t in self._pending]
+            typed = [t for t in types if not pyarrow.types.is_null(t)]
+            fields.append(pyarrow.field(name, typed[0] if typed else pyarrow.string()))
+        schema = pyarrow.schema(fields)
+        self._writer = pyarrow.parquet.ParquetWriter(self._path, schema, compression="zstd")
+        for table in self._pending:
+            self._writer.write_table(table.cast(schema))
+        self._pending = []
+
+
+WRITERS = {
+    "csv": CsvWriter,
+    "jsonl": JsonlWriter,
+    "parquet": ParquetWriter,
+}
+
+
+def export_stream(stream, path: str, fmt: str = None, progress=None, should_stop=None) -> int:
+    """_summary_ : writes every chunk of a result stream to a file
+
+    Args:
+        stream (ResultStream): the result to export (closed when done)
+        path (str): _description_ (e.g. "exports/users.csv")
+        fmt (str, optional): "csv", "jsonl" or "parquet". Defaults to the path's extension.
+        progress (callable, optional): called with the rows written so far after each chunk.
+        should_stop (callable, optional): returns True to stop the export early.
+
+    Returns:
+        int: number of rows written
+    """
+    writer = WRITERS[fmt or format_for_path(path)](path, stream.columns)
+    written = 0
+    try:
+        for chunk in stream:
+            writer.write(chunk)
+            written += len(chunk)
+            if progress is not None:
+                progress(written)
+            if should_stop is not None and should_stop():
+                break
+    finally:
+        stream.close()
+        writer.close()
+    if stream.error is not None:
+        raise RuntimeError(stream.error)
+    return written
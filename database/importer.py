@@ -0,0 +1,748 @@
+"""_summary_ : Reads CSV and JSON Lines files for import: samples a file to infer column
+                types, splits it into line-aligned byte ranges, parses the ranges into
+                typed rows in worker processes and keeps the file of rejected records.
+                (The offset an interrupted import resumes from is kept in the database,
+                see bulk.import_state_table.)
+
+                Only the standard library is imported here, so the worker processes
+                start quickly.
+"""
+
+# import necessary modules
+import csv
+import json
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, time
+from decimal import Decimal
+
+
+# file extension -> import format
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+# bytes read to sniff the CSV dialect and infer the column types
+SAMPLE_BYTES = 1024 * 1024
+# bytes of the file parsed per chunk (and committed per transaction)
+CHUNK_BYTES = 8 * 1024 * 1024
+# files smaller than this many chunks are parsed without starting worker processes
+MIN_PARALLEL_CHUNKS = 8
+# error messages kept on the report (every rejected record is in the quarantine file)
+MAX_ERRORS = 1000
+
+# column kind -> type name passed to DatabaseManager.create_table()
+TYPE_NAMES = {
+    "bool": "Boolean",
+    "int": "Integer",
+    "bigint": "BigInteger",
+    "float": "Float",
+    "date": "Date",
+    "datetime": "DateTime",
+    "str": "Text",
+    "json": "Text",
+}
+# python type of a table column -> kind its values are converted to
+_KINDS = {
+    bool: "bool",
+    int: "int",
+    float: "float",
+    Decimal: "decimal",
+    date: "date",
+    datetime: "datetime",
+    time: "time",
+    str: "str",
+    dict: "object",
+    list: "object",
+}
+_BOOLEANS = {"true": True, "false": False, "t": True, "f": False, "yes": True, "no": False}
+_INT32 = 2 ** 31
+# integers without leading zeros (so "007" stays text) and decimal numbers
+_INT_RE = re.compile(r"[-+]?(?:0|[1-9]\d*)")
+_FLOAT_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_DATETIME_RE = re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}")
+
+
+def format_for_path(path: str) -> str:
+    """_summary_ : import format implied by a file name (csv when the extension is unknown)
+    """
+    return FORMATS.get(os.path.splitext(path)[1].lower(), "csv")
+
+
+class Sample:
+    """_summary_ : the start of a file: its columns, its first records and how to parse the rest
+
+        records are lists of strings for CSV and dicts for JSON Lines; data_start is
+        the byte offset of the first record after the header.
+    """
+
+    def __init__(self, fmt: str, columns: list, records: list, data_start: int, dialect: dict = None,
+                 multiline: bool = False):
+        self.fmt = fmt
+        self.columns = columns
+        self.records = records
+        self.data_start = data_start
+        # csv.reader keyword arguments (None for JSON Lines)
+        self.dialect = dialect
+        # True when a sampled CSV record spans several lines (quoted line breaks)
+        self.multiline = multiline
+
+
+def read_sample(path: str, fmt: str = None, header: bool = True, delimiter: str = None,
+                sample_bytes: int = SAMPLE_BYTES) -> Sample:
+    """_summary_ : reads the first records of a file
+
+    Args:
+        path (str): _description_ (e.g. "imports/users.csv")
+        fmt (str, optional): "csv" or "jsonl". Defaults to the path's extension.
+        header (bool, optional): the first CSV record names the columns. Defaults to True.
+        delimiter (str, optional): CSV delimiter. Defaults to sniffing it (",", ";", tab or "|").
+        sample_bytes (int, optional): bytes read. Defaults to SAMPLE_BYTES.
+
+    Returns:
+        Sample: _description_
+    """
+    fmt = fmt or format_for_path(path)
+    with open(path, "rb") as file:
+        data = file.read(sample_bytes)
+        complete = len(data) < sample_bytes
+    bom = 3 if data.startswith(b"\xef\xbb\xbf") else 0
+    if not complete:
+        # drop the last, possibly cut off, line
+        data = data[:data.rfind(b"\n") + 1]
+    lines = _split_lines(data[bom:], bom)
+
+    if fmt == "jsonl":
+        records = []
+        for _, text in lines:
+            try:
+                record = json.loads(text) if text and text.strip() else None
+            except ValueError:
+                # rejected when the file is parsed
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+        columns = []
+        for record in records:
+            columns += [key for key in record if key not in columns]
+        return Sample(fmt, columns, records, bom)
+
+    text = "".join(text or "" for _, text in lines)
+    if delimiter is not None:
+        dialect = {"delimiter": delimiter}
+    else:
+        try:
+            sniffed = csv.Sniffer().sniff(text[:64 * 1024], delimiters=",;\t|")
+            dialect = {"delimiter": sniffed.delimiter, "quotechar": sniffed.quotechar,
+                       "doublequote": sniffed.doublequote, "skipinitialspace": sniffed.skipinitialspace}
+        except csv.Error:
+            dialect = {"delimiter": "\t" if path.lower().endswith(".tsv") else ","}
+
+    columns = None
+    records = []
+    multiline = False
+    data_start = bom
+    for offset, fields, count in _csv_records(lines, dialect):
+        multiline = multiline or count > 1
+        if isinstance(fields, str) or not fields:
+            continue
+        if header and columns is None:
+            columns = [name.strip() or f"column_{i + 1}" for i, name in enumerate(fields)]
+            data_start = _next_offset(lines, offset, count)
+            continue
+        records.append(fields)
+    if columns is None:
+        width = max((len(record) for record in records), default=0)
+        columns = [f"column_{i + 1}" for i in range(width)]
+    return Sample(fmt, columns, records, data_start, dialect, multiline)
+
+
+def infer_kinds(sample: Sample) -> list:
+    """_summary_ : the kind of each sampled column: "bool", "int", "bigint", "float",
+                    "date", "datetime", "json" (nested JSON values) or "str"
+
+    Args:
+        sample (Sample): _description_
+
+    Returns:
+        list: one kind per column of the sample (e.g. ["int", "str", "date"])
+    """
+    kinds = []
+    for i, name in enumerate(sample.columns):
+        if sample.fmt == "jsonl":
+            values = [record.get(name) for record in sample.records]
+        else:
+            values = [record[i] if i < len(record) else "" for record in sample.records]
+        kinds.append(_infer_kind([value for value in values if value not in (None, "")]))
+    return kinds
+
+
+def column_kind(column_type) -> str:
+    """_summary_ : the kind values for a table column are converted to
+
+    Args:
+        column_type (TypeEngine): _description_ (e.g. INTEGER())
+
+    Returns:
+        str: _description_ (e.g. "int"), "raw" when values are passed on unconverted
+    """
+    try:
+        return _KINDS.get(column_type.python_type, "raw")
+    except (AttributeError, NotImplementedError):
+        return "raw"
+
+
+def convert_value(kind: str, value):
+    """_summary_ : a value (e.g. typed text) converted for a column of a kind, None kept as is
+
+    Args:
+        kind (str): _description_ (e.g. "int", from column_kind())
+        value: _description_ (e.g. "42")
+
+    Returns:
+        _type_: _description_ (e.g. 42); raises ValueError if the value doesn't convert
+    """
+    return value if value is None else _CONVERTERS[kind](value)
+
+
+def plan_fields(sample: Sample, table_columns: list) -> tuple:
+    """_summary_ : matches the file's columns to a table's (case-insensitively; by position
+                    for a CSV without a header)
+
+    Args:
+        sample (Sample): _description_
+        table_columns (list): (name, kind) of each table column (e.g. [("id", "int"), ("name", "str")])
+
+    Returns:
+        tuple: (fields, skipped): fields are (source, column, kind) with source a CSV field index
+               or a JSON key; skipped are file columns the table doesn't have
+    """
+    by_name = {name.lower(): (name, kind) for name, kind in table_columns}
+    generated = sample.fmt == "csv" and all(name == f"column_{i + 1}" for i, name in enumerate(sample.columns))
+    fields = []
+    skipped = []
+    for i, name in enumerate(sample.columns):
+        if generated and name.lower() not in by_name:
+            target = table_columns[i] if i < len(table_columns) else None
+        else:
+            target = by_name.get(name.lower())
+        if target is None:
+            skipped.append(name)
+            continue
+        fields.append((i if sample.fmt == "csv" else name, target[0], target[1]))
+    return fields, skipped
+
+
+class ParsedChunk:
+    """_summary_ : the rows parsed from one byte range of a file
+
+        rows are dicts keyed by table column; offsets[i] is the byte offset of the record
+        rows[i] came from; bad holds (offset, error, record text) of records that couldn't
+        be parsed or converted. multiline is set (and nothing else filled in) when a CSV
+        record crossed a line break, so the range has to be parsed sequentially instead.
+    """
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        self.rows = []
+        self.offsets = []
+        self.bad = []
+        self.multiline = False
+
+
+def parse_chunk(path: str, fmt: str, start: int, end: int, fields: list, dialect: dict = None) -> ParsedChunk:
+    """_summary_ : parses the records of a line-aligned byte range (runs in the worker processes)
+
+    Args:
+        path (str): _description_ (e.g. "imports/users.csv")
+        fmt (str): "csv" or "jsonl"
+        start (int): offset of the first byte
+        end (int): offset after the last byte (just after a line break or at the end of the file)
+        fields (list): (source, column, kind) from plan_fields()
+        dialect (dict, optional): csv.reader keyword arguments. Defaults to None.
+
+    Returns:
+        ParsedChunk: _description_
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+    chunk = ParsedChunk(start, end)
+    lines = _split_lines(data, start)
+
+    if fmt == "jsonl":
+        for offset, text in lines:
+            if text is None:
+                chunk.bad.append((offset, "not valid UTF-8", _raw_line(data, offset - start)))
+                continue
+            if not text.strip():
+                continue
+            try:
+                record = json.loads(text)
+                if not isinstance(record, dict):
+                    raise ValueError("record is not a JSON object")
+                chunk.rows.append(_convert(fields, record))
+                chunk.offsets.append(offset)
+            except (ValueError, TypeError, KeyError) as e:
+                chunk.bad.append((offset, str(e), text))
+        return chunk
+
+    for offset, fields_or_error, count in _csv_records(lines, dialect):
+        if count > 1:
+            chunk.multiline = True
+            chunk.rows, chunk.offsets, chunk.bad = [], [], []
+            return chunk
+        if isinstance(fields_or_error, str):
+            chunk.bad.append((offset, fields_or_error, _line_text(lines, offset, data, start)))
+            continue
+        if not fields_or_error:
+            continue
+        try:
+            chunk.rows.append(_convert(fields, fields_or_error))
+            chunk.offsets.append(offset)
+        except (ValueError, TypeError, KeyError, ArithmeticError) as e:
+            chunk.bad.append((offset, str(e), _line_text(lines, offset, data, start)))
+    return chunk
+
+
+def parse_file(path: str, fmt: str, fields: list, start: int, dialect: dict = None, multiline: bool = False,
+               workers: int = None, chunk_bytes: int = CHUNK_BYTES, should_stop=None):
+    """_summary_ : parses a file from a byte offset to its end, chunk by chunk, in file order
+
+        Chunks are parsed by a pool of worker processes, at most two per worker ahead
+        of the chunk being consumed, so memory stays bounded when the database is
+        slower than the parsing. CSV files with quoted line breaks can't be split at
+        arbitrary lines; they are parsed sequentially in this process from the first
+        chunk that has one.
+
+    Args:
+        path (str): _description_
+        fmt (str): "csv" or "jsonl"
+        fields (list): (source, column, kind) from plan_fields()
+        start (int): offset of the first record to parse
+        dialect (dict, optional): csv.reader keyword arguments. Defaults to None.
+        multiline (bool, optional): parse sequentially from the start. Defaults to False.
+        workers (int, optional): worker processes. Defaults to the number of CPUs.
+        chunk_bytes (int, optional): bytes per chunk. Defaults to CHUNK_BYTES.
+        should_stop (callable, optional): checked between chunks; True stops parsing. Defaults to None.
+
+    Yields:
+        ParsedChunk: _description_
+    """
+    size = os.path.getsize(path)
+    workers = workers or os.cpu_count() or 1
+    if multiline:
+        yield from _parse_sequential(path, fields, start, dialect, chunk_bytes, should_stop)
+        return
+
+    ranges = _ranges(path, start, size, chunk_bytes)
+    if workers <= 1 or size - start < chunk_bytes * MIN_PARALLEL_CHUNKS:
+        for range_start, range_end in ranges:
+            if should_stop is not None and should_stop():
+                return
+            chunk = parse_chunk(path, fmt, range_start, range_end, fields, dialect)
+            if chunk.multiline:
+                yield from _parse_sequential(path, fields, range_start, dialect, chunk_bytes, should_stop)
+                return
+            yield chunk
+        return
+
+    # spawned (not forked) workers don't inherit the GUI's threads and open connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        try:
+            while True:
+                while len(pending) < workers * 2:
+                    next_range = next(ranges, None)
+                    if next_range is None:
+                        break
+                    pending.append(pool.submit(parse_chunk, path, fmt, *next_range, fields, dialect))
+                if not pending:
+                    return
+                chunk = pending.popleft().result()
+                if chunk.multiline:
+                    break
+                yield chunk
+                if should_stop is not None and should_stop():
+                    return
+        finally:
+            for future in pending:
+                future.cancel()
+    yield from _parse_sequential(path, fields, chunk.start, dialect, chunk_bytes, should_stop)
+
+
+def record_text(path: str, offset: int, fmt: str, dialect: dict = None) -> str:
+    """_summary_ : the text of the record starting at a byte offset (for the quarantine file)
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        if fmt == "jsonl":
+            return file.readline().decode("utf-8", "replace")
+        lines = []
+        for line in _read_lines(file, offset):
+            lines.append(line)
+            if _complete(lines, dialect):
+                break
+        return "".join(text or "" for _, text in lines)
+
+
+class Quarantine:
+    """_summary_ : appends rejected records, as they were in the file, to a file of the
+                    same format (with the CSV header), so they can be fixed and imported again
+    """
+
+    def __init__(self, path: str, header: str = None):
+        self.path = path
+        self.header = header
+        self.count = 0
+        self._file = None
+
+    def add(self, text: str):
+        if self._file is None:
+            new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            self._file = open(self.path, "a", encoding="utf-8", newline="")
+            if new and self.header:
+                self._file.write(self.header)
+        self._file.write(text if text.endswith("\n") else text + "\n")
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def header_text(path: str, sample: Sample) -> str:
+    """_summary_ : the raw header line(s) of a CSV file ("" for JSON Lines or no header)
+    """
+    bom = 3 if sample.data_start >= 3 and _has_bom(path) else 0
+    if sample.fmt != "csv" or sample.data_start <= bom:
+        return ""
+    with open(path, "rb") as file:
+        file.seek(bom)
+        return file.read(sample.data_start - bom).decode("utf-8", "replace")
+
+
+class ImportReport:
+    """_summary_ : outcome (and, while it runs, progress) of DatabaseManager.import_file
+    """
+
+    def __init__(self, path: str, table_name: str):
+        self.path = path
+        self.table = table_name
+        self.method = None
+        self.workers = 1
+        self.total_bytes = os.path.getsize(path)
+        # offset up to which the file is committed
+        self.bytes_done = 0
+        self.resumed_from = 0
+        self.inserted = 0
+        self.failed = 0
+        self.chunks = 0
+        self.elapsed = 0.0
+        self.created = False
+        self.cancelled = False
+        self.finished = False
+        # file columns the table doesn't have
+        self.skipped_columns = []
+        self.quarantine_path = None
+        # (byte offset, error message) of rejected records, at most MAX_ERRORS
+        self.errors = []
+
+    @property
+    def fraction(self) -> float:
+        """_summary_ : share of the file committed so far (0.0 to 1.0)
+        """
+        return self.bytes_done / self.total_bytes if self.total_bytes else 1.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.inserted / self.elapsed if self.elapsed else 0.0
+
+    def add_error(self, offset: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_ERRORS:
+            self.errors.append((offset, message))
+
+    def __repr__(self):
+        return (f"ImportReport(table={self.table!r}, inserted={self.inserted}, failed={self.failed}, "
+                f"chunks={self.chunks}, workers={self.workers}, rows_per_second={self.rows_per_second:.0f})")
+
+
+def _infer_kind(values: list) -> str:
+    """_summary_ : the narrowest kind every (non-empty) value fits
+    """
+    if not values:
+        return "str"
+    if any(isinstance(value, (dict, list)) for value in values):
+        return "json"
+    texts = [value for value in values if isinstance(value, str)]
+    others = [value for value in values if not isinstance(value, str)]
+    if texts and others:
+        return "str"
+    if others:
+        if all(isinstance(value, bool) for value in others):
+            return "bool"
+        if all(isinstance(value, int) and not isinstance(value, bool) for value in others):
+            return "bigint" if any(abs(value) >= _INT32 for value in others) else "int"
+        if all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in others):
+            return "float"
+        return "str"
+
+    texts = [value.strip() for value in texts]
+    if all(value.lower() in _BOOLEANS for value in texts):
+        return "bool"
+    if all(_INT_RE.fullmatch(value) for value in texts):
+        return "bigint" if any(abs(int(value)) >= _INT32 for value in texts) else "int"
+    if all(_FLOAT_RE.fullmatch(value) for value in texts):
+        return "float"
+    if all(_DATE_RE.fullmatch(value) and _parses(date.fromisoformat, value) for value in texts):
+        return "date"
+    if all(_DATETIME_RE.match(value) and _parses(datetime.fromisoformat, value) for value in texts):
+        return "datetime"
+    return "str"
+
+
+def _parses(parse, value) -> bool:
+    try:
+        parse(value)
+        return True
+    except ValueError:
+        return False
+
+
+def _convert(fields: list, record) -> dict:
+    """_summary_ : one record (CSV fields or JSON object) as a dict of converted column values
+    """
+    row = {}
+    csv_record = isinstance(record, list)
+    for source, name, kind in fields:
+        if csv_record:
+            value = record[source] if source < len(record) else None
+            if value == "":
+                value = None
+        else:
+            value = record.get(source)
+        row[name] = value if value is None else _CONVERTERS[kind](value)
+    return row
+
+
+def _to_bool(value):
+    if isinstance(value, str):
+        text = value.strip().lower()
+        if text in _BOOLEANS:
+            return _BOOLEANS[text]
+        if text in ("1", "0"):
+            return text == "1"
+        raise ValueError(f"not a boolean: {value!r}")
+    return bool(value)
+
+
+def _to_int(value):
+    if isinstance(value, str):
+        return int(value.strip())
+    if isinstance(value, float) and not value.is_integer():
+        raise ValueError(f"not an integer: {value!r}")
+    return int(value)
+
+
+def _to_text(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _from_iso(parse):
+    def convert(value):
+        return parse(value.strip()) if isinstance(value, str) else value
+    return convert
+
+
+_CONVERTERS = {
+    "bool": _to_bool,
+    "int": _to_int,
+    "bigint": _to_int,
+    "float": lambda value: float(value.strip() if isinstance(value, str) else value),
+    "decimal": lambda value: Decimal(value.strip() if isinstance(value, str) else str(value)),
+    "date": _from_iso(date.fromisoformat),
+    "datetime": _from_iso(datetime.fromisoformat),
+    "time": _from_iso(time.fromisoformat),
+    "str": _to_text,
+    "json": lambda value: value if isinstance(value, str) else json.dumps(value),
+    "object": lambda value: json.loads(value) if isinstance(value, str) else value,
+    "raw": lambda value: value,
+}
+
+
+def _split_lines(data: bytes, start: int) -> list:
+    """_summary_ : (offset, text) of each line of a byte range, text None if it isn't UTF-8
+    """
+    lines = []
+    offset = start
+    for raw in data.split(b"\n"):
+        if raw or offset - start < len(data):
+            try:
+                text = raw.decode("utf-8") + "\n"
+            except UnicodeDecodeError:
+                text = None
+            lines.append((offset, text))
+        offset += len(raw) + 1
+    if lines and data and not data.endswith(b"\n"):
+        # the last line of the file has no line break
+        last_offset, last_text = lines[-1]
+        lines[-1] = (last_offset, last_text[:-1] if last_text is not None else None)
+    return lines
+
+
+def _csv_records(lines: list, dialect: dict):
+    """_summary_ : (offset, fields or error message, lines used) of each CSV record in a list
+                    of (offset, text) lines
+    """
+    position = [-1]
+
+    def source():
+        for i, (_, text) in enumerate(lines):
+            position[0] = i
+            yield text if text is not None else ""
+
+    reader = csv.reader(source(), strict=True, **(dialect or {}))
+    first = 0
+    while True:
+        try:
+            fields = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            if "unexpected end of data" in str(e):
+                # a quoted field runs past the last line: a record with a line break in it
+                yield lines[first][0], str(e), len(lines) - first + 1
+                return
+            fields = str(e)
+        if first < len(lines) and lines[first][1] is None:
+            fields = "not valid UTF-8"
+        yield lines[first][0], fields, position[0] - first + 1
+        first = position[0] + 1
+
+
+def _complete(lines: list, dialect: dict) -> bool:
+    """_summary_ : True if the lines hold a whole CSV record (no quoted field left open)
+    """
+    for _, fields, _ in _csv_records(lines, dialect):
+        if isinstance(fields, str) and "unexpected end of data" in fields:
+            return False
+    return True
+
+
+def _next_offset(lines: list, offset: int, count: int) -> int:
+    """_summary_ : offset of the line after the record at offset spanning count lines
+    """
+    index = next(i for i, (line_offset, _) in enumerate(lines) if line_offset == offset) + count
+    if index < len(lines):
+        return lines[index][0]
+    last_offset, last_text = lines[-1]
+    return last_offset + len((last_text or "").encode("utf-8"))
+
+
+def _line_text(lines: list, offset: int, data: bytes, start: int) -> str:
+    """_summary_ : the text of the line at offset in a list of (offset, text) lines
+    """
+    for line_offset, text in lines:
+        if line_offset == offset:
+            return text if text is not None else _raw_line(data, offset - start)
+    return ""
+
+
+def _raw_line(data: bytes, position: int) -> str:
+    """_summary_ : a line that isn't valid UTF-8, with the invalid bytes replaced
+    """
+    return data[position:].split(b"\n", 1)[0].decode("utf-8", "replace")
+
+
+def _has_bom(path: str) -> bool:
+    with open(path, "rb") as file:
+        return file.read(3) == b"\xef\xbb\xbf"
+
+
+def _ranges(path: str, start: int, size: int, chunk_bytes: int):
+    """_summary_ : (start, end) byte ranges of about chunk_bytes, each ending after a line break
+    """
+    with open(path, "rb") as file:
+        while start < size:
+            file.seek(min(start + chunk_bytes, size))
+            file.readline()
+            end = min(file.tell(), size)
+            yield start, end
+            start = end
+
+
+def _read_lines(file, offset: int):
+    """_summary_ : (offset, text) of each line of a binary file from its current position
+    """
+    for offset, _, text in _read_raw_lines(file, offset):
+        yield offset, text
+
+
+def _read_raw_lines(file, offset: int):
+    """_summary_ : (offset, bytes, text) of each line of a binary file from its current
+                    position, text None if it isn't UTF-8
+    """
+    for raw in file:
+        try:
+            text = raw.decode("utf-8")
+        except UnicodeDecodeError:
+            text = None
+        yield offset, raw, text
+        offset += len(raw)
+
+
+def _parse_sequential(path: str, fields: list, start: int, dialect: dict, chunk_bytes: int, should_stop=None):
+    """_summary_ : parses a CSV file with quoted line breaks from an offset in this process,
+                    cutting chunks at record boundaries
+    """
+    with open(path, "rb") as file:
+        file.seek(start)
+        # lines the reader has taken for the record being read
+        consumed = []
+
+        def source():
+            for line in _read_raw_lines(file, start):
+                consumed.append(line)
+                yield line[2] if line[2] is not None else ""
+
+        chunk = ParsedChunk(start, start)
+        record_start = start
+        for record in csv.reader(source(), **(dialect or {})):
+            invalid = any(text is None for _, _, text in consumed)
+            text = "".join(raw.decode("utf-8", "replace") if text is None else text for _, raw, text in consumed)
+            # by the bytes read, so a line that isn't UTF-8 still moves the next record (and
+            # the offset an import resumes from) past it
+            last_offset, last_raw, _ = consumed[-1]
+            record_end = last_offset + len(last_raw)
+            consumed.clear()
+            if invalid:
+                chunk.bad.append((record_start, "not valid UTF-8", text))
+            elif record:
+                try:
+                    chunk.rows.append(_convert(fields, record))
+                    chunk.offsets.append(record_start)
+                except (ValueError, TypeError, KeyError, ArithmeticError) as e:
+                    chunk.bad.append((record_start, str(e), text))
+            record_start = record_end
+            if record_start - chunk.start >= chunk_bytes:
+                chunk.end = record_start
+                yield chunk
+                if should_stop is not None and should_stop():
+                    return
+                chunk = ParsedChunk(record_start, record_start)
+        chunk.end = record_start
+        if chunk.end > chunk.start:
+            yield chunk
@@ -0,0 +1,224 @@
+"""_summary_ : Index advice from the slow-query log: the columns slow statements filter
+                and join on, for the tables their plans read with a full scan, as
+                candidate indexes (skipping columns an existing index already leads with).
+"""
+
+# import necessary modules
+from . import sqltokens
+
+
+# statements worth indexing for
+ADVISED_KINDS = {"SELECT", "WITH", "UPDATE", "DELETE"}
+# longest index name most servers accept (Postgres truncates at 63)
+MAX_NAME_LENGTH = 63
+
+# keywords that open a clause whose comparisons are filters or join conditions
+_FILTER_START = {"WHERE", "ON"}
+# keywords that close it
+_FILTER_END = {"GROUP", "ORDER", "HAVING", "LIMIT", "OFFSET", "FETCH", "UNION", "INTERSECT",
+               "EXCEPT", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "CROSS", "NATURAL", "SELECT",
+               "FROM", "SET", "RETURNING", "WINDOW", "FOR", "VALUES"}
+# comparisons an index can seek on (equality) or range scan on
+_EQUALITY = {"=", "IN", "IS"}
+_RANGE = {"<", ">", "<=", ">=", "BETWEEN", "LIKE"}
+# words that are never column names in a filter
+_NOT_COLUMNS = {"AND", "OR", "NOT", "NULL", "TRUE", "FALSE", "EXISTS", "CASE", "WHEN", "THEN",
+                "ELSE", "END", "ANY", "ALL", "SOME", "INTERVAL", "CURRENT_DATE", "CURRENT_TIMESTAMP"}
+
+
+class IndexSuggestion:
+    """_summary_ : a candidate index and the slow statements it would help
+    """
+
+    def __init__(self, table: str, columns: list):
+        self.table = table
+        # equality columns first, then at most one range column
+        self.columns = list(columns)
+        self.statements = []
+        self.seconds = 0.0
+        # whether a plan showed the table being fully scanned (False: not explained)
+        self.full_scan = False
+
+    @property
+    def name(self) -> str:
+        """_summary_ : index name (e.g. "ix_orders_user_id_created_at")
+        """
+        return index_name(self.table, self.columns)
+
+    @property
+    def reason(self) -> str:
+        """_summary_ : why it is suggested (e.g. "full scan in 3 slow statements (4.21 s)")
+        """
+        count = len(self.statements)
+        what = "full scan" if self.full_scan else "filtered, not explained,"
+        plural = "s" if count != 1 else ""
+        return f"{what} in {count} slow statement{plural} ({self.seconds:.2f} s)"
+
+    def __repr__(self):
+        return f"IndexSuggestion({self.table!r}, {self.columns!r}, {self.reason!r})"
+
+
+def index_name(table_name: str, columns: list) -> str:
+    """_summary_ : the default name of an index (e.g. "ix_users_email")
+    """
+    return f"ix_{table_name}_{'_'.join(columns)}"[:MAX_NAME_LENGTH]
+
+
+def filter_columns(sql_or_tokens) -> list:
+    """_summary_ : column references compared in WHERE and JOIN ... ON clauses
+
+    Args:
+        sql_or_tokens (str | list): _description_ (e.g. "SELECT * FROM orders o WHERE o.user_id = 3")
+
+    Returns:
+        list: _description_ (e.g. [("o", "user_id", "equality")]), (qualifier or None, column,
+              "equality" or "range") in statement order
+    """
+    tokens = sqltokens.tokenize(sql_or_tokens) if isinstance(sql_or_tokens, str) else sql_or_tokens
+    columns = []
+    in_filter = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        keyword = token.upper
+        if keyword in _FILTER_START:
+            in_filter = True
+        elif keyword in _FILTER_END:
+            in_filter = False
+        if not in_filter or not _is_name(token):
+            i += 1
+            continue
+
+        # [schema.][table.]column, but not a function call
+        parts = [token.name]
+        j = i + 1
+        while j + 1 < len(tokens) and tokens[j].text == "." and _is_name(tokens[j + 1]):
+            parts.append(tokens[j + 1].name)
+            j += 2
+        if j < len(tokens) and tokens[j].text == "(":
+            i = j
+            continue
+        qualifier = parts[-2] if len(parts) > 1 else None
+
+        operator = _operator(tokens[j]) if j < len(tokens) else None
+        previous = _operator(tokens[i - 1]) if i > 0 else None
+        if operator in _EQUALITY or previous == "=":
+            columns.append((qualifier, parts[-1], "equality"))
+        elif operator in _RANGE:
+            columns.append((qualifier, parts[-1], "range"))
+        i = j
+    return columns
+
+
+def suggest_indexes(entries, explain_plan=None, existing_indexes=None, columns_of=None,
+                    max_columns: int = 3) -> list:
+    """_summary_ : candidate indexes for a set of slow statements
+
+    Args:
+        entries (iterable): slow queries (e.g. [{"statement": "SELECT ...", "seconds": 2.1}]) or statements
+        explain_plan (callable, optional): statement -> QueryPlan or None. Defaults to None (nothing
+                                           is explained, every filtered table is a candidate).
+        existing_indexes (callable, optional): table -> list of column lists of its indexes and
+                                               primary key (e.g. [["id"], ["email"]]). Defaults to None.
+        columns_of (callable, optional): table -> its column names, used to resolve unqualified
+                                         columns and drop unknown names. Defaults to None.
+        max_columns (int, optional): longest suggested index. Defaults to 3.
+
+    Returns:
+        list: _description_ (e.g. [IndexSuggestion("orders", ["user_id"], ...)]), slowest first
+    """
+    suggestions = {}
+    known_columns = {}
+    existing = {}
+
+    def table_columns(table):
+        if columns_of is None:
+            return None
+        if table not in known_columns:
+            known_columns[table] = {column.lower() for column in columns_of(table)}
+        return known_columns[table]
+
+    for entry in entries:
+        statement = entry["statement"] if isinstance(entry, dict) else entry
+        seconds = entry.get("seconds", 0.0) if isinstance(entry, dict) else 0.0
+        tokens = sqltokens.tokenize(statement)
+        if sqltokens.statement_kind(tokens) not in ADVISED_KINDS:
+            continue
+        aliases = sqltokens.table_aliases(tokens)
+        if not aliases:
+            continue
+
+        # the full-scanned tables, if the statement can be explained (bind parameters can't be)
+        plan = None
+        if explain_plan is not None and not any(token.kind == "param" for token in tokens):
+            plan = explain_plan(statement)
+        scanned = None
+        if plan is not None:
+            scanned = {aliases.get(node.relation.lower(), node.relation.lower())
+                       for _, node in plan.root.walk() if node.full_scan and node.relation}
+            if not scanned:
+                continue
+
+        by_table = {}
+        tables = set(aliases.values())
+        for qualifier, column, kind in filter_columns(tokens):
+            table = aliases.get(qualifier) if qualifier is not None else _owner(column, tables, table_columns)
+            if table is None or (scanned is not None and table not in scanned):
+                continue
+            names = table_columns(table)
+            if names is not None and column.lower() not in names:
+                continue
+            equality, ranges = by_table.setdefault(table, ([], []))
+            target = equality if kind == "equality" else ranges
+            if column not in equality and column not in target:
+                target.append(column)
+
+        for table, (equality, ranges) in by_table.items():
+            columns = equality[:max_columns]
+            if len(columns) < max_columns and ranges:
+                columns.append(ranges[0])
+            if not columns:
+                continue
+            if existing_indexes is not None:
+                if table not in existing:
+                    existing[table] = existing_indexes(table)
+                if _covered(columns, existing[table]):
+                    continue
+            suggestion = suggestions.setdefault((table, tuple(columns)), IndexSuggestion(table, columns))
+            suggestion.statements.append(statement)
+            suggestion.seconds += seconds
+            suggestion.full_scan = suggestion.full_scan or scanned is not None
+
+    return sorted(suggestions.values(), key=lambda suggestion: (-suggestion.seconds, suggestion.table))
+
+
+def _is_name(token) -> bool:
+    return token.kind == "identifier" or (token.kind == "word" and token.upper not in _NOT_COLUMNS
+                                          and token.upper not in _FILTER_START | _FILTER_END
+                                          and _operator(token) is None)
+
+
+def _operator(token) -> str:
+    """_summary_ : the comparison a token is (e.g. "=", "IN", "LIKE"), None otherwise
+    """
+    if token.kind == "punct":
+        return token.text if token.text in _EQUALITY or token.text in _RANGE else None
+    if token.kind == "word" and (token.upper in _EQUALITY or token.upper in _RANGE):
+        return token.upper
+    return None
+
+
+def _owner(column: str, tables: set, table_columns) -> str:
+    """_summary_ : the table an unqualified column belongs to, None if it can't be told
+    """
+    if len(tables) == 1:
+        return next(iter(tables))
+    owners = [table for table in tables if column.lower() in (table_columns(table) or ())]
+    return owners[0] if len(owners) == 1 else None
+
+
+def _covered(columns: list, indexes: list) -> bool:
+    """_summary_ : True if an index already leads with these columns (in any order)
+    """
+    wanted = {column.lower() for column in columns}
+    return any({column.lower() for column in index[:len(columns)] if column} == wanted for index in indexes)
@@ -0,0 +1,311 @@
+"""_summary_ : Per-statement timing, row counts and errors collected from SQLAlchemy
+                engine events, with latency histograms, a slow-query log and
+                JSON / Prometheus exports.
+"""
+
+# import necessary modules
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from .lazy import LazyModule
+
+# imported on the first attach(): the result classes import count_fetched() from
+# here, and they are loaded before the first window, when SQLAlchemy isn't yet
+event = LazyModule("sqlalchemy.event")
+
+
+# upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, math.inf)
+
+slow_query_logger = logging.getLogger("database.slow_queries")
+# execution option of statements whose failures the caller expects and reports itself
+# (e.g. the halving inserts of bulk.insert_isolating): they are counted, not logged
+QUIET_ERRORS = "pydb_quiet_errors"
+# slow-query log files already attached to slow_query_logger (one handler per file)
+_slow_log_files = set()
+_slow_log_lock = threading.Lock()
+
+
+class Histogram:
+    """_summary_ : fixed-bucket latency histogram
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """_summary_ : adds one observation
+        """
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """_summary_ : upper bound of the bucket holding the q-th quantile (e.g. 0.95)
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": _json_bound(self.quantile(0.5)),
+            "p95": _json_bound(self.quantile(0.95)),
+            "p99": _json_bound(self.quantile(0.99)),
+            "buckets": {_format_bound(b): c for b, c in zip(self.buckets, self.counts)},
+        }
+
+
+class ConnectionMetrics:
+    """_summary_ : figures collected for one named connection
+    """
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.statements = 0
+        # rows written by INSERT/UPDATE/DELETE, and rows read out of result sets
+        self.rows_affected = 0
+        self.rows_returned = 0
+        self.errors = 0
+        self.slow_queries = 0
+
+
+class QueryMetrics:
+    """_summary_ : collects statement metrics from every engine attached to it
+
+        Rows affected are the cursor's rowcount after a statement that returns no
+        rows. Rows returned are counted as they are fetched (see count_fetched()),
+        since many drivers report no rowcount for a SELECT (-1 on sqlite3 and on
+        server-side cursors). Pool checkout waits come from the connection's pool (see connections.PoolStats).
+    """
+
+    def __init__(self, slow_query_threshold: float = 1.0, slow_log_path: str = None, keep_slow: int = 100):
+        """_summary_
+
+        Args:
+            slow_query_threshold (float, optional): seconds after which a statement is logged
+                                                    as slow. Defaults to 1.0.
+            slow_log_path (str, optional): file the slow-query log is also written to.
+                                           Defaults to None (logging handlers only).
+            keep_slow (int, optional): slow statements kept in memory. Defaults to 100.
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_queries = deque(maxlen=keep_slow)
+        self._connections = {}
+        self._entries = {}
+        self._lock = threading.Lock()
+        if slow_log_path is not None:
+            _add_slow_log_file(slow_log_path)
+
+    def attach(self, entry):
+        """_summary_ : starts collecting metrics for a connection's engine
+
+        Args:
+            entry (ConnectionEntry): the open connection
+        """
+        name = entry.name
+        with self._lock:
+            if self._entries.get(name) is entry:
+                return
+            self._connections.setdefault(name, ConnectionMetrics())
+            self._entries[name] = entry
+        engine = entry.engine
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute",
+                     lambda *args: self._after_cursor_execute(name, *args))
+        event.listen(engine, "handle_error",
+                     lambda context: self._handle_error(name, context))
+
+    def detach(self, name: str):
+        """_summary_ : forgets a closed connection's pool (its figures are kept)
+        """
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._query_start = time.perf_counter()
+
+    def _after_cursor_execute(self, name, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_query_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        returns_rows = getattr(cursor, "description", None) is not None
+        rowcount = getattr(cursor, "rowcount", -1)
+        if returns_rows:
+            # rows are counted as they are fetched
+            context._count_rows = lambda count: self._add_rows_returned(name, count)
+        with self._lock:
+            metrics = self._connections[name]
+            metrics.statements += 1
+            metrics.latency.observe(elapsed)
+            if not returns_rows and rowcount is not None and rowcount > 0:
+                metrics.rows_affected += rowcount
+            slow = elapsed >= self.slow_query_threshold
+            if slow:
+                metrics.slow_queries += 1
+                self.slow_queries.append({
+                    "connection": name,
+                    "statement": statement,
+                    "seconds": elapsed,
+                    "at": time.time(),
+                })
+        if slow:
+            slow_query_logger.warning("slow query on %s (%.3fs): %s", name, elapsed, " ".join(statement.split()))
+
+    def _add_rows_returned(self, name, count: int):
+        with self._lock:
+            self._connections[name].rows_returned += count
+
+    def _handle_error(self, name, context):
+        with self._lock:
+            self._connections[name].errors += 1
+        execution = context.execution_context
+        if execution is not None and execution.execution_options.get(QUIET_ERRORS):
+            return
+        logging.error(f"Query error on {name}: {context.original_exception}")
+
+    def snapshot(self) -> dict:
+        """_summary_ : every figure collected so far, per connection
+
+        Returns:
+            dict: _description_ (e.g. {"connections": {"db_prime": {"statements": 10, ...}}, "slow_queries": [...]})
+        """
+        with self._lock:
+            connections = {}
+            for name, metrics in self._connections.items():
+                entry = self._entries.get(name)
+                connections[name] = {
+                    "statements": metrics.statements,
+                    "rows_affected": metrics.rows_affected,
+                    "rows_returned": metrics.rows_returned,
+                    "errors": metrics.errors,
+                    "slow_queries": metrics.slow_queries,
+                    "latency": metrics.latency.snapshot(),
+                    "pool": entry.pool_status() if entry is not None else {},
+                }
+            return {
+                "generated_at": time.time(),
+                "slow_query_threshold": self.slow_query_threshold,
+                "connections": connections,
+                "slow_queries": list(self.slow_queries),
+            }
+
+    def to_prometheus(self) -> str:
+        """_summary_ : the metrics in the Prometheus text exposition format
+        """
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP pydb_query_duration_seconds Statement execution time.",
+            "# TYPE pydb_query_duration_seconds histogram",
+        ]
+        for name, metrics in snapshot["connections"].items():
+            label = f'connection="{_escape_label(name)}"'
+            cumulative = 0
+            for bound, count in metrics["latency"]["buckets"].items():
+                cumulative += count
+                lines.append(f'pydb_query_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+            lines.append(f"pydb_query_duration_seconds_sum{{{label}}} {metrics['latency']['sum']}")
+            lines.append(f"pydb_query_duration_seconds_count{{{label}}} {metrics['latency']['count']}")
+
+        counters = (
+            ("pydb_query_rows_affected_total", "rows_affected", "Rows written by INSERT/UPDATE/DELETE."),
+            ("pydb_query_rows_returned_total", "rows_returned", "Rows fetched from query results."),
+            ("pydb_query_errors_total", "errors", "Statements that raised an error."),
+            ("pydb_slow_queries_total", "slow_queries", "Statements slower than the threshold."),
+        )
+        for metric, key, help_text in counters:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, metrics in snapshot["connections"].items():
+                lines.append(f'{metric}{{connection="{_escape_label(name)}"}} {metrics[key]}')
+
+        pools = [(f'connection="{_escape_label(name)}"', metrics["pool"])
+                 for name, metrics in snapshot["connections"].items() if "checkouts" in metrics["pool"]]
+        lines.append("# HELP pydb_pool_checkout_wait_seconds Time spent waiting for a pooled connection.")
+        lines.append("# TYPE pydb_pool_checkout_wait_seconds summary")
+        for label, pool in pools:
+            lines.append(f"pydb_pool_checkout_wait_seconds_sum{{{label}}} {pool['total_wait']}")
+            lines.append(f"pydb_pool_checkout_wait_seconds_count{{{label}}} {pool['checkouts']}")
+        lines.append("# HELP pydb_pool_checkout_timeouts_total Checkouts that timed out waiting for a connection.")
+        lines.append("# TYPE pydb_pool_checkout_timeouts_total counter")
+        for label, pool in pools:
+            lines.append(f"pydb_pool_checkout_timeouts_total{{{label}}} {pool['timeouts']}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str, fmt: str = "json"):
+        """_summary_ : writes the metrics to a file (replaced atomically)
+
+        Args:
+            path (str): _description_ (e.g. "logs/metrics.json")
+            fmt (str, optional): "json" or "prometheus". Defaults to "json".
+        """
+        if fmt == "prometheus":
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), indent=2, default=str)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+
+def count_fetched(result, count: int):
+    """_summary_ : adds rows fetched from an executed result to its connection's rows
+                    returned (nothing happens for an engine QueryMetrics isn't attached to)
+
+    Args:
+        result (CursorResult): the result the rows were fetched from
+        count (int): _description_ (e.g. 1000)
+    """
+    counter = getattr(getattr(result, "context", None), "_count_rows", None)
+    if counter is not None and count:
+        counter(count)
+
+
+def _add_slow_log_file(path: str):
+    """_summary_ : writes the slow-query log to a file as well, once per file however
+                    many QueryMetrics are created with it
+    """
+    path = os.path.abspath(path)
+    with _slow_log_lock:
+        if path in _slow_log_files:
+            return
+        handler = logging.FileHandler(path)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
+        slow_query_logger.addHandler(handler)
+        _slow_log_files.add(path)
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def _json_bound(bound: float):
+    """_summary_ : a quantile for JSON: the open-ended bucket has no finite bound, so None
+    """
+    return None if bound == math.inf else bound
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
@@ -0,0 +1,66 @@
+"""_summary_ : Deferred imports of heavy optional modules (numpy, pyarrow), so they
+                cost nothing at startup and are only loaded by the code that uses them.
+"""
+
+# import necessary modules
+import importlib
+import importlib.util
+import threading
+
+
+class LazyModule:
+    """_summary_ : stands in for a module until one of its attributes is used
+
+        `available` tells whether the module is installed without importing it;
+        the first attribute access imports it (and the given submodules).
+    """
+
+    def __init__(self, name: str, submodules: tuple = ()):
+        """_summary_
+
+        Args:
+            name (str): _description_ (e.g. "pyarrow")
+            submodules (tuple, optional): imported along with it (e.g. ("pyarrow.parquet",)). Defaults to ().
+        """
+        self._name = name
+        self._submodules = submodules
+        self._module = None
+        self._available = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """_summary_ : True if the module is installed (it isn't imported to find out)
+        """
+        if self._available is None:
+            self._available = self._module is not None or importlib.util.find_spec(self._name) is not None
+        return self._available
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def load(self):
+        """_summary_ : imports the module now (e.g. from a warm-up thread)
+
+        Returns:
+            module: the module, or None if it isn't installed
+        """
+        if self._module is None and self.available:
+            with self._lock:
+                if self._module is None:
+                    module = importlib.import_module(self._name)
+                    for submodule in self._submodules:
+                        importlib.import_module(submodule)
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attribute):
+        module = self.load()
+        if module is None:
+            raise ImportError(f"{self._name} is not installed")
+        return getattr(module, attribute)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"LazyModule({self._name!r}, {state})"
@@ -0,0 +1,97 @@
+"""_summary_ : Column descriptions of query results: the names and types reported
+                by the cursor, so callers don't need a catalog lookup to label them.
+"""
+
+
+# DBAPI type objects, most specific first (PEP 249: type codes compare equal to them)
+_DBAPI_TYPES = ("NUMBER", "DATETIME", "BINARY", "ROWID", "STRING")
+
+
+class ResultColumn:
+    """_summary_ : one column of a result, from cursor.description
+
+        type is the DBAPI type group ("NUMBER", "STRING", "DATETIME" ...), the Python
+        type name for drivers that report one (e.g. pyodbc) or, for drivers that
+        report nothing (SQLite), the Python type of the first non-NULL value fetched.
+    """
+
+    __slots__ = ("name", "type", "type_code", "display_size", "precision", "scale", "nullable")
+
+    def __init__(self, name: str, type: str = None, type_code=None, display_size: int = None,
+                 precision: int = None, scale: int = None, nullable: bool = None):
+        self.name = name
+        self.type = type
+        self.type_code = type_code
+        self.display_size = display_size
+        self.precision = precision
+        self.scale = scale
+        self.nullable = nullable
+
+    def as_dict(self) -> dict:
+        """_summary_ : the column in the shape of inspector column dicts
+
+        Returns:
+            dict: _description_ (e.g. {"name": "id", "type": "NUMBER", "nullable": None})
+        """
+        return {"name": self.name, "type": self.type or "", "nullable": self.nullable}
+
+    def __repr__(self):
+        return f"ResultColumn({self.name!r}, {self.type!r})"
+
+
+def describe(result) -> list:
+    """_summary_ : the columns of an executed result, without querying the catalog
+
+    Args:
+        result (CursorResult): a result that returns rows
+
+    Returns:
+        list: ResultColumn objects in result order
+    """
+    names = list(result.keys())
+    cursor = getattr(result, "cursor", None)
+    description = getattr(cursor, "description", None) or []
+    context = getattr(result, "context", None)
+    dbapi = getattr(getattr(context, "dialect", None), "dbapi", None)
+
+    columns = []
+    for i, name in enumerate(names):
+        entry = tuple(description[i]) + (None,) * 7 if i < len(description) else (None,) * 7
+        _, type_code, display_size, _, precision, scale, null_ok = entry[:7]
+        columns.append(ResultColumn(
+            name,
+            type=_type_name(type_code, dbapi),
+            type_code=type_code,
+            display_size=display_size,
+            precision=precision,
+            scale=scale,
+            nullable=null_ok,
+        ))
+    return columns
+
+
+def fill_types(description: list, rows: list):
+    """_summary_ : gives untyped columns the Python type of their first non-NULL value
+    """
+    for i, column in enumerate(description):
+        if column.type is not None:
+            continue
+        for row in rows:
+            if row[i] is not None:
+                column.type = type(row[i]).__name__
+                break
+
+
+def _type_name(type_code, dbapi):
+    if type_code is None:
+        return None
+    if isinstance(type_code, type):
+        return type_code.__name__
+    for name in _DBAPI_TYPES:
+        type_object = getattr(dbapi, name, None)
+        try:
+            if type_object is not None and type_code == type_object:
+                return name
+        except Exception:
+            continue
+    return str(type_code)
@@ -0,0 +1,563 @@
+"""_summary_ : Runs queries on worker threads, each on its own pooled connection,
+                with driver-level cancellation.
+"""
+
+# import necessary modules
+import collections
+import pickle
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from sqlalchemy import event, text
+from sqlalchemy.pool import StaticPool
+
+from . import sqltokens
+from .explain import explain as explain_plan
+from .export import export_stream
+from .resultset import ResultSet
+from .script import run_statements, split_script
+from .statements import StatementCache, execute
+from .streaming import ResultStream
+
+
+class ChunkSpool:
+    """_summary_ : FIFO of fetched chunks that never blocks the producer: the first
+                    `in_memory` chunks waiting to be read are kept in memory and the rest
+                    are pickled to a temporary file until the consumer gets to them
+    """
+
+    def __init__(self, in_memory: int):
+        self.in_memory = in_memory
+        self._memory = collections.deque()
+        self._file = None
+        self._read_at = 0
+        # chunks written to the file and not read yet
+        self._spooled = 0
+        self._lock = threading.Lock()
+
+    def put(self, chunk: list):
+        """_summary_ : appends a chunk (to the file once the in-memory part is full)
+        """
+        with self._lock:
+            if not self._spooled and len(self._memory) < self.in_memory:
+                self._memory.append(chunk)
+                return
+            if self._file is None:
+                self._file = tempfile.TemporaryFile(prefix="pydb_spool_")
+            self._file.seek(0, 2)
+            pickle.dump(chunk, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+            self._spooled += 1
+
+    def get(self) -> list:
+        """_summary_ : oldest chunk, or None if there is none
+        """
+        with self._lock:
+            if self._memory:
+                return self._memory.popleft()
+            if not self._spooled:
+                return None
+            self._file.seek(self._read_at)
+            chunk = pickle.load(self._file)
+            self._read_at = self._file.tell()
+            self._spooled -= 1
+            if not self._spooled:
+                # everything written has been read: start the file over
+                self._file.seek(0)
+                self._file.truncate()
+                self._read_at = 0
+            return chunk
+
+    def empty(self) -> bool:
+        with self._lock:
+            return not self._memory and not self._spooled
+
+    def clear(self):
+        """_summary_ : discards every chunk and removes the temporary file
+        """
+        with self._lock:
+            self._memory.clear()
+            self._spooled = 0
+            self._read_at = 0
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class QueryJob:
+    """_summary_ : a query submitted to the QueryRunner.
+
+        The worker thread fills the job's chunk queue; the UI thread reads it with
+        fetch_chunk(), which never blocks, so a job can be handed to ResultGrid like a
+        ResultStream. The worker reads the whole result without waiting for the
+        consumer, so its connection goes back to the pool (and its transaction ends)
+        as soon as the query is done; chunks not consumed yet beyond the first few are
+        spooled to a temporary file.
+    """
+
+    # chunks kept in memory ahead of the consumer (the rest are spooled to disk)
+    PREFETCH = 4
+
+    def __init__(self, sql: str, chunk_size: int, limit: int = None, memory_budget: int = None, params=None):
+        self.sql = sql
+        # values of the statement's :name parameters (a list of dicts runs it once per dict)
+        self.params = params
+        self.chunk_size = chunk_size
+        self.limit = limit
+        self.memory_budget = memory_budget
+        # "pending", "running", "done", "error" or "cancelled"
+        self.state = "pending"
+        self.error = None
+        self.columns = None
+        # names and types of the columns (ResultColumn objects)
+        self.description = None
+        self.rowcount = None
+        self.rows = 0
+        self.truncated = False
+        self.started = None
+        self.finished = None
+        # True when the rows were served from the result cache
+        self.cached = False
+        self._cache_key = None
+
+        self._chunks = ChunkSpool(self.PREFETCH)
+        self._cancel_requested = threading.Event()
+        self._cancel_handler = None
+
+    @property
+    def running(self) -> bool:
+        """_summary_ : True until the worker has finished with the job
+        """
+        return self.state in ("pending", "running")
+
+    @property
+    def elapsed(self) -> float:
+        """_summary_ : seconds since the job started (or its total run time once finished)
+        """
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def closed(self) -> bool:
+        """_summary_ : True once the worker is finished and every chunk has been consumed
+        """
+        return not self.running and self._chunks.empty()
+
+    def fetch_chunk(self) -> list:
+        """_summary_ : next fetched chunk, or [] if none is ready yet (never blocks)
+        """
+        chunk = self._chunks.get()
+        return chunk if chunk is not None else []
+
+    def cancel(self):
+        """_summary_ : asks the driver to cancel the running statement and stops fetching
+        """
+        self._cancel_requested.set()
+        handler = self._cancel_handler
+        if handler is not None and self.state == "running":
+            try:
+                handler()
+            except Exception as e:
+                print(f"Query cancellation failed: {str(e)}")
+
+    def close(self):
+        """_summary_ : ResultStream compatible: cancels the job if it is still running and
+                        discards the chunks not consumed yet
+        """
+        if self.running:
+            self.cancel()
+        self._chunks.clear()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_requested.is_set()
+
+    def _put(self, chunk: list) -> bool:
+        """_summary_ : hands a chunk to the consumer (never waits for it)
+
+        Returns:
+            bool: False if the job has been cancelled
+        """
+        if self.cancelled:
+            return False
+        self._chunks.put(chunk)
+        return True
+
+
+class ExportJob(QueryJob):
+    """_summary_ : a query whose rows are written to a file by the worker instead of queued
+
+    Args:
+        QueryJob (_type_): _description_
+    """
+
+    def __init__(self, sql: str, path: str, fmt: str = None, chunk_size: int = 5000):
+        QueryJob.__init__(self, sql, chunk_size)
+        self.path = path
+        self.fmt = fmt
+
+
+class ScriptJob(QueryJob):
+    """_summary_ : a multi-statement script; each statement's result is collected in
+                    `report` (rows included) instead of being queued
+
+    Args:
+        QueryJob (_type_): _description_
+    """
+
+    def __init__(self, sql: str, mode: str = "transaction", batch_size: int = 100,
+                 stop_on_error: bool = True, limit: int = None, memory_budget: int = None):
+        QueryJob.__init__(self, sql, chunk_size=1000, limit=limit, memory_budget=memory_budget)
+        self.statements = split_script(sql)
+        self.mode = mode
+        self.batch_size = batch_size
+        self.stop_on_error = stop_on_error
+        # statements run so far
+        self.current = 0
+        self.report = None
+
+
+class ExplainJob(QueryJob):
+    """_summary_ : an EXPLAIN (or EXPLAIN ANALYZE) of a statement; the parsed plan
+                    ends up in `plan` instead of rows being queued
+
+    Args:
+        QueryJob (_type_): _description_
+    """
+
+    def __init__(self, sql: str, analyze: bool = False):
+        QueryJob.__init__(self, sql, chunk_size=1000)
+        self.analyze = analyze
+        self.plan = None
+
+
+class QueryRunner:
+    """_summary_ : executes QueryJobs on a thread pool using connections from the engine's pool
+
+        Each job runs in a transaction of its own that commits when it succeeds. Jobs
+        that write are refused while holds_writes() is True, i.e. while the manager
+        has writes of its own pending on the connection (manual mode or a
+        transaction() block), which a job's commit would otherwise sit beside or
+        wait on (a SQLite file allows one writer).
+    """
+
+    def __init__(self, engine, max_workers: int = 2, result_cache=None, name: str = None,
+                 statements: StatementCache = None, holds_writes=None, on_schema_change=None):
+        """_summary_
+
+        Args:
+            engine (Engine): engine the worker connections are checked out from
+            max_workers (int, optional): queries that may run at the same time. Defaults to 2.
+            result_cache (ResultCache, optional): cache SELECT results are served from and
+                                                  stored in. Defaults to None (no caching).
+            name (str, optional): connection name the cache entries are kept under. Defaults to None.
+            statements (StatementCache, optional): text() constructs shared with the manager.
+                                                   Defaults to a cache of the runner's own.
+            holds_writes (callable, optional): returns True while writing jobs must be refused.
+                                               Defaults to None (never).
+            on_schema_change (callable, optional): called (on the worker thread) after a
+                                                   CREATE/ALTER/DROP job succeeds. Defaults to None.
+        """
+        self.engine = engine
+        self.holds_writes = holds_writes
+        self.on_schema_change = on_schema_change
+        # one connection shared by every thread (in-memory SQLite), see connections.SharedTransactionLock
+        self._shared = isinstance(engine.pool, StaticPool)
+        self.result_cache = result_cache
+        self.name = name
+        self.statements = statements if statements is not None else StatementCache()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+
+    def submit(self, sql: str, chunk_size: int = 1000, limit: int = None, memory_budget: int = None,
+               params=None) -> QueryJob:
+        """_summary_ : queues a query for execution
+
+        Args:
+            sql (str): _description_ (e.g. "SELECT * FROM users WHERE id = :id")
+            chunk_size (int, optional): rows per fetched chunk. Defaults to 1000.
+            limit (int, optional): maximum rows fetched. Defaults to None.
+            memory_budget (int, optional): approximate bytes fetched before stopping. Defaults to None.
+            params (dict | list, optional): values of the :name parameters (e.g. {"id": 7}), or a list
+                                            of dicts for one executemany call. Defaults to None.
+
+        Returns:
+            QueryJob: the job to poll, read and cancel
+        """
+        job = QueryJob(sql, chunk_size, limit=limit, memory_budget=memory_budget, params=params)
+        if self.result_cache is not None and not isinstance(params, (list, tuple)):
+            job._cache_key = self.result_cache.key(self.name, sql, params)
+        self.executor.submit(self._run, job)
+        return job
+
+    def export(self, sql: str, path: str, fmt: str = None, chunk_size: int = 5000) -> "ExportJob":
+        """_summary_ : queues a query whose result is streamed straight to a file
+
+        Args:
+            sql (str): _description_ (e.g. "SELECT * FROM users")
+            path (str): _description_ (e.g. "exports/users.parquet")
+            fmt (str, optional): "csv", "jsonl" or "parquet". Defaults to the path's extension.
+            chunk_size (int, optional): rows per fetched chunk. Defaults to 5000.
+
+        Returns:
+            ExportJob: the job to poll (rows written so far) and cancel
+        """
+        job = ExportJob(sql, path, fmt, chunk_size)
+        self.executor.submit(self._run, job, self._write_file)
+        return job
+
+    def run_script(self, script: str, mode: str = "transaction", batch_size: int = 100,
+                   stop_on_error: bool = True, limit: int = None, memory_budget: int = None) -> ScriptJob:
+        """_summary_ : queues a multi-statement script (see script.run_statements)
+
+        Args:
+            script (str): _description_ (e.g. "CREATE TABLE a (id int); INSERT INTO a VALUES (1);")
+            mode (str, optional): "transaction" or "batch". Defaults to "transaction".
+            batch_size (int, optional): statements per commit in "batch" mode. Defaults to 100.
+            stop_on_error (bool, optional): stop at the first failed statement. Defaults to True.
+            limit (int, optional): rows kept per row-returning statement. Defaults to None.
+            memory_budget (int, optional): approximate bytes kept per statement. Defaults to None.
+
+        Returns:
+            ScriptJob: the job to poll (current statement, report) and cancel
+        """
+        job = ScriptJob(script, mode, batch_size, stop_on_error, limit, memory_budget)
+        self.executor.submit(self._run_script, job)
+        return job
+
+    def explain(self, sql: str, analyze: bool = False) -> ExplainJob:
+        """_summary_ : queues an EXPLAIN of a statement (see explain.explain)
+
+        Args:
+            sql (str): _description_ (e.g. "SELECT * FROM users WHERE email = 'a@b.c'")
+            analyze (bool, optional): execute it (rolled back) for actual rows and times. Defaults to False.
+
+        Returns:
+            ExplainJob: the job to poll (plan) and cancel
+        """
+        job = ExplainJob(sql, analyze)
+        self.executor.submit(self._run_explain, job)
+        return job
+
+    def shutdown(self):
+        """_summary_ : stops accepting jobs (running jobs finish in the background)
+        """
+        self.executor.shutdown(wait=False)
+
+    def _run(self, job: QueryJob, consume=None):
+        """_summary_ : worker body: executes the job on its own connection and hands the
+                        stream to consume(job, stream) (by default: into the job's queue)
+        """
+        if job.cancelled:
+            job.state = "cancelled"
+            return
+
+        consume = consume or self._fill_queue
+        job.started = time.perf_counter()
+        job.state = "running"
+        if job._cache_key is not None and self.result_cache is not None and self._replay(job):
+            return
+        try:
+            self._check_writes([job.sql])
+            with self.engine.connect() as connection:
+                job._cancel_handler = self._cancel_handler(connection)
+                # a read on the shared connection doesn't wait for another thread's transaction
+                read_only = self._shared and sqltokens.is_read_only(job.sql)
+                with nullcontext() if read_only else connection.begin():
+                    # an executemany returns no rows, so there is nothing to stream
+                    if isinstance(job.params, (list, tuple)):
+                        result = execute(connection, self.statements.get(job.sql), job.params)
+                    else:
+                        result = execute(connection.execution_options(
+                            stream_results=True, max_row_buffer=job.chunk_size
+                        ), self.statements.get(job.sql), job.params)
+                    stream = ResultStream(result, chunk_size=job.chunk_size,
+                                          limit=job.limit, memory_budget=job.memory_budget)
+                    job.rowcount = stream.rowcount
+                    job.description = stream.description
+                    job.columns = stream.columns
+                    consume(job, stream)
+                    job.truncated = stream.truncated
+            if job.cancelled:
+                job.state = "cancelled"
+            elif stream.error is not None:
+                job.error = stream.error
+                job.state = "error"
+            else:
+                job.state = "done"
+                if self.result_cache is not None:
+                    self.result_cache.invalidate_for(self.name, job.sql)
+                if self.on_schema_change is not None and sqltokens.changes_schema(job.sql):
+                    self.on_schema_change()
+        except Exception as e:
+            if job.cancelled:
+                job.state = "cancelled"
+            else:
+                job.error = str(e)
+                job.state = "error"
+                print(f"Query execution failed: {str(e)}")
+        finally:
+            job._cancel_handler = None
+            job.finished = time.perf_counter()
+
+    def _run_script(self, job: ScriptJob):
+        """_summary_ : worker body of a script job
+        """
+        if job.cancelled:
+            job.state = "cancelled"
+            return
+
+        def on_statement(result):
+            job.current = result.index + 1
+            job.rows += result.rowcount if result.returns_rows else 0
+
+        job.started = time.perf_counter()
+        job.state = "running"
+        try:
+            self._check_writes([statement.sql for statement in job.statements])
+            with self.engine.connect() as connection:
+                job._cancel_handler = self._cancel_handler(connection)
+                job.report = run_statements(connection, job.statements, job.mode, job.batch_size,
+                                            stop_on_error=job.stop_on_error, row_limit=job.limit,
+                                            memory_budget=job.memory_budget, on_statement=on_statement,
+                                            should_stop=lambda: job.cancelled)
+            if self.result_cache is not None:
+                for result in job.report.results:
+                    if result.error is None:
+                        self.result_cache.invalidate_for(self.name, result.sql)
+            if job.cancelled:
+                job.state = "cancelled"
+            elif job.report.failed:
+                job.error = job.report.summary()
+                job.state = "error"
+            else:
+                job.state = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.state = "cancelled" if job.cancelled else "error"
+            print(f"Script execution failed: {str(e)}")
+        finally:
+            job._cancel_handler = None
+            job.finished = time.perf_counter()
+
+    def _run_explain(self, job: ExplainJob):
+        """_summary_ : worker body of an explain job
+        """
+        if job.cancelled:
+            job.state = "cancelled"
+            return
+
+        job.started = time.perf_counter()
+        job.state = "running"
+        try:
+            with self.engine.connect() as connection:
+                job._cancel_handler = self._cancel_handler(connection)
+                job.plan = explain_plan(connection, job.sql, job.analyze)
+            job.state = "cancelled" if job.cancelled else "done"
+        except Exception as e:
+            job.error = str(e)
+            job.state = "cancelled" if job.cancelled else "error"
+            print(f"Explain failed: {str(e)}")
+        finally:
+            job._cancel_handler = None
+            job.finished = time.perf_counter()
+
+    def _check_writes(self, statements: list):
+        """_summary_ : raises if a statement writes while the manager holds uncommitted writes
+        """
+        if self.holds_writes is None or all(sqltokens.is_read_only(sql) for sql in statements):
+            return
+        if self.holds_writes():
+            raise RuntimeError("the connection is in manual commit mode or a transaction; commit "
+                               "or roll back its pending writes and switch to autocommit before "
+                               "running statements that write")
+
+    def _fill_queue(self, job: QueryJob, stream: ResultStream):
+        """_summary_ : moves the stream's chunks into the job's spool (and keeps
+                        a copy for the result cache while the result is small enough)
+        """
+        cache = self.result_cache if job._cache_key is not None else None
+        kept = ResultSet(stream.description)
+        for chunk in stream:
+            if not job._put(chunk):
+                stream.close()
+                break
+            job.rows += len(chunk)
+            if cache is not None:
+                kept.extend(chunk)
+                if kept.nbytes > cache.max_entry_bytes:
+                    cache, kept = None, None
+
+        if cache is not None and not (job.cancelled or stream.truncated or stream.error):
+            cache.put(job._cache_key, stream.description, kept)
+
+    def _replay(self, job: QueryJob) -> bool:
+        """_summary_ : serves a job from the result cache
+
+        Returns:
+            bool: False on a cache miss
+        """
+        entry = self.result_cache.get(job._cache_key)
+        if entry is None:
+            return False
+        job.cached = True
+        job.description = entry.columns
+        job.columns = [column.name for column in entry.columns]
+        rows = entry.rows
+        if job.limit is not None and len(rows) > job.limit:
+            rows = rows[:job.limit]
+            job.truncated = True
+        for start in range(0, len(rows), job.chunk_size):
+            chunk = rows[start:start + job.chunk_size]
+            if not job._put(chunk):
+                break
+            job.rows += len(chunk)
+        job.state = "cancelled" if job.cancelled else "done"
+        job.finished = time.perf_counter()
+        return True
+
+    def _write_file(self, job: "ExportJob", stream: ResultStream):
+        """_summary_ : writes the stream's chunks to the job's file
+        """
+        def progress(rows):
+            job.rows = rows
+
+        export_stream(stream, job.path, job.fmt, progress=progress, should_stop=lambda: job.cancelled)
+
+    def _cancel_handler(self, connection):
+        """_summary_ : builds the function that cancels the statement running on connection
+
+        SQLite connections are interrupted, psycopg2/psycopg connections cancelled directly,
+        other PostgreSQL and MySQL drivers cancelled from a second connection by backend id,
+        and anything else (e.g. pyodbc) through the DBAPI cursor when it supports cancel().
+        """
+        dbapi_connection = connection.connection.dbapi_connection
+        dialect = connection.dialect.name
+
+        if hasattr(dbapi_connection, "interrupt"):
+            return dbapi_connection.interrupt
+        if hasattr(dbapi_connection, "cancel"):
+            return dbapi_connection.cancel
+        if dialect == "postgresql":
+            backend_id = connection.execute(text("SELECT pg_backend_pid()")).scalar()
+            return lambda: self._kill(text("SELECT pg_cancel_backend(:id)"), {"id": backend_id})
+        if dialect == "mysql":
+            backend_id = connection.execute(text("SELECT CONNECTION_ID()")).scalar()
+            return lambda: self._kill(text(f"KILL QUERY {int(backend_id)}"))
+
+        cursors = []
+        event.listen(connection, "before_cursor_execute",
+                     lambda conn, cursor, *args: cursors.append(cursor))
+
+        def cancel_cursor():
+            if cursors and hasattr(cursors[-1], "cancel"):
+                cursors[-1].cancel()
+        return cancel_cursor
+
+    def _kill(self, statement, params: dict = None):
+        """_summary_ : runs a cancel statement for another backend on a separate connection
+        """
+        with self.engine.connect() as connection:
+            connection.execute(statement, params or {})
@@ -0,0 +1,218 @@
+"""_summary_ : An opt-in, byte-bounded LRU cache of SELECT results, invalidated by
+                writes to the tables the cached statements read.
+"""
+
+# import necessary modules
+import threading
+import time
+from collections import OrderedDict
+
+from . import sqltokens
+from .resultset import ResultSet
+from .streaming import estimate_size
+
+
+# statements whose referenced tables are exactly the tables they change
+_TABLE_WRITES = {"INSERT", "UPDATE", "DELETE", "MERGE", "ALTER", "DROP", "CREATE"}
+
+
+class CachedResult:
+    """_summary_ : one cached result: its columns (ResultColumn objects), rows and the
+                    tables it was read from
+    """
+
+    __slots__ = ("columns", "rows", "tables", "size", "expires")
+
+    def __init__(self, columns: list, rows: list, tables: set, size: int, expires: float):
+        self.columns = columns
+        self.rows = rows
+        self.tables = tables
+        self.size = size
+        self.expires = expires
+
+
+class ResultCache:
+    """_summary_ : caches the rows of read-only statements per connection.
+
+        Keys are (connection name, normalized SQL, bind parameters), so formatting and
+        comment differences share an entry. An entry is dropped when a write through
+        the DatabaseManager touches one of the tables its statement reads, when it is
+        older than ttl, or when the least recently used entries are evicted to stay
+        under max_bytes. Writes made by other clients, or through triggers and views,
+        are only picked up once the ttl expires.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 60.0, max_entry_bytes: int = None):
+        """_summary_
+
+        Args:
+            max_bytes (int, optional): approximate bytes of rows kept. Defaults to 64 MiB.
+            ttl (float, optional): seconds an entry stays valid. Defaults to 60.0.
+            max_entry_bytes (int, optional): larger results aren't cached.
+                                             Defaults to a quarter of max_bytes.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 4
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(connection: str, sql: str, params=None):
+        """_summary_ : the cache key of a statement, or None if it can't be cached
+                        (it writes, locks rows, isn't a query or calls a volatile
+                        function such as random() or now())
+
+        Args:
+            connection (str): name of the connection (e.g. "db_prime")
+            sql (str): _description_ (e.g. "SELECT * FROM users WHERE id = :id")
+            params (dict | list, optional): bind parameters. Defaults to None.
+
+        Returns:
+            tuple: _description_ (e.g. ("db_prime", "SELECT * FROM users WHERE id = :id", (("id", 1),)))
+        """
+        tokens = sqltokens.tokenize(sql)
+        if not sqltokens.is_read_only(tokens) or sqltokens.is_volatile(tokens):
+            return None
+        return (connection, sqltokens.normalize(sql), _freeze(params))
+
+    def get(self, key):
+        """_summary_ : the cached result for key, or None on a miss
+
+        Args:
+            key (tuple): a key from ResultCache.key()
+
+        Returns:
+            CachedResult: _description_
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires <= time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, columns: list, rows: list, size: int = None) -> bool:
+        """_summary_ : stores a result, evicting the least recently used entries if needed
+
+        Args:
+            key (tuple): a key from ResultCache.key()
+            columns (list): ResultColumn objects describing the rows
+            rows (ResultSet | list): the rows (shared with whoever reads the entry, so not changed afterwards)
+            size (int, optional): estimated bytes of the rows. Defaults to an estimate.
+
+        Returns:
+            bool: False if the result is too large to cache
+        """
+        if size is None:
+            size = rows.nbytes if isinstance(rows, ResultSet) else estimate_size(rows)
+        if size > self.max_entry_bytes:
+            return False
+        tables = {name.lower() for name in sqltokens.referenced_tables(key[1])}
+        entry = CachedResult(columns, rows, tables, size, time.monotonic() + self.ttl)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+        return True
+
+    def invalidate(self, connection: str = None, tables=None):
+        """_summary_ : drops the entries that read any of the given tables
+
+        Args:
+            connection (str, optional): connection the tables belong to. Defaults to None (every connection).
+            tables (iterable, optional): changed tables (e.g. {"users"}). Defaults to None (every table).
+        """
+        tables = {name.lower() for name in tables} if tables is not None else None
+        with self._lock:
+            for key in list(self._entries):
+                if connection is not None and key[0] != connection:
+                    continue
+                if tables is None or self._entries[key].tables & tables:
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def invalidate_for(self, connection: str, sql: str):
+        """_summary_ : drops what a statement executed on a connection may have changed:
+                        nothing for reads, the referenced tables for DML and table DDL,
+                        everything on the connection for anything else (e.g. TRUNCATE,
+                        ROLLBACK, SET search_path)
+
+        Args:
+            connection (str): name of the connection
+            sql (str): the executed statement
+        """
+        tokens = sqltokens.tokenize(sql)
+        if sqltokens.is_read_only(tokens):
+            return
+        tables = sqltokens.referenced_tables(tokens)
+        if sqltokens.statement_kind(tokens) in _TABLE_WRITES and tables:
+            self.invalidate(connection, tables)
+        else:
+            self.invalidate(connection)
+
+    def clear(self):
+        """_summary_ : removes every entry
+        """
+        self.invalidate()
+
+    def stats(self) -> dict:
+        """_summary_ : hit/miss counters and current size
+
+        Returns:
+            dict: _description_ (e.g. {"hits": 10, "misses": 2, "hit_rate": 0.83, "entries": 2, "bytes": 5120, ...})
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def _freeze(params):
+    """_summary_ : hashable form of bind parameters (dicts are order independent)
+    """
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        return tuple(sorted((str(k), _freeze_value(v)) for k, v in params.items()))
+    if isinstance(params, (list, tuple)):
+        return tuple(_freeze(p) if isinstance(p, (dict, list, tuple)) else _freeze_value(p) for p in params)
+    return _freeze_value(params)
+
+
+def _freeze_value(value):
+    try:
+        hash(value)
+        # keep 1 and True (equal and same hash) from sharing an entry
+        return (type(value).__name__, value)
+    except TypeError:
+        return (type(value).__name__, repr(value))
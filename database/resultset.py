@@ -0,0 +1,535 @@
+"""_summary_ : Compact columnar storage for query results.
+
+    Rows are split into one column each as they are fetched: integers, floats,
+    booleans, dates and naive datetimes go into typed arrays, low-cardinality
+    strings are dictionary-encoded and NULLs are kept in a bitmap, so a large
+    result takes a fraction of the memory of a list of row objects. Columns whose
+    values don't fit one of these (mixed types, Decimal, bytes ...) fall back to a
+    plain list. NumPy, when installed, is used for the per-column statistics.
+"""
+
+# import necessary modules
+import array
+import datetime
+import heapq
+import sys
+
+from .lazy import LazyModule
+from .instrumentation import count_fetched
+from .query_result import ResultColumn, fill_types
+
+# only imported once statistics are computed (it isn't needed to hold rows)
+numpy = LazyModule("numpy")
+
+
+# strings stay dictionary-encoded while distinct values are at most this share of the rows
+DICTIONARY_RATIO = 0.5
+# ... which is only checked once a column has this many rows
+DICTIONARY_MIN_ROWS = 1000
+# smallest hashes kept for the distinct-count (KMV) estimate
+KMV_SIZE = 1024
+
+_EPOCH = datetime.datetime(1970, 1, 1)
+_MICROSECOND = datetime.timedelta(microseconds=1)
+_MASK64 = (1 << 64) - 1
+_NONE_TYPE = type(None)
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Columns                                   #
+# ---------------------------------------------------------------------------- #
+class Column:
+    """_summary_ : values of one result column plus its NULL bitmap (bit set = NULL)
+
+        extend() returns the column the values ended up in: itself, or a more general
+        column that replaced it when the new values didn't fit.
+    """
+
+    kind = "null"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.length = 0
+        self.null_count = 0
+        self.nulls = bytearray()
+
+    def extend(self, values) -> "Column":
+        if any(value is not None for value in values):
+            # the rows so far were all NULL
+            column = _new_column(self.name, values).extend((None,) * self.length)
+            return column.extend(values)
+        self._extend_nulls(len(values))
+        return self
+
+    def get(self, index: int):
+        return None
+
+    def values(self, start: int, stop: int) -> list:
+        """_summary_ : the values of rows [start, stop) (None for NULL)
+        """
+        return [None] * (min(stop, self.length) - start)
+
+    def is_null(self, index: int) -> bool:
+        return bool(self.nulls[index >> 3] & (1 << (index & 7)))
+
+    @property
+    def nbytes(self) -> int:
+        """_summary_ : approximate memory held by the column
+        """
+        return len(self.nulls)
+
+    def stats(self) -> dict:
+        """_summary_ : row count, NULL count, min/max and an estimate of the distinct values
+
+        Returns:
+            dict: _description_ (e.g. {"count": 1000, "nulls": 3, "min": 1, "max": 997, "distinct": 997})
+        """
+        return {"count": self.length, "nulls": self.null_count, "min": None, "max": None, "distinct": 0}
+
+    def _extend_nulls(self, count: int, null_positions=None):
+        """_summary_ : grows the bitmap by count rows; null_positions (relative to the
+                        old length) are marked NULL, or all of them when None
+        """
+        start = self.length
+        self.length += count
+        self.nulls.extend(bytes((self.length + 7) // 8 - len(self.nulls)))
+        positions = range(count) if null_positions is None else null_positions
+        for offset in positions:
+            index = start + offset
+            self.nulls[index >> 3] |= 1 << (index & 7)
+            self.null_count += 1
+
+    def _valid_mask(self):
+        """_summary_ : NumPy bool array, True where the row isn't NULL
+        """
+        bits = numpy.unpackbits(numpy.frombuffer(bytes(self.nulls), dtype=numpy.uint8), bitorder="little")
+        return ~bits[:self.length].astype(bool)
+
+
+class ArrayColumn(Column):
+    """_summary_ : numbers (or values encoded as numbers) in an array.array
+    """
+
+    kind = "int"
+    typecode = "q"
+    python_type = int
+    numpy_dtype = "int64"
+
+    def __init__(self, name: str):
+        Column.__init__(self, name)
+        self.data = array.array(self.typecode)
+
+    def extend(self, values) -> Column:
+        types = set(map(type, values))
+        types.discard(_NONE_TYPE)
+        if types and types != {self.python_type}:
+            return ObjectColumn.from_column(self).extend(values)
+        try:
+            if None not in values:
+                self.data.extend(self._encode_all(values))
+                self._extend_nulls(len(values), ())
+            else:
+                nulls = [i for i, value in enumerate(values) if value is None]
+                self.data.extend(self._encode_all([0 if value is None else value for value in values], nulls))
+                self._extend_nulls(len(values), nulls)
+        except (OverflowError, TypeError, ValueError):
+            # e.g. an integer past 64 bits or a timezone-aware datetime
+            del self.data[self.length:]
+            return ObjectColumn.from_column(self).extend(values)
+        return self
+
+    def get(self, index: int):
+        if self.is_null(index):
+            return None
+        return self._decode(self.data[index])
+
+    def values(self, start: int, stop: int) -> list:
+        values = [self._decode(value) for value in self.data[start:stop]] if self._decodes \
+            else self.data[start:stop].tolist()
+        if self.null_count:
+            for i in range(len(values)):
+                if self.is_null(start + i):
+                    values[i] = None
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.buffer_info()[1] * self.data.itemsize + len(self.nulls)
+
+    def stats(self) -> dict:
+        stats = Column.stats(self)
+        if self.null_count == self.length:
+            return stats
+        if numpy.available:
+            valid = numpy.frombuffer(self.data, dtype=self.numpy_dtype)
+            if self.null_count:
+                valid = valid[self._valid_mask()]
+            low, high = valid.min().item(), valid.max().item()
+            bits = valid if valid.dtype.itemsize == 8 else valid.astype(numpy.int64)
+            stats["distinct"] = _kmv_numpy(bits.view(numpy.uint64))
+        else:
+            valid = [value for i, value in enumerate(self.data) if not self.null_count or not self.is_null(i)]
+            low, high = min(valid), max(valid)
+            stats["distinct"] = _kmv(valid)
+        stats["min"], stats["max"] = self._decode(low), self._decode(high)
+        return stats
+
+    # values are stored as they are unless a subclass encodes them
+    _decodes = False
+
+    def _encode_all(self, values, nulls=()):
+        return values
+
+    def _decode(self, value):
+        return value
+
+
+class FloatColumn(ArrayColumn):
+    kind = "float"
+    typecode = "d"
+    python_type = float
+    numpy_dtype = "float64"
+
+
+class BoolColumn(ArrayColumn):
+    kind = "bool"
+    typecode = "b"
+    python_type = bool
+    numpy_dtype = "int8"
+    _decodes = True
+
+    def _decode(self, value):
+        return bool(value)
+
+
+class DateTimeColumn(ArrayColumn):
+    """_summary_ : naive datetimes as microseconds since 1970-01-01
+    """
+
+    kind = "datetime"
+    python_type = datetime.datetime
+    _decodes = True
+
+    def _encode_all(self, values, nulls=()):
+        if any(value.tzinfo is not None for value in values if value != 0):
+            raise ValueError("timezone-aware datetimes are kept as objects")
+        return [0 if value == 0 else (value - _EPOCH) // _MICROSECOND for value in values]
+
+    def _decode(self, value):
+        return _EPOCH + datetime.timedelta(microseconds=value)
+
+
+class DateColumn(ArrayColumn):
+    """_summary_ : dates as proleptic Gregorian ordinals
+    """
+
+    kind = "date"
+    python_type = datetime.date
+    _decodes = True
+
+    def _encode_all(self, values, nulls=()):
+        return [0 if value == 0 else value.toordinal() for value in values]
+
+    def _decode(self, value):
+        return datetime.date.fromordinal(value) if value > 0 else None
+
+
+class DictionaryColumn(Column):
+    """_summary_ : strings stored once each, rows hold 32-bit codes into that dictionary
+    """
+
+    kind = "dictionary"
+
+    def __init__(self, name: str):
+        Column.__init__(self, name)
+        self.codes = array.array("I")
+        self.dictionary = []
+        # NULL rows get code 0 (their bit in the bitmap tells them apart)
+        self._index = {None: 0}
+
+    def extend(self, values) -> Column:
+        types = set(map(type, values))
+        types.discard(_NONE_TYPE)
+        if types and types != {str}:
+            return ObjectColumn.from_column(self).extend(values)
+
+        index, dictionary = self._index, self.dictionary
+        for value in set(values).difference(index):
+            index[value] = len(dictionary)
+            dictionary.append(value)
+        self.codes.extend(map(index.__getitem__, values))
+        self._extend_nulls(len(values), [i for i, value in enumerate(values) if value is None]
+                           if None in values else ())
+        if self.length >= DICTIONARY_MIN_ROWS and len(dictionary) > DICTIONARY_RATIO * self.length:
+            # mostly distinct values: the dictionary only adds overhead
+            return ObjectColumn.from_column(self)
+        return self
+
+    def get(self, index: int):
+        return None if self.is_null(index) else self.dictionary[self.codes[index]]
+
+    def values(self, start: int, stop: int) -> list:
+        dictionary = self.dictionary
+        values = [dictionary[code] if dictionary else None for code in self.codes[start:stop]]
+        if self.null_count:
+            for i in range(len(values)):
+                if self.is_null(start + i):
+                    values[i] = None
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        return (self.codes.buffer_info()[1] * self.codes.itemsize + len(self.nulls)
+                + sys.getsizeof(self.dictionary) + sum(map(sys.getsizeof, self.dictionary)))
+
+    def stats(self) -> dict:
+        stats = Column.stats(self)
+        if self.dictionary:
+            # every dictionary entry occurs at least once, so these are exact
+            stats.update(min=min(self.dictionary), max=max(self.dictionary), distinct=len(self.dictionary))
+        return stats
+
+
+class ObjectColumn(Column):
+    """_summary_ : any Python values in a list (the fallback for everything else)
+    """
+
+    kind = "object"
+
+    def __init__(self, name: str):
+        Column.__init__(self, name)
+        self.data = []
+
+    @classmethod
+    def from_column(cls, column: Column) -> "ObjectColumn":
+        """_summary_ : copies the rows of a more specific column
+        """
+        new = cls(column.name)
+        new.data = column.values(0, column.length)
+        new.length, new.null_count, new.nulls = column.length, column.null_count, column.nulls
+        return new
+
+    def extend(self, values) -> Column:
+        self.data.extend(values)
+        self._extend_nulls(len(values), [i for i, value in enumerate(values) if value is None]
+                           if None in values else ())
+        return self
+
+    def get(self, index: int):
+        return self.data[index]
+
+    def values(self, start: int, stop: int) -> list:
+        return self.data[start:stop]
+
+    @property
+    def nbytes(self) -> int:
+        sample = self.data[:32]
+        per_value = sum(map(sys.getsizeof, sample)) / len(sample) if sample else 0
+        return sys.getsizeof(self.data) + int(per_value * self.length) + len(self.nulls)
+
+    def stats(self) -> dict:
+        stats = Column.stats(self)
+        valid = [value for value in self.data if value is not None]
+        if valid:
+            try:
+                stats["min"], stats["max"] = min(valid), max(valid)
+            except TypeError:
+                # values of mixed types don't compare
+                pass
+            stats["distinct"] = _kmv(valid)
+        return stats
+
+
+def _new_column(name: str, values) -> Column:
+    """_summary_ : the most compact column for the first non-NULL value
+    """
+    value = next(value for value in values if value is not None)
+    column_class = {
+        bool: BoolColumn,
+        int: ArrayColumn,
+        float: FloatColumn,
+        datetime.datetime: DateTimeColumn,
+        datetime.date: DateColumn,
+        str: DictionaryColumn,
+    }.get(type(value), ObjectColumn)
+    return column_class(name)
+
+
+# ---------------------------------------------------------------------------- #
+#                                   ResultSet                                  #
+# ---------------------------------------------------------------------------- #
+class ResultSet:
+    """_summary_ : a query result stored column by column.
+
+        It is read like a list of row tuples (len(), rs[i], rs[start:stop], iteration)
+        and carries the result's description (ResultColumn objects) like QueryJob
+        and ResultStream. It is filled with extend(chunk) as chunks are fetched.
+    """
+
+    # rows fetched per fetchmany() in from_result()
+    FETCH_SIZE = 10000
+
+    def __init__(self, description: list = None):
+        """_summary_
+
+        Args:
+            description (list, optional): ResultColumn objects of the result. Defaults to
+                                          None (columns named after the first chunk's width).
+        """
+        self.description = list(description) if description else []
+        self._columns = [Column(column.name) for column in self.description]
+        self._length = 0
+
+    @classmethod
+    def from_result(cls, result, description: list = None, limit: int = None) -> "ResultSet":
+        """_summary_ : fetches a whole executed result chunk by chunk
+
+        Args:
+            result (CursorResult): an executed result that returns rows
+            description (list, optional): its ResultColumn objects. Defaults to None.
+            limit (int, optional): maximum rows fetched. Defaults to None.
+
+        Returns:
+            ResultSet: _description_
+        """
+        result_set = cls(description)
+        while limit is None or len(result_set) < limit:
+            size = cls.FETCH_SIZE if limit is None else min(cls.FETCH_SIZE, limit - len(result_set))
+            chunk = result.fetchmany(size)
+            if not chunk:
+                break
+            result_set.extend(chunk)
+            count_fetched(result, len(chunk))
+        return result_set
+
+    @property
+    def columns(self) -> list:
+        """_summary_ : the column names (e.g. ["id", "name"])
+        """
+        return [column.name for column in self.description]
+
+    def extend(self, rows):
+        """_summary_ : appends a chunk of rows (tuples or Row objects)
+        """
+        if not rows:
+            return
+        if not self._length:
+            if not self.description:
+                self.description = [ResultColumn(f"column_{i + 1}") for i in range(len(rows[0]))]
+                self._columns = [Column(column.name) for column in self.description]
+            fill_types(self.description, rows)
+        for i, values in enumerate(zip(*rows)):
+            self._columns[i] = self._columns[i].extend(values)
+        self._length += len(rows)
+
+    def column(self, key) -> Column:
+        """_summary_ : a column by name or position
+        """
+        if isinstance(key, str):
+            key = self.columns.index(key)
+        return self._columns[key]
+
+    def column_stats(self, key=None) -> dict:
+        """_summary_ : min/max/NULL count/distinct estimate of one column, or of every
+                        column by name when key is None
+
+        Args:
+            key (str | int, optional): column name or position. Defaults to None.
+
+        Returns:
+            dict: _description_ (e.g. {"count": 1000, "nulls": 3, "min": 1, "max": 997, "distinct": 997})
+        """
+        if key is not None:
+            return self.column(key).stats()
+        return {column.name: column.stats() for column in self._columns}
+
+    @property
+    def nbytes(self) -> int:
+        """_summary_ : approximate memory held by the result
+        """
+        return sum(column.nbytes for column in self._columns)
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return list(zip(*(column.values(start, stop) for column in self._columns)))
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("ResultSet index out of range")
+        return tuple(column.get(index) for column in self._columns)
+
+    def __iter__(self):
+        for start in range(0, self._length, self.FETCH_SIZE):
+            yield from self[start:start + self.FETCH_SIZE]
+
+    def __repr__(self):
+        return f"ResultSet({self._length} rows, columns={self.columns})"
+
+
+# ---------------------------------------------------------------------------- #
+#                             Distinct value estimate                          #
+# ---------------------------------------------------------------------------- #
+def _mix64(value: int) -> int:
+    """_summary_ : splitmix64 finalizer, spreads Python hashes over 64 bits
+    """
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def _kmv(values) -> int:
+    """_summary_ : K-minimum-values estimate of the distinct values (exact below KMV_SIZE)
+    """
+    smallest = heapq.nsmallest(KMV_SIZE, {_mix64(hash(value) & _MASK64) for value in values}) \
+        if len(values) <= 4 * KMV_SIZE else _k_smallest_hashes(values)
+    return _kmv_estimate(smallest)
+
+
+def _k_smallest_hashes(values) -> list:
+    # bounded max-heap (negated) of the KMV_SIZE smallest distinct hashes
+    heap, seen = [], set()
+    for value in values:
+        h = _mix64(hash(value) & _MASK64)
+        if h in seen:
+            continue
+        if len(heap) < KMV_SIZE:
+            heapq.heappush(heap, -h)
+            seen.add(h)
+        elif h < -heap[0]:
+            seen.discard(-heapq.heapreplace(heap, -h))
+            seen.add(h)
+    return sorted(-h for h in heap)
+
+
+def _kmv_numpy(bits) -> int:
+    """_summary_ : _kmv() on the raw 64-bit patterns of a NumPy column
+    """
+    h = bits + numpy.uint64(0x9E3779B97F4A7C15)
+    h = (h ^ (h >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+    h = (h ^ (h >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+    h = h ^ (h >> numpy.uint64(31))
+    if len(h) > KMV_SIZE:
+        # the KMV_SIZE smallest distinct hashes are among the smallest values
+        candidates = numpy.partition(h, KMV_SIZE)[:KMV_SIZE + 1]
+        smallest = numpy.unique(candidates)
+        if len(smallest) < KMV_SIZE:
+            # duplicates among the candidates: fall back to a full pass
+            smallest = numpy.unique(h)[:KMV_SIZE]
+    else:
+        smallest = numpy.unique(h)
+    return _kmv_estimate([int(value) for value in smallest[:KMV_SIZE]])
+
+
+def _kmv_estimate(smallest: list) -> int:
+    if len(smallest) < KMV_SIZE:
+        return len(smallest)
+    return int((KMV_SIZE - 1) / (smallest[KMV_SIZE - 1] / float(1 << 64)))
@@ -0,0 +1,141 @@
+"""_summary_ : A small TTL + size bounded cache for schema/reflection lookups
+"""
+
+# import necessary modules
+import threading
+import time
+from collections import OrderedDict
+
+
+class SchemaCache:
+    """_summary_ : caches the results of inspector calls (table names, columns ...)
+                    so the catalog is only queried once per ttl window.
+
+        Keys are (kind, table name, schema) tuples, e.g. ("columns", "users", None);
+        listings that aren't about one table use None as table name,
+        e.g. ("table_names", None, "public").
+    """
+
+    # returned by lookup() when a key isn't cached (None is a valid cached value)
+    MISSING = object()
+
+    def __init__(self, ttl: float = 300.0, max_entries: int = 1024):
+        """_summary_
+
+        Args:
+            ttl (float, optional): seconds an entry stays valid. Defaults to 300.0.
+            max_entries (int, optional): entries kept before the least recently used
+                                         one is evicted. Defaults to 1024.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.RLock()
+        # bumped by every invalidate(), so a load that raced one isn't cached
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, loader):
+        """_summary_ : returns the cached value for key, calling loader() on a miss
+
+        Args:
+            key (tuple): cache key (e.g. ("columns", "users", None))
+            loader (callable): function that fetches the value from the database
+
+        Returns:
+            _type_: the cached or freshly loaded value
+        """
+        with self._lock:
+            value = self.lookup(key)
+            if value is not self.MISSING:
+                return value
+            generation = self.generation
+
+        # load outside the lock so a slow catalog query doesn't block other lookups;
+        # if the schema was invalidated meanwhile the value may predate the change,
+        # so it's returned but not cached
+        value = loader()
+        self.set_if_current(key, value, generation)
+        return value
+
+    @property
+    def generation(self) -> int:
+        """_summary_ : number of invalidate() calls so far; read it before loading a value
+                        and pass it to set_if_current()
+        """
+        return self._generation
+
+    def lookup(self, key):
+        """_summary_ : returns the cached value for key without loading it
+
+        Args:
+            key (tuple): cache key (e.g. ("columns", "users", None))
+
+        Returns:
+            _type_: the cached value, or SchemaCache.MISSING on a miss
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return self.MISSING
+
+    def set(self, key, value):
+        """_summary_ : stores a value and evicts the oldest entries past max_entries
+
+        Args:
+            key (tuple): cache key
+            value (_type_): value to cache
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def set_if_current(self, key, value, generation: int) -> bool:
+        """_summary_ : stores a value loaded since `generation` was read, unless the cache
+                        was invalidated in the meantime (the value may then predate the change)
+
+        Args:
+            key (tuple): cache key
+            value (_type_): value to cache
+            generation (int): the generation property, read before the load started
+
+        Returns:
+            bool: True if the value was stored
+        """
+        with self._lock:
+            if self._generation != generation:
+                return False
+            self.set(key, value)
+            return True
+
+    def invalidate(self, table_name: str = None):
+        """_summary_ : drops the entries for a table and every table listing
+
+        Args:
+            table_name (str, optional): table that changed. When None, the whole cache is cleared.
+        """
+        with self._lock:
+            self._generation += 1
+            if table_name is None:
+                self._entries.clear()
+                return
+            for key in list(self._entries):
+                # listings (keys without a table name) go stale whenever any table changes
+                if key[1] is None or key[1] == table_name:
+                    del self._entries[key]
+
+    def clear(self):
+        """_summary_ : removes every entry from the cache
+        """
+        self.invalidate()
+
+    def __len__(self):
+        return len(self._entries)
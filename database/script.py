@@ -0,0 +1,375 @@
+"""_summary_ : Splits SQL scripts into statements and runs them one after another,
+                in a single transaction or in committed batches, recording the
+                timing, row count and rows of every statement.
+"""
+
+# import necessary modules
+import re
+import time
+
+from . import sqltokens
+from .resultset import ResultSet
+from .streaming import ResultStream
+
+
+# a line holding only the MSSQL batch separator (with an optional repeat count)
+_GO_LINE = re.compile(r"\s*GO(?:\s+(\d+))?\s*;?\s*", re.IGNORECASE)
+# words opening / closing a block in CREATE TRIGGER / PROCEDURE bodies
+_BLOCK_OPENERS = {"BEGIN", "CASE"}
+# "END IF" / "END LOOP" ... close blocks whose openers aren't counted
+_UNCOUNTED_ENDS = {"IF", "LOOP", "WHILE", "REPEAT", "FOR"}
+# words that may follow BEGIN / COMMIT / ROLLBACK in a transaction control statement
+_TRANSACTION_WORDS = {"TRANSACTION", "TRAN", "WORK", "DEFERRED", "IMMEDIATE", "EXCLUSIVE"}
+# what each transaction control statement does to the script's transaction
+_TRANSACTION_CONTROL = {"BEGIN": "BEGIN", "START": "BEGIN", "COMMIT": "COMMIT", "END": "COMMIT",
+                        "ROLLBACK": "ROLLBACK", "ABORT": "ROLLBACK"}
+
+
+class ScriptStatement:
+    """_summary_ : one statement of a script and where it starts
+    """
+
+    __slots__ = ("index", "sql", "line")
+
+    def __init__(self, index: int, sql: str, line: int):
+        self.index = index
+        self.sql = sql
+        self.line = line
+
+    def __repr__(self):
+        return f"ScriptStatement({self.index}, line {self.line}, {self.sql[:40]!r})"
+
+
+def split_script(script: str) -> list:
+    """_summary_ : splits a script into statements
+
+        Statements end at semicolons outside string literals, quoted identifiers,
+        comments, dollar-quoted bodies and BEGIN ... END blocks of CREATE statements.
+        A script with MSSQL "GO" lines is split into its GO batches instead, each run
+        as one statement ("GO 3" repeats the batch three times).
+
+    Args:
+        script (str): _description_ (e.g. "CREATE TABLE a (id int);\\nINSERT INTO a VALUES (1);")
+
+    Returns:
+        list: ScriptStatement objects (comment-only parts are left out)
+    """
+    tokens = sqltokens.tokenize(script)
+    batches = _split_go_batches(script, tokens)
+    if batches is None:
+        batches = [(part, 1) for part in _split_semicolons(tokens)]
+
+    statements = []
+    for part, repeat in batches:
+        if not part:
+            continue
+        sql = script[part[0].start:part[-1].end]
+        line = script.count("\n", 0, part[0].start) + 1
+        for _ in range(repeat):
+            statements.append(ScriptStatement(len(statements), sql, line))
+    return statements
+
+
+def _split_semicolons(tokens: list) -> list:
+    """_summary_ : token lists between top-level semicolons
+    """
+    parts, current, depth = [], [], 0
+    for i, token in enumerate(tokens):
+        if token.text == ";" and depth == 0:
+            parts.append(current)
+            current = []
+            continue
+        current.append(token)
+        if current[0].upper != "CREATE":
+            continue
+        word = token.upper
+        if word in _BLOCK_OPENERS:
+            depth += 1
+        elif word == "END" and depth:
+            following = tokens[i + 1].upper if i + 1 < len(tokens) else ""
+            if following not in _UNCOUNTED_ENDS:
+                depth -= 1
+    parts.append(current)
+    return parts
+
+
+def _split_go_batches(script: str, tokens: list):
+    """_summary_ : (tokens, repeat) per GO batch, or None if the script has no GO line
+    """
+    batches, current = [], []
+    # end of the last GO line (its count and a stray ";" aren't batch tokens)
+    skip_until = -1
+    for token in tokens:
+        if token.start < skip_until:
+            continue
+        if token.upper == "GO":
+            line_start = script.rfind("\n", 0, token.start) + 1
+            line_end = script.find("\n", token.end)
+            line_end = line_end if line_end != -1 else len(script)
+            match = _GO_LINE.fullmatch(script[line_start:line_end])
+            if match:
+                batches.append((current, int(match.group(1) or 1)))
+                current = []
+                skip_until = line_end
+                continue
+        current.append(token)
+    if not batches:
+        return None
+    batches.append((current, 1))
+    return batches
+
+
+def transaction_control(sql: str) -> str:
+    """_summary_ : what a statement does if it opens or ends a transaction
+
+    Args:
+        sql (str): _description_ (e.g. "BEGIN TRANSACTION", "COMMIT", "ROLLBACK TO SAVEPOINT a")
+
+    Returns:
+        str: "BEGIN", "COMMIT" or "ROLLBACK", "" for any other statement (savepoints included)
+    """
+    words = [token.upper for token in sqltokens.tokenize(sql) if token.text != ";"]
+    action = _TRANSACTION_CONTROL.get(words[0] if words else "")
+    if action is None:
+        return ""
+    rest = words[1:]
+    if words[0] == "START":
+        return action if rest[:1] == ["TRANSACTION"] else ""
+    if words[0] == "BEGIN" and rest[:2] == ["TRANSACTION", "ISOLATION"]:
+        # Postgres' BEGIN TRANSACTION ISOLATION LEVEL ...
+        return action
+    return action if all(word in _TRANSACTION_WORDS for word in rest) else ""
+
+
+class StatementResult:
+    """_summary_ : what one statement of a script did
+    """
+
+    def __init__(self, statement: ScriptStatement):
+        self.index = statement.index
+        self.sql = statement.sql
+        self.line = statement.line
+        self.kind = sqltokens.statement_kind(statement.sql)
+        self.columns = None
+        # ResultSet of a statement that returned rows
+        self.rows = None
+        self.rowcount = None
+        self.truncated = False
+        self.elapsed = 0.0
+        self.error = None
+        self.committed = False
+        # why the statement wasn't sent as written (transaction control, see run_statements)
+        self.note = None
+
+    @property
+    def returns_rows(self) -> bool:
+        return self.columns is not None
+
+
+class ScriptReport:
+    """_summary_ : per-statement results of a script run
+    """
+
+    def __init__(self, mode: str, batch_size: int = None):
+        self.mode = mode
+        self.batch_size = batch_size
+        self.results = []
+        self.elapsed = 0.0
+        self.stopped = False
+
+    @property
+    def failed(self) -> list:
+        """_summary_ : results of the statements that raised an error
+        """
+        return [result for result in self.results if result.error is not None]
+
+    @property
+    def row_results(self) -> list:
+        """_summary_ : results of the statements that returned rows
+        """
+        return [result for result in self.results if result.returns_rows]
+
+    @property
+    def committed(self) -> int:
+        """_summary_ : number of statements whose transaction was committed
+        """
+        return sum(1 for result in self.results if result.committed)
+
+    def summary(self) -> str:
+        """_summary_ : one line description (e.g. "12 statements in 0.31s, 2 results, 12 committed")
+        """
+        text = (f"{len(self.results)} statements in {self.elapsed:.2f}s, "
+                f"{len(self.row_results)} results, {self.committed} committed")
+        failed = self.failed
+        if failed:
+            first = failed[0]
+            text += f", {len(failed)} failed (statement {first.index + 1}, line {first.line}: " \
+                    f"{first.error.splitlines()[0]})"
+        if self.stopped:
+            text += ", stopped"
+        return text
+
+
+def run_statements(connection, statements: list, mode: str = "transaction", batch_size: int = 100,
+                   stop_on_error: bool = True, row_limit: int = None, memory_budget: int = None,
+                   on_statement=None, should_stop=None) -> ScriptReport:
+    """_summary_ : runs a script's statements on one connection
+
+        A script with transaction control statements of its own (BEGIN / START
+        TRANSACTION, COMMIT / END, ROLLBACK / ABORT), such as a migration, owns its
+        transactions: those statements aren't sent to the server but commit or roll
+        back the connection's transaction (mode and batch_size are ignored then), and
+        their results carry a note saying so. See _run_owned_transactions().
+
+    Args:
+        connection (Connection): connection without a transaction in progress
+        statements (list): ScriptStatement objects from split_script()
+        mode (str, optional): "transaction" runs everything in one transaction (rolled back
+                              on the first error), "batch" commits every batch_size
+                              statements (a failed batch is rolled back). Defaults to "transaction".
+        batch_size (int, optional): statements per transaction in "batch" mode. Defaults to 100.
+        stop_on_error (bool, optional): in "batch" mode, stop at the first error instead
+                                        of carrying on with the next statement. Defaults to True.
+        row_limit (int, optional): rows kept per row-returning statement. Defaults to None.
+        memory_budget (int, optional): approximate bytes kept per statement. Defaults to None.
+        on_statement (callable, optional): called with each StatementResult once it has run.
+        should_stop (callable, optional): returns True to stop (the open transaction is rolled back).
+
+    Returns:
+        ScriptReport: _description_
+    """
+    # raw driver execution: ":name" in a literal isn't a bind parameter and "%" needs no escaping
+    connection = connection.execution_options(no_parameters=True)
+    if any(transaction_control(statement.sql) for statement in statements):
+        return _run_owned_transactions(connection, statements, stop_on_error, row_limit, memory_budget,
+                                       on_statement, should_stop)
+
+    if mode == "transaction":
+        batch_size = max(len(statements), 1)
+    report = ScriptReport(mode, batch_size)
+    start = time.perf_counter()
+
+    position = 0
+    while position < len(statements):
+        batch = statements[position:position + batch_size]
+        pending = []
+        failed = False
+        transaction = connection.begin()
+        try:
+            for statement in batch:
+                if should_stop is not None and should_stop():
+                    report.stopped = True
+                    break
+                result = _run_statement(connection, statement, row_limit, memory_budget)
+                report.results.append(result)
+                pending.append(result)
+                if on_statement is not None:
+                    on_statement(result)
+                position = statement.index + 1
+                if result.error is not None:
+                    failed = True
+                    break
+        finally:
+            if failed or report.stopped:
+                transaction.rollback()
+            else:
+                transaction.commit()
+                for result in pending:
+                    result.committed = True
+        if report.stopped or (failed and (mode == "transaction" or stop_on_error)):
+            break
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _run_owned_transactions(connection, statements: list, stop_on_error: bool, row_limit: int,
+                            memory_budget: int, on_statement, should_stop) -> ScriptReport:
+    """_summary_ : runs a script that opens and ends its own transactions
+
+        BEGIN starts a transaction (committing the statements run before it), COMMIT
+        commits and ROLLBACK rolls back the statements since the last boundary.
+        Statements outside BEGIN ... COMMIT commit at the next boundary or at the end,
+        as they would one by one; a block left open at the end is rolled back. A failed
+        statement rolls back the open transaction.
+    """
+    report = ScriptReport("script")
+    start = time.perf_counter()
+    transaction = connection.begin()
+    # results of the statements in the open transaction, and whether the script began it
+    pending, explicit = [], False
+
+    def end(commit: bool):
+        nonlocal transaction, pending
+        if commit:
+            transaction.commit()
+            for result in pending:
+                result.committed = True
+        else:
+            transaction.rollback()
+        transaction, pending = None, []
+
+    try:
+        for statement in statements:
+            if should_stop is not None and should_stop():
+                report.stopped = True
+                break
+            if transaction is None:
+                transaction = connection.begin()
+            action = transaction_control(statement.sql)
+            if action:
+                result = StatementResult(statement)
+                result.note = f"{action} applied to the script's transaction, not sent as written"
+                if action == "BEGIN":
+                    if pending and not explicit:
+                        end(commit=True)
+                    explicit = True
+                else:
+                    pending.append(result)
+                    end(commit=action == "COMMIT")
+                    explicit = False
+                    result.committed = action == "COMMIT"
+            else:
+                result = _run_statement(connection, statement, row_limit, memory_budget)
+                pending.append(result)
+            report.results.append(result)
+            if on_statement is not None:
+                on_statement(result)
+            if result.error is not None:
+                end(commit=False)
+                explicit = False
+                if stop_on_error:
+                    break
+    except BaseException:
+        if transaction is not None:
+            transaction.rollback()
+        raise
+    if transaction is not None:
+        end(commit=not (explicit or report.stopped))
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def _run_statement(connection, statement: ScriptStatement, row_limit: int, memory_budget: int) -> StatementResult:
+    result = StatementResult(statement)
+    start = time.perf_counter()
+    try:
+        executed = connection.exec_driver_sql(statement.sql)
+        if executed.returns_rows:
+            stream = ResultStream(executed, limit=row_limit, memory_budget=memory_budget)
+            result.columns = stream.columns
+            result.rows = ResultSet(stream.description)
+            for chunk in stream:
+                result.rows.extend(chunk)
+            result.rowcount = len(result.rows)
+            result.truncated = stream.truncated
+            if stream.error is not None:
+                result.error = stream.error
+        else:
+            result.rowcount = executed.rowcount
+    except Exception as e:
+        result.error = str(e)
+        print(f"Statement {statement.index + 1} (line {statement.line}) failed: {str(e)}")
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,354 @@
+"""_summary_ : A small SQL tokenizer and the statement facts built on it (kind,
+                referenced tables, normalized text). It understands string literals,
+                quoted identifiers and comments, so keywords inside them are ignored.
+"""
+
+# import necessary modules
+import re
+
+
+# (kind, pattern) tried in order at each position; None kinds are skipped
+_TOKEN_SPEC = [
+    (None, r"\s+"),
+    (None, r"--[^\n]*"),
+    (None, r"/\*.*?(?:\*/|\Z)"),
+    ("string", r"[EeNnXxBb]?'(?:[^']|'')*(?:'|\Z)"),
+    ("string", r"\$(?P<tag>(?:[A-Za-z_]\w*)?)\$.*?(?:\$(?P=tag)\$|\Z)"),
+    ("identifier", r'"(?:[^"]|"")*(?:"|\Z)'),
+    ("identifier", r"`(?:[^`]|``)*(?:`|\Z)"),
+    ("identifier", r"\[[^\]]*(?:\]|\Z)"),
+    ("number", r"(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"),
+    ("param", r"\?|%s|%\(\w+\)s|(?<!:):\w+|\$\d+"),
+    ("word", r"[^\W\d]\w*[$#]?|[@#]\w+"),
+    ("punct", r"::|<>|!=|<=|>=|\|\||."),
+]
+_TOKEN_RE = re.compile(
+    "|".join(f"(?P<t{i}>{pattern})" for i, (_, pattern) in enumerate(_TOKEN_SPEC)),
+    re.DOTALL,
+)
+
+# keywords followed by a table name
+_TABLE_KEYWORDS = {"FROM", "JOIN", "INTO", "UPDATE", "TABLE"}
+# statements that only read data
+READ_KINDS = {"SELECT", "WITH", "VALUES", "SHOW", "EXPLAIN", "DESCRIBE"}
+# statements that change the schema (tables, columns, indexes ...)
+SCHEMA_KINDS = {"CREATE", "ALTER", "DROP", "RENAME"}
+# keywords that make an otherwise reading statement write or lock something
+_WRITE_KEYWORDS = {"INSERT", "UPDATE", "DELETE", "MERGE", "INTO", "CREATE", "DROP",
+                   "ALTER", "TRUNCATE", "REPLACE", "GRANT", "REVOKE", "LOCK"}
+# functions (called with parentheses) whose result changes between runs of a statement
+_VOLATILE_FUNCTIONS = {"RANDOM", "RAND", "RANDOMBLOB", "NOW", "SYSDATE", "SYSDATETIME", "GETDATE",
+                       "GETUTCDATE", "CURDATE", "CURTIME", "UTC_TIMESTAMP", "UNIX_TIMESTAMP",
+                       "CLOCK_TIMESTAMP", "STATEMENT_TIMESTAMP", "TRANSACTION_TIMESTAMP", "TIMEOFDAY",
+                       "NEXTVAL", "CURRVAL", "LASTVAL", "SETVAL", "UUID", "UUID_SHORT", "GEN_RANDOM_UUID",
+                       "UUID_GENERATE_V4", "NEWID", "NEWSEQUENTIALID", "CHANGES", "TOTAL_CHANGES",
+                       "LAST_INSERT_ROWID", "LAST_INSERT_ID", "FOUND_ROWS", "ROW_COUNT", "TXID_CURRENT"}
+# keywords that read the clock or a sequence without parentheses (e.g. Oracle's seq.NEXTVAL)
+_VOLATILE_KEYWORDS = {"CURRENT_TIMESTAMP", "CURRENT_DATE", "CURRENT_TIME", "LOCALTIME", "LOCALTIMESTAMP",
+                      "SYSDATE", "SYSTIMESTAMP", "NEXTVAL", "CURRVAL"}
+# words allowed between a table keyword and the table name
+_NAME_PREFIXES = {"IF", "NOT", "EXISTS", "ONLY", "LATERAL"}
+# words that end a table reference (so they aren't read as its alias)
+_CLAUSE_WORDS = {"WHERE", "ON", "USING", "JOIN", "INNER", "LEFT", "RIGHT", "FULL", "OUTER",
+                 "CROSS", "NATURAL", "GROUP", "ORDER", "HAVING", "LIMIT", "OFFSET", "UNION",
+                 "INTERSECT", "EXCEPT", "SET", "VALUES", "SELECT", "WINDOW", "FETCH", "FOR",
+                 "RETURNING", "DEFAULT", "AS", "WITH", "LATERAL", "ONLY", "IF", "NOT", "EXISTS"}
+
+
+class Token:
+    """_summary_ : one lexical token of a statement
+
+        kind is "word", "identifier" (quoted), "string", "number", "param" or "punct";
+        start is its offset in the tokenized text.
+    """
+
+    __slots__ = ("kind", "text", "start")
+
+    def __init__(self, kind: str, text: str, start: int = 0):
+        self.kind = kind
+        self.text = text
+        self.start = start
+
+    @property
+    def end(self) -> int:
+        return self.start + len(self.text)
+
+    @property
+    def upper(self) -> str:
+        """_summary_ : the text uppercased (for keyword comparisons)
+        """
+        return self.text.upper() if self.kind == "word" else ""
+
+    @property
+    def name(self) -> str:
+        """_summary_ : identifier as the database sees it: quotes removed, unquoted names
+                        lowercased (e.g. '"Users"' -> "Users", "USERS" -> "users")
+        """
+        if self.kind == "identifier":
+            text = self.text
+            body = text[1:-1] if len(text) > 1 else ""
+            quote = text[0]
+            return body.replace(quote * 2, quote) if quote != "[" else body
+        return self.text.lower()
+
+    def __repr__(self):
+        return f"Token({self.kind!r}, {self.text!r})"
+
+
+def tokenize(sql: str) -> list:
+    """_summary_ : splits a statement into tokens, dropping whitespace and comments
+
+    Args:
+        sql (str): _description_ (e.g. "SELECT * FROM users -- all of them")
+
+    Returns:
+        list: Token objects (e.g. [Token('word', 'SELECT'), Token('punct', '*'), ...])
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(sql):
+        kind = _TOKEN_SPEC[int(match.lastgroup[1:])][0]
+        if kind is not None:
+            tokens.append(Token(kind, match.group(0), match.start()))
+    return tokens
+
+
+def statement_kind(sql_or_tokens) -> str:
+    """_summary_ : the statement's leading keyword (e.g. "SELECT", "UPDATE"), "" if none
+    """
+    tokens = _tokens(sql_or_tokens)
+    for token in tokens:
+        if token.kind == "word":
+            return token.upper
+        if token.text != "(":
+            break
+    return ""
+
+
+def is_read_only(sql_or_tokens) -> bool:
+    """_summary_ : True if the statement only reads data (a plain SELECT, a WITH
+                    without data-modifying parts, SHOW ...), so its result can be cached
+
+    Args:
+        sql_or_tokens (str | list): the statement or its tokens
+
+    Returns:
+        bool: _description_
+    """
+    tokens = _tokens(sql_or_tokens)
+    if statement_kind(tokens) not in READ_KINDS:
+        return False
+    return not any(token.upper in _WRITE_KEYWORDS for token in tokens)
+
+
+def changes_schema(sql_or_tokens) -> bool:
+    """_summary_ : True if the statement is DDL (CREATE, ALTER, DROP, RENAME), after
+                    which cached table listings and reflected tables are stale
+    """
+    return statement_kind(sql_or_tokens) in SCHEMA_KINDS
+
+
+def is_volatile(sql_or_tokens) -> bool:
+    """_summary_ : True if the statement calls something whose result changes from one
+                    run to the next (random(), now(), nextval(), 'now' dates, NEXT VALUE FOR ...),
+                    so its result must not be served again
+
+    Args:
+        sql_or_tokens (str | list): _description_ (e.g. "SELECT random()")
+
+    Returns:
+        bool: _description_
+    """
+    tokens = _tokens(sql_or_tokens)
+    for i, token in enumerate(tokens):
+        word = token.upper
+        if word in _VOLATILE_KEYWORDS:
+            return True
+        if word in _VOLATILE_FUNCTIONS and i + 1 < len(tokens) and tokens[i + 1].text == "(":
+            return True
+        if word == "NEXT" and i + 2 < len(tokens) and tokens[i + 1].upper == "VALUE" and tokens[i + 2].upper == "FOR":
+            return True
+        # SQLite's date('now') / datetime('now', ...) and Postgres' 'now'::timestamp
+        if token.kind == "string" and token.text.lower() == "'now'":
+            return True
+    return False
+
+
+def referenced_tables(sql_or_tokens) -> set:
+    """_summary_ : names of the tables a statement reads or writes, without schema
+                    prefixes (CTE names and table functions are left out)
+
+    Args:
+        sql_or_tokens (str | list): _description_ (e.g. 'SELECT * FROM public.users u JOIN "Orders" o ON ...')
+
+    Returns:
+        set: _description_ (e.g. {"users", "Orders"})
+    """
+    tokens = _tokens(sql_or_tokens)
+    ctes = _cte_names(tokens)
+    tables = set()
+    i = 0
+    while i < len(tokens):
+        keyword = tokens[i].upper
+        i += 1
+        if keyword not in _TABLE_KEYWORDS:
+            continue
+        # DROP TABLE IF EXISTS t, FROM ONLY t ...
+        while i < len(tokens) and tokens[i].upper in _NAME_PREFIXES:
+            i += 1
+        # FROM a, b x, c AS y
+        while i < len(tokens):
+            name, i = _qualified_name(tokens, i)
+            if name is None:
+                break
+            if keyword in ("FROM", "JOIN") and i < len(tokens) and tokens[i].text == "(":
+                # a function call such as generate_series(1, 10)
+                break
+            if name not in ctes:
+                tables.add(name)
+            i = _skip_alias(tokens, i)
+            if keyword != "FROM" or i >= len(tokens) or tokens[i].text != ",":
+                break
+            i += 1
+    return tables
+
+
+def table_aliases(sql_or_tokens) -> dict:
+    """_summary_ : the tables a statement names, by the alias (or name) it refers to them with
+
+    Args:
+        sql_or_tokens (str | list): _description_ (e.g. "SELECT * FROM users u JOIN orders ON ...")
+
+    Returns:
+        dict: _description_ (e.g. {"u": "users", "users": "users", "orders": "orders"})
+    """
+    tokens = _tokens(sql_or_tokens)
+    ctes = _cte_names(tokens)
+    aliases = {}
+    i = 0
+    while i < len(tokens):
+        keyword = tokens[i].upper
+        i += 1
+        if keyword not in _TABLE_KEYWORDS:
+            continue
+        while i < len(tokens) and tokens[i].upper in _NAME_PREFIXES:
+            i += 1
+        while i < len(tokens):
+            name, i = _qualified_name(tokens, i)
+            if name is None or (keyword in ("FROM", "JOIN") and i < len(tokens) and tokens[i].text == "("):
+                break
+            alias_start = i
+            i = _skip_alias(tokens, i)
+            if name not in ctes:
+                aliases[name] = name
+                if i > alias_start:
+                    aliases[tokens[i - 1].name] = name
+            if keyword != "FROM" or i >= len(tokens) or tokens[i].text != ",":
+                break
+            i += 1
+    return aliases
+
+
+def bind_names(sql_or_tokens) -> list:
+    """_summary_ : the named bind parameters of a statement, in order of first use
+
+    Args:
+        sql_or_tokens (str | list): _description_ (e.g. "SELECT * FROM users WHERE id = :id OR boss = :id")
+
+    Returns:
+        list: _description_ (e.g. ["id"]), [] if it has none (positional ? or %s markers aren't named)
+    """
+    names = []
+    for token in _tokens(sql_or_tokens):
+        if token.kind == "param" and token.text.startswith(":") and token.text[1:] not in names:
+            names.append(token.text[1:])
+    return names
+
+
+def normalize(sql: str) -> str:
+    """_summary_ : the statement with comments removed, whitespace collapsed and
+                    keywords uppercased, so formatting differences share a cache entry
+
+    Args:
+        sql (str): _description_ (e.g. "select *\\n  from users -- all")
+
+    Returns:
+        str: _description_ (e.g. "SELECT * FROM users")
+    """
+    parts = []
+    for token in tokenize(sql):
+        if token.kind == "word" and token.upper in _KEYWORDS:
+            parts.append(token.upper)
+        else:
+            parts.append(token.text)
+    return " ".join(parts).rstrip(" ;")
+
+
+# keywords uppercased by normalize(); other words keep their case, since quoted
+# and unquoted identifiers may compare differently on the server
+_KEYWORDS = (READ_KINDS | _WRITE_KEYWORDS | _TABLE_KEYWORDS | _CLAUSE_WORDS
+             | {"AND", "OR", "IN", "IS", "NULL", "LIKE", "BETWEEN", "CASE", "WHEN", "THEN",
+                "ELSE", "END", "DISTINCT", "ALL", "BY", "ASC", "DESC", "RECURSIVE", "COUNT",
+                "SUM", "AVG", "MIN", "MAX"})
+
+
+def _tokens(sql_or_tokens) -> list:
+    return tokenize(sql_or_tokens) if isinstance(sql_or_tokens, str) else sql_or_tokens
+
+
+def _qualified_name(tokens: list, i: int):
+    """_summary_ : reads a [schema.]name reference starting at i
+
+    Returns:
+        tuple: (last name part or None, index after the reference)
+    """
+    name = None
+    while i < len(tokens):
+        token = tokens[i]
+        if token.kind not in ("word", "identifier") or (token.kind == "word" and token.upper in _CLAUSE_WORDS):
+            break
+        name = token.name
+        i += 1
+        if i < len(tokens) and tokens[i].text == ".":
+            i += 1
+            continue
+        break
+    return name, i
+
+
+def _skip_alias(tokens: list, i: int) -> int:
+    """_summary_ : skips an optional "[AS] alias" after a table reference
+    """
+    if i < len(tokens) and tokens[i].upper == "AS":
+        i += 1
+    if i < len(tokens):
+        token = tokens[i]
+        if token.kind == "identifier" or (token.kind == "word" and token.upper not in _CLAUSE_WORDS):
+            i += 1
+    return i
+
+
+def _cte_names(tokens: list) -> set:
+    """_summary_ : names defined by "name [(columns)] AS (" in a WITH clause
+    """
+    names = set()
+    if statement_kind(tokens) != "WITH":
+        return names
+    for i, token in enumerate(tokens[:-1]):
+        if token.upper != "AS" or tokens[i + 1].text != "(" or i == 0:
+            continue
+        j = i - 1
+        if tokens[j].text == ")":
+            # skip the column list
+            depth = 0
+            while j >= 0:
+                if tokens[j].text == ")":
+                    depth += 1
+                elif tokens[j].text == "(":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                j -= 1
+            j -= 1
+        if j >= 0 and tokens[j].kind in ("word", "identifier"):
+            names.add(tokens[j].name)
+    return names
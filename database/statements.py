@@ -0,0 +1,95 @@
+"""_summary_ : A cache of text() constructs keyed by SQL text, so a statement run again
+                (with other bind parameters) reuses its construct and the engine's
+                compiled form instead of being parsed and compiled once per run.
+"""
+
+# import necessary modules
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+
+class StatementCache:
+    """_summary_ : hands out one text() construct per distinct SQL text
+
+        text() scans the SQL for :name parameters every time it is built; a cached
+        construct is built once. Running the same construct also hits the engine's
+        compiled cache and sends the driver identical SQL, so drivers that keep
+        prepared statements per connection (sqlite3, psycopg 3, asyncpg) reuse them,
+        which literals inlined into the text would defeat.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        """_summary_
+
+        Args:
+            max_entries (int, optional): statements kept before the least recently used
+                                         one is evicted. Defaults to 512.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sql: str):
+        """_summary_ : the text() construct of a statement
+
+        Args:
+            sql (str): _description_ (e.g. "SELECT * FROM users WHERE id = :id")
+
+        Returns:
+            TextClause: _description_
+        """
+        with self._lock:
+            statement = self._entries.get(sql)
+            if statement is not None:
+                self._entries.move_to_end(sql)
+                self.hits += 1
+                return statement
+            self.misses += 1
+        # build outside the lock; two threads building the same text is harmless
+        statement = text(sql)
+        with self._lock:
+            self._entries[sql] = statement
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return statement
+
+    def clear(self):
+        """_summary_ : drops every cached statement
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """_summary_ : hit/miss counters and size
+
+        Returns:
+            dict: _description_ (e.g. {"entries": 12, "hits": 30, "misses": 12})
+        """
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def execute(connection, statement, params=None):
+    """_summary_ : executes a statement with no, one or many sets of bind parameters
+
+    Args:
+        connection (Connection | Session): _description_
+        statement (TextClause): _description_ (e.g. StatementCache().get("DELETE FROM users WHERE id = :id"))
+        params (dict | list, optional): one dict of values, or a list of dicts to run the
+                                        statement once per dict (executemany). Defaults to None.
+
+    Returns:
+        CursorResult: _description_
+    """
+    if params is None:
+        return connection.execute(statement)
+    if isinstance(params, dict):
+        return connection.execute(statement, params)
+    params = list(params)
+    if not params:
+        raise ValueError("an empty parameter list runs nothing")
+    return connection.execute(statement, params)
@@ -0,0 +1,150 @@
+"""_summary_ : Chunked, capped consumption of query results
+"""
+
+# import necessary modules
+import sys
+
+from .instrumentation import count_fetched
+from .query_result import describe, fill_types
+
+
+class ResultStream:
+    """_summary_ : wraps an executed (server-side cursor) result and hands its rows
+                    out chunk by chunk, so only one chunk is held in memory at a time.
+
+        Fetching stops once `limit` rows or roughly `memory_budget` bytes have been
+        handed out; `truncated` is then True. The stream is also an iterator of
+        chunks (lists of row tuples) and closes its cursor when exhausted, along with
+        the connection it was given, if any.
+    """
+
+    # rows measured per chunk to estimate its size
+    _SAMPLE_ROWS = 32
+
+    def __init__(self, result, chunk_size: int = 1000, limit: int = None, memory_budget: int = None,
+                 connection=None):
+        """_summary_
+
+        Args:
+            result (CursorResult): the executed result
+            chunk_size (int, optional): rows per chunk. Defaults to 1000.
+            limit (int, optional): maximum rows handed out. Defaults to None (no limit).
+            memory_budget (int, optional): approximate bytes handed out before stopping.
+                                           Defaults to None (no budget).
+            connection (Connection, optional): connection the stream owns and closes with
+                                               its cursor. Defaults to None.
+        """
+        self._result = result
+        self._connection = connection
+        self.chunk_size = chunk_size
+        self.limit = limit
+        self.memory_budget = memory_budget
+        self.returns_rows = result.returns_rows
+        self.columns = list(result.keys()) if self.returns_rows else []
+        # names and types of the columns (ResultColumn objects)
+        self.description = describe(result) if self.returns_rows else []
+        self.rowcount = None if self.returns_rows else result.rowcount
+        self.rows_fetched = 0
+        self.bytes_fetched = 0
+        self.truncated = False
+        self.closed = False
+        self.error = None
+        if not self.returns_rows:
+            self.close()
+
+    def fetch_chunk(self) -> list:
+        """_summary_ : fetches the next chunk of rows
+
+        Returns:
+            list: up to chunk_size row tuples, or [] once the stream is exhausted or closed
+        """
+        if self.closed:
+            return []
+
+        size = self.chunk_size
+        if self.limit is not None:
+            size = min(size, self.limit - self.rows_fetched)
+            if size <= 0:
+                self.truncated = True
+                self.close()
+                return []
+
+        try:
+            chunk = [tuple(row) for row in self._result.fetchmany(size)]
+        except Exception as e:
+            print(f"Fetching rows failed: {str(e)}")
+            self.error = str(e)
+            self.close()
+            return []
+
+        if not chunk:
+            self.close()
+            return []
+
+        if not self.rows_fetched:
+            fill_types(self.description, chunk)
+        count_fetched(self._result, len(chunk))
+        self.rows_fetched += len(chunk)
+        self.bytes_fetched += self._estimate_size(chunk)
+        if self.memory_budget is not None and self.bytes_fetched >= self.memory_budget:
+            self.truncated = True
+            self.close()
+        return chunk
+
+    def close(self):
+        """_summary_ : closes the underlying cursor, discarding any rows not fetched yet,
+                        and returns the stream's own connection to the pool
+        """
+        if not self.closed:
+            self.closed = True
+            try:
+                self._result.close()
+            except Exception as e:
+                print(f"Closing result failed: {str(e)}")
+            if self._connection is not None:
+                try:
+                    self._connection.close()
+                except Exception as e:
+                    print(f"Closing connection failed: {str(e)}")
+                self._connection = None
+
+    def _estimate_size(self, chunk: list) -> int:
+        """_summary_ : approximate in-memory size of a chunk, measured on a sample of rows
+        """
+        return estimate_size(chunk, self._SAMPLE_ROWS)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> list:
+        chunk = self.fetch_chunk()
+        if not chunk:
+            raise StopIteration
+        return chunk
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def estimate_size(rows: list, sample_rows: int = 32) -> int:
+    """_summary_ : approximate in-memory size of a list of row tuples, measured on
+                    its first sample_rows rows
+
+    Args:
+        rows (list): _description_ (e.g. [(1, "John"), (2, "Jane")])
+        sample_rows (int, optional): rows actually measured. Defaults to 32.
+
+    Returns:
+        int: estimated bytes
+    """
+    if not rows:
+        return 0
+    sample = rows[:sample_rows]
+    sample_size = sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row)
+        for row in sample
+    )
+    return sample_size * len(rows) // len(sample)
@@ -0,0 +1,214 @@
+"""_summary_ : Page-by-page browsing of a table with keyset pagination: each page is
+                "rows after the last key seen, ordered by the key, LIMIT n", which an
+                index on the key answers in the same time on page 1 and page 10,000,
+                unlike OFFSET, which reads and discards every row before the page.
+"""
+
+# import necessary modules
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from sqlalchemy import and_, column, or_, select, table
+
+from .importer import column_kind, convert_value
+from .instrumentation import count_fetched
+from .query_result import ResultColumn
+
+
+# key column types a typed-in key value is converted to
+_NUMERIC_TYPES = (int, float, Decimal)
+
+
+class TableBrowser:
+    """_summary_ : pages through a table in key order, prefetching the next page on a
+                    background thread while the current one is shown
+
+        It is a stream like ResultStream (fetch_chunk / closed / description), so the
+        result grid pages it in while scrolling. seek() starts a new browser at a key.
+        With wait=False, fetch_chunk() never blocks: it returns [] while the page is
+        still being read (`loading`), and the caller polls again later, as the query
+        editor does with a running QueryJob.
+    """
+
+    def __init__(self, engine, table_name: str, columns: list, key_columns: list, schema: str = None,
+                 page_size: int = 500, start=None, prefetch: bool = True, wait: bool = True):
+        """_summary_
+
+        Args:
+            engine (Engine): engine the pages are read with (one short connection per page)
+            table_name (str): _description_ (e.g. "users")
+            columns (list): inspector column dicts of the table (e.g. [{"name": "id", "type": INTEGER()}])
+            key_columns (list): primary key (or unique not-null) columns (e.g. ["id"])
+            schema (str, optional): schema of the table. Defaults to None.
+            page_size (int, optional): rows per page. Defaults to 500.
+            start (tuple, optional): key to start at (inclusive) (e.g. (1000,)). Defaults to the first row.
+            prefetch (bool, optional): read the next page in the background. Defaults to True.
+            wait (bool, optional): fetch_chunk() waits for a page still being read. Defaults to True.
+        """
+        self.engine = engine
+        self.table_name = table_name
+        self.schema = schema
+        self.columns = columns
+        self.key_columns = list(key_columns)
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.wait = wait
+        self.start = start
+        names = [col["name"] for col in columns]
+        # names and types of the columns, known before the first page is read
+        self.description = [ResultColumn(col["name"], type=str(col["type"]), nullable=col.get("nullable"))
+                            for col in columns]
+        self._table = table(table_name, *[column(name) for name in names], schema=schema)
+        self._key = [self._table.c[name] for name in self.key_columns]
+        self._key_positions = [names.index(name) for name in self.key_columns]
+        types = {col["name"]: _python_type(col) for col in columns}
+        self._key_types = [types[name] for name in self.key_columns]
+        # what typed-in cell values are converted to (see parse_value)
+        self._kinds = {col["name"]: column_kind(col["type"]) for col in columns}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="table-browser")
+        self.pages_fetched = 0
+        self.rows_fetched = 0
+        self.closed = False
+        self.error = None
+
+        # key of the last row handed out
+        self._after = None
+        # the page being read in the background; its key bound is inclusive for the first page
+        first = self.coerce_key(start) if start is not None else None
+        self._pending = self._executor.submit(self._fetch, first, True)
+
+    @property
+    def loading(self) -> bool:
+        """_summary_ : True while a page is being read in the background
+        """
+        pending = self._pending
+        return pending is not None and not pending.done()
+
+    def fetch_chunk(self) -> list:
+        """_summary_ : the next page (waiting for it if the prefetch hasn't finished,
+                        unless wait is False)
+
+        Returns:
+            list: up to page_size row tuples, or [] once the table is exhausted or closed
+                  (or, with wait=False, while the page is still being read)
+        """
+        if self.closed:
+            return []
+        if not self.wait:
+            if self._pending is None:
+                self._pending = self._executor.submit(self._fetch, self._after, False)
+            if not self._pending.done():
+                return []
+        try:
+            rows = self._pending.result() if self._pending is not None else self._fetch(self._after, False)
+        except Exception as e:
+            print(f"Fetching page failed: {str(e)}")
+            self.error = str(e)
+            self.close()
+            return []
+
+        self._pending = None
+        self.pages_fetched += 1
+        self.rows_fetched += len(rows)
+        if len(rows) < self.page_size:
+            self.close()
+        else:
+            self._after = tuple(rows[-1][i] for i in self._key_positions)
+            if self.prefetch:
+                self._pending = self._executor.submit(self._fetch, self._after, False)
+        return rows
+
+    def key_of(self, row):
+        """_summary_ : the key value of a row, a tuple for a composite key (e.g. 7 or (10, 2))
+        """
+        values = tuple(row[i] for i in self._key_positions)
+        return values[0] if len(values) == 1 else values
+
+    def parse_value(self, name: str, text: str):
+        """_summary_ : text typed into a cell as a value of its column's type
+
+        Args:
+            name (str): _description_ (e.g. "age")
+            text (str): _description_ (e.g. "42"); empty text is NULL
+
+        Returns:
+            _type_: _description_ (e.g. 42); raises ValueError if the text doesn't convert
+        """
+        if text == "":
+            return None
+        return convert_value(self._kinds.get(name, "raw"), text)
+
+    def seek(self, key) -> "TableBrowser":
+        """_summary_ : a new browser over the same table starting at a key (inclusive)
+
+        Args:
+            key (tuple | str): key values, as typed (e.g. ("1000",) or "1000"); converted to the
+                               key columns' types
+
+        Returns:
+            TableBrowser: _description_
+        """
+        return TableBrowser(self.engine, self.table_name, self.columns, self.key_columns, schema=self.schema,
+                            page_size=self.page_size, start=key, prefetch=self.prefetch, wait=self.wait)
+
+    def coerce_key(self, key) -> tuple:
+        """_summary_ : key values converted to the Python types of the key columns
+
+        Args:
+            key (tuple | str): _description_ (e.g. "1000" or ("acme", "42"))
+
+        Returns:
+            tuple: _description_ (e.g. (1000,))
+        """
+        values = (key,) if not isinstance(key, (tuple, list)) else tuple(key)
+        if len(values) != len(self.key_columns):
+            raise ValueError(f"expected {len(self.key_columns)} key values ({', '.join(self.key_columns)})")
+        return tuple(
+            kind(value) if kind is not None and isinstance(value, str) else value
+            for kind, value in zip(self._key_types, values)
+        )
+
+    def close(self):
+        """_summary_ : stops paging and drops a page being prefetched
+        """
+        if not self.closed:
+            self.closed = True
+            if self._pending is not None:
+                self._pending.cancel()
+                self._pending = None
+            self._executor.shutdown(wait=False)
+
+    def _fetch(self, after: tuple, inclusive: bool) -> list:
+        """_summary_ : reads the page of rows after (or from) a key
+        """
+        query = select(self._table).order_by(*self._key).limit(self.page_size)
+        if after is not None:
+            query = query.where(self._keyset_condition(after, inclusive))
+        with self.engine.connect() as connection:
+            result = connection.execute(query)
+            rows = [tuple(row) for row in result]
+        count_fetched(result, len(rows))
+        return rows
+
+    def _keyset_condition(self, values: tuple, inclusive: bool):
+        """_summary_ : the keyset condition (a, b) > (x, y) written out as
+                        a >= x AND (a > x OR (a = x AND b > y)), which every backend
+                        supports and can answer with a range scan of the key's index
+        """
+        alternatives = []
+        for i, (key, value) in enumerate(zip(self._key, values)):
+            last = i == len(self._key) - 1
+            compare = key >= value if last and inclusive else key > value
+            alternatives.append(and_(*[k == v for k, v in zip(self._key[:i], values[:i])], compare))
+        return and_(self._key[0] >= values[0], or_(*alternatives))
+
+
+def _python_type(col: dict):
+    """_summary_ : the type typed-in key values are converted to (numbers only; other
+                    values are bound as strings and converted by the server)
+    """
+    try:
+        kind = col["type"].python_type
+    except (AttributeError, NotImplementedError):
+        return None
+    return kind if kind in _NUMERIC_TYPES else None
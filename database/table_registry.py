@@ -0,0 +1,169 @@
+"""_summary_ : Registry of reflected tables and their reusable DML constructs
+"""
+
+# import necessary modules
+import threading
+
+from sqlalchemy import Table, MetaData, and_, bindparam
+
+
+class TableRegistry:
+    """_summary_ : reflects each table once per connection and keeps the
+                    insert/update/delete constructs built for it.
+
+        Statements are built with bind parameters instead of literal values so
+        the same construct (and SQLAlchemy's compiled form of it) is reused for
+        every row written with the same set of columns.
+    """
+
+    # name of the bind parameter holding the primary key value in update/delete
+    # (the i-th column of a composite key is bound as "_pk_<i>")
+    PK_PARAM = "_pk"
+
+    def __init__(self, engine):
+        """_summary_
+
+        Args:
+            engine (Engine): engine the tables are reflected from
+        """
+        self.engine = engine
+        self.metadata = MetaData()
+        self._statements = {}
+        self._lock = threading.RLock()
+
+    def get(self, table_name: str, bind=None) -> Table:
+        """_summary_ : returns the reflected table, reflecting it on first use
+
+        Args:
+            table_name (str): name of the table (e.g. "users")
+            bind (Connection, optional): connection to reflect with. Defaults to the engine.
+
+        Returns:
+            Table: the reflected table
+        """
+        with self._lock:
+            table = self.metadata.tables.get(table_name)
+            if table is None:
+                table = Table(table_name, self.metadata, autoload_with=bind if bind is not None else self.engine)
+            return table
+
+    def primary_key(self, table_name: str) -> list:
+        """_summary_ : the primary key columns of a table, as reflected from the catalog
+
+            Tables without a primary key are keyed by their "id" column if they have one.
+
+        Args:
+            table_name (str): name of the table (e.g. "users")
+
+        Returns:
+            list: Column objects (e.g. [users.c.id])
+
+        Raises:
+            ValueError: the table has neither a primary key nor an "id" column
+        """
+        table = self.get(table_name)
+        columns = list(table.primary_key.columns)
+        if not columns and "id" in table.c:
+            columns = [table.c.id]
+        if not columns:
+            raise ValueError(f"Table '{table_name}' has no primary key")
+        return columns
+
+    def key_params(self, table_name: str, primary_key) -> dict:
+        """_summary_ : the bind parameters of a primary key value for update()/delete()
+
+        Args:
+            table_name (str): name of the table (e.g. "order_items")
+            primary_key: the key value, a tuple for a composite key (e.g. 1 or (10, 2))
+
+        Returns:
+            dict: _description_ (e.g. {"_pk": 1} or {"_pk_0": 10, "_pk_1": 2})
+        """
+        columns = self.primary_key(table_name)
+        if len(columns) == 1:
+            value = primary_key[0] if isinstance(primary_key, (tuple, list)) else primary_key
+            return {self.PK_PARAM: value}
+        if not isinstance(primary_key, (tuple, list)) or len(primary_key) != len(columns):
+            raise ValueError(f"Table '{table_name}' has a {len(columns)} column primary key "
+                             f"({', '.join(column.name for column in columns)})")
+        return {f"{self.PK_PARAM}_{i}": value for i, value in enumerate(primary_key)}
+
+    def insert(self, table_name: str, columns):
+        """_summary_ : INSERT construct for the given column set
+
+        Args:
+            table_name (str): name of the table (e.g. "users")
+            columns (iterable): names of the columns being written (e.g. ["name", "age"])
+
+        Returns:
+            Insert: construct to execute with a dict of values
+        """
+        return self._statement("insert", table_name, columns)
+
+    def update(self, table_name: str, columns):
+        """_summary_ : UPDATE ... WHERE <primary key> = :_pk construct for the given column set
+
+        Args:
+            table_name (str): name of the table (e.g. "users")
+            columns (iterable): names of the columns being written
+
+        Returns:
+            Update: construct to execute with a dict of values plus key_params()
+        """
+        return self._statement("update", table_name, columns)
+
+    def delete(self, table_name: str):
+        """_summary_ : DELETE ... WHERE <primary key> = :_pk construct
+
+        Args:
+            table_name (str): name of the table (e.g. "users")
+
+        Returns:
+            Delete: construct to execute with key_params()
+        """
+        return self._statement("delete", table_name, ())
+
+    def invalidate(self, table_name: str = None):
+        """_summary_ : forgets a reflected table and its statements
+
+        Args:
+            table_name (str, optional): table that changed. When None, everything is dropped.
+        """
+        with self._lock:
+            if table_name is None:
+                self.metadata.clear()
+                self._statements.clear()
+                return
+            table = self.metadata.tables.get(table_name)
+            if table is not None:
+                self.metadata.remove(table)
+            for key in [k for k in self._statements if k[1] == table_name]:
+                del self._statements[key]
+
+    def _key_condition(self, table_name: str):
+        """_summary_ : <primary key> = :_pk, or col_0 = :_pk_0 AND col_1 = :_pk_1 ...
+        """
+        columns = self.primary_key(table_name)
+        if len(columns) == 1:
+            return columns[0] == bindparam(self.PK_PARAM)
+        return and_(*[column == bindparam(f"{self.PK_PARAM}_{i}") for i, column in enumerate(columns)])
+
+    def _statement(self, kind: str, table_name: str, columns):
+        """_summary_ : builds or returns the cached construct for (kind, table, columns)
+        """
+        key = (kind, table_name, tuple(sorted(columns)))
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is not None:
+                return statement
+
+            table = self.get(table_name)
+            values = {name: bindparam(name) for name in key[2]}
+            if kind == "insert":
+                statement = table.insert().values(values)
+            elif kind == "update":
+                statement = table.update().where(self._key_condition(table_name)).values(values)
+            else:
+                statement = table.delete().where(self._key_condition(table_name))
+            self._statements[key] = statement
+            return statement
@@ -0,0 +1,68 @@
+"""_summary_ : Background preloading of the modules the first connection and query
+                need (SQLAlchemy, the DatabaseManager, dialects and DBAPI drivers), so
+                they are imported while the user is still looking at the empty window.
+"""
+
+# import necessary modules
+import importlib
+import importlib.util
+import sys
+import time
+
+
+# imported by every connection
+CORE_MODULES = ("sqlalchemy", "sqlalchemy.orm", "database.database_manager")
+
+# backend -> (SQLAlchemy dialect module, DBAPI module) of the driver DatabaseManager.connect()
+# injects into urls without one, most commonly used first
+DRIVER_MODULES = {
+    "sqlite": ("sqlalchemy.dialects.sqlite.pysqlite", "sqlite3"),
+    "postgresql": ("sqlalchemy.dialects.postgresql.psycopg2", "psycopg2"),
+    "mysql": ("sqlalchemy.dialects.mysql.pymysql", "pymysql"),
+    "mssql": ("sqlalchemy.dialects.mssql.pyodbc", "pyodbc"),
+    "oracle": ("sqlalchemy.dialects.oracle.cx_oracle", "cx_Oracle"),
+}
+
+
+def is_installed(module: str) -> bool:
+    """_summary_ : True if a module can be imported (only its top-level package is looked up)
+    """
+    try:
+        return importlib.util.find_spec(module.split(".")[0]) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def preload(modules: tuple = (), drivers: list = None) -> dict:
+    """_summary_ : imports the core modules, the given modules and the installed drivers
+
+        Meant to run on a background thread after the first window is shown; anything
+        not installed is skipped, and a module the UI imports meanwhile is simply
+        waited for by Python's import lock.
+
+    Args:
+        modules (tuple, optional): extra modules (e.g. ("app.views.querytxt",)). Defaults to ().
+        drivers (list, optional): backends to preload (e.g. ["postgresql"]). Defaults to every one.
+
+    Returns:
+        dict: _description_ (e.g. {"sqlalchemy": 0.081, "sqlalchemy.dialects.postgresql.psycopg2": 0.012})
+              seconds spent importing each module that wasn't loaded yet
+    """
+    names = list(CORE_MODULES) + list(modules)
+    for backend in drivers if drivers is not None else DRIVER_MODULES:
+        dialect, dbapi = DRIVER_MODULES[backend]
+        if is_installed(dbapi):
+            names.extend((dbapi, dialect))
+
+    timings = {}
+    for name in names:
+        if name in sys.modules or not is_installed(name):
+            continue
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Preloading {name} failed: {str(e)}")
+            continue
+        timings[name] = time.perf_counter() - start
+    return timings
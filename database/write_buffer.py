@@ -0,0 +1,233 @@
+"""_summary_ : Queue of row edits (e.g. from the result grid) that coalesces edits of
+                the same row and writes them in a single transaction once enough are
+                queued or the oldest has waited long enough.
+"""
+
+# import necessary modules
+import threading
+import time
+
+
+class WriteBuffer:
+    """_summary_ : collects inserts, updates and deletes and flushes them together
+
+        Edits of the same row are merged before anything is written: two updates
+        become one with both sets of values, and an update followed by a delete is
+        just the delete. At flush time updates setting the same values are sent as
+        one update_many() and deletes as one delete_many() per table, all inside one
+        DatabaseManager.transaction(). If the flush fails nothing is written (the
+        transaction rolls back) and the edits are queued again, ahead of any edit
+        made since, for the next flush or discard().
+
+        flush() runs on the calling thread; attach() runs the time based flushes
+        from a Tk widget's main loop, which is the thread that uses the manager's
+        session.
+    """
+
+    # milliseconds between checks for a due flush in attach()
+    POLL_INTERVAL = 250
+
+    def __init__(self, db_manager, connection_name: str = None, max_size: int = 100,
+                 max_delay: float = 2.0, on_flush=None):
+        """_summary_
+
+        Args:
+            db_manager (DatabaseManager): manager the edits are written through
+            connection_name (str, optional): connection they belong to. Defaults to the active one.
+            max_size (int, optional): queued edits that trigger a flush. Defaults to 100.
+            max_delay (float, optional): seconds an edit waits at most before a flush. Defaults to 2.0.
+            on_flush (callable, optional): called with (written, error) after each flush;
+                                           error is None on success. Defaults to None.
+        """
+        self.db_manager = db_manager
+        self.connection_name = connection_name
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.on_flush = on_flush
+        self._lock = threading.Lock()
+        # (table, data) rows to insert, in order
+        self._inserts = []
+        # (table, key) -> ("update", values) or ("delete", None)
+        self._changes = {}
+        # time the oldest queued edit was made (None when nothing is queued)
+        self._oldest = None
+        self._after_id = None
+        self.flushes = 0
+        self.written = 0
+        self.coalesced = 0
+        self.last_error = None
+
+    @property
+    def pending(self) -> int:
+        """_summary_ : edits waiting to be written (after coalescing)
+        """
+        return len(self._inserts) + len(self._changes)
+
+    @property
+    def due(self) -> bool:
+        """_summary_ : True once the oldest queued edit has waited max_delay seconds
+        """
+        return self._oldest is not None and time.monotonic() - self._oldest >= self.max_delay
+
+    def insert(self, table_name: str, data: dict):
+        """_summary_ : queues a new row (e.g. insert("users", {"name": "Jane"}))
+        """
+        with self._lock:
+            self._inserts.append((table_name, dict(data)))
+            self._queued()
+        self._flush_if_full()
+
+    def update(self, table_name: str, key, data: dict):
+        """_summary_ : queues new values for the row with a primary key value
+
+        Args:
+            table_name (str): _description_ (e.g. "users")
+            key: primary key value, a tuple for a composite key (e.g. 7 or (10, 2))
+            data (dict): _description_ (e.g. {"name": "Jane"})
+        """
+        with self._lock:
+            self._merge(table_name, key, "update", dict(data))
+            self._queued()
+        self._flush_if_full()
+
+    def delete(self, table_name: str, key):
+        """_summary_ : queues the deletion of the row with a primary key value
+        """
+        with self._lock:
+            self._merge(table_name, key, "delete", None)
+            self._queued()
+        self._flush_if_full()
+
+    def flush(self) -> bool:
+        """_summary_ : writes every queued edit in one transaction
+
+        Returns:
+            bool: True if everything was written (or nothing was queued)
+        """
+        with self._lock:
+            inserts, changes = self._inserts, self._changes
+            self._inserts, self._changes, self._oldest = [], {}, None
+        if not inserts and not changes:
+            return True
+
+        db = self.db_manager
+        written = len(inserts) + len(changes)
+        try:
+            with db.using(self.connection_name), db.transaction():
+                self._write(db, inserts, changes)
+        except Exception as e:
+            with self._lock:
+                # put the edits back ahead of anything queued meanwhile
+                newer_inserts, newer_changes = self._inserts, self._changes
+                self._inserts, self._changes = inserts, changes
+                for (table_name, key), (kind, values) in newer_changes.items():
+                    self._merge(table_name, key, kind, values)
+                self._inserts.extend(newer_inserts)
+                # wait a full max_delay before the next time based attempt
+                self._oldest = time.monotonic()
+            self.last_error = str(e)
+            print(f"Flushing edits failed: {str(e)}")
+            if self.on_flush is not None:
+                self.on_flush(0, self.last_error)
+            return False
+
+        self.flushes += 1
+        self.written += written
+        self.last_error = None
+        if self.on_flush is not None:
+            self.on_flush(written, None)
+        return True
+
+    def flush_if_due(self) -> bool:
+        """_summary_ : flushes if the oldest edit has waited max_delay seconds
+
+        Returns:
+            bool: False only if a flush ran and failed
+        """
+        return self.flush() if self.due else True
+
+    def discard(self) -> int:
+        """_summary_ : drops every queued edit without writing it
+
+        Returns:
+            int: edits dropped
+        """
+        with self._lock:
+            dropped = self.pending
+            self._inserts, self._changes, self._oldest = [], {}, None
+        return dropped
+
+    def attach(self, widget, interval: int = None):
+        """_summary_ : runs flush_if_due() from a Tk widget's main loop
+
+        Args:
+            widget (tk.Misc): any widget of the Tk application
+            interval (int, optional): milliseconds between checks. Defaults to POLL_INTERVAL.
+        """
+        interval = interval or self.POLL_INTERVAL
+
+        def poll():
+            self.flush_if_due()
+            self._after_id = widget.after(interval, poll)
+
+        self.detach(widget)
+        self._after_id = widget.after(interval, poll)
+
+    def detach(self, widget):
+        """_summary_ : stops the checks started by attach()
+        """
+        if self._after_id is not None:
+            widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _queued(self):
+        if self._oldest is None:
+            self._oldest = time.monotonic()
+
+    def _flush_if_full(self):
+        if self.pending >= self.max_size:
+            self.flush()
+
+    def _merge(self, table_name: str, key, kind: str, values: dict):
+        """_summary_ : folds an edit into the queued edit of the same row
+        """
+        row = (table_name, key)
+        queued = self._changes.get(row)
+        if queued is not None:
+            self.coalesced += 1
+            queued_kind, queued_values = queued
+            if queued_kind == "delete":
+                # the row is going away; later edits of it can't apply
+                return
+            if kind == "update":
+                values = dict(queued_values, **values)
+            # a move to the end keeps the queue in the order rows were last edited
+            del self._changes[row]
+        self._changes[row] = (kind, values)
+
+    def _write(self, db, inserts: list, changes: dict):
+        """_summary_ : the statements of one flush, inside the open transaction
+        """
+        by_table = {}
+        for table_name, data in inserts:
+            by_table.setdefault((table_name, tuple(data)), []).append(data)
+        for (table_name, _), rows in by_table.items():
+            db.insert_many(table_name, rows)
+
+        updates = {}
+        deletes = {}
+        for (table_name, key), (kind, values) in changes.items():
+            if kind == "delete":
+                deletes.setdefault(table_name, []).append(key)
+                continue
+            try:
+                group = (table_name, tuple(sorted(values.items())))
+                hash(group)
+            except TypeError:
+                # unhashable values (e.g. lists for array columns) are written row by row
+                group = (table_name, id(values))
+            updates.setdefault(group, (values, []))[1].append(key)
+        for (table_name, _), (values, keys) in updates.items():
+            db.update_many(table_name, values, keys=keys)
+        for table_name, keys in deletes.items():
+            db.delete_many(table_name, keys=keys)
@@ -1,6 +1,11 @@
+import time
+
+# taken before the app is imported, so the startup timings include the imports
+started = time.perf_counter()
+
 from app.manager import AppManager
 
 if __name__ == "__main__":
-    root = AppManager()
+    root = AppManager(started=started)
     root.title("Py-Db")
     root.mainloop()
@@ -0,0 +1,156 @@
+"""_summary_ : AsyncDatabaseManager against SQLite through aiosqlite
+"""
+
+# import necessary modules
+import asyncio
+
+import pytest
+
+from database.async_manager import AsyncDatabaseManager
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def connected(path) -> AsyncDatabaseManager:
+    db = AsyncDatabaseManager()
+    assert await db.connect(f"sqlite:///{path}")
+    assert db.active.url.startswith("sqlite+aiosqlite://")
+    await db.execute_query("CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)")
+    return db
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "people.db"
+
+
+# ---------------------------------------------------------------------------- #
+#                                     CRUD                                     #
+# ---------------------------------------------------------------------------- #
+def test_insert_update_delete(db_path):
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            assert await db.insert_record("people", {"id": 1, "name": "John", "age": 25})
+            assert await db.insert_record("people", {"id": 2, "name": "Jane", "age": 31})
+            assert await db.update_record("people", 1, {"age": 26})
+            assert await db.delete_record("people", 2)
+            result = await db.execute_query("SELECT id, name, age FROM people ORDER BY id")
+            return [tuple(row) for row in result]
+        finally:
+            await db.close_all()
+
+    assert run(scenario()) == [(1, "John", 26)]
+
+
+def test_failed_insert_returns_false(db_path):
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            assert await db.insert_record("people", {"id": 1, "name": "John"})
+            return await db.insert_record("people", {"id": 1, "name": "Duplicate"})
+        finally:
+            await db.close_all()
+
+    assert run(scenario()) is False
+
+
+def test_concurrent_first_use_of_a_table(db_path):
+    # every insert reaches the not yet reflected table at the same time
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            results = await asyncio.gather(*[
+                db.insert_record("people", {"id": i, "name": f"user_{i}", "age": i}) for i in range(20)
+            ])
+            count = await db.execute_query("SELECT COUNT(*) FROM people")
+            return results, count[0][0]
+        finally:
+            await db.close_all()
+
+    results, count = run(scenario())
+    assert results == [True] * 20
+    assert count == 20
+
+
+# ---------------------------------------------------------------------------- #
+#                                    Queries                                   #
+# ---------------------------------------------------------------------------- #
+def test_execute_query_params(db_path):
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            rows = [{"id": i, "name": f"user_{i}", "age": 20 + i} for i in range(5)]
+            assert await db.execute_query("INSERT INTO people (id, name, age) VALUES (:id, :name, :age)",
+                                          rows) is None
+            result = await db.execute_query("SELECT name FROM people WHERE age >= :age ORDER BY id",
+                                            {"age": 23})
+            return result.columns, [tuple(row) for row in result]
+        finally:
+            await db.close_all()
+
+    columns, rows = run(scenario())
+    assert columns == ["name"]
+    assert rows == [("user_3",), ("user_4",)]
+
+
+def test_execute_query_error_returns_none(db_path):
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            return await db.execute_query("SELECT * FROM missing")
+        finally:
+            await db.close_all()
+
+    assert run(scenario()) is None
+
+
+def test_concurrent_schema_lookups(db_path):
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            return await asyncio.gather(*[db.get_columns("people") for _ in range(10)],
+                                        db.get_table_names())
+        finally:
+            await db.close_all()
+
+    *columns, tables = run(scenario())
+    assert tables == ["people"]
+    for found in columns:
+        assert [column["name"] for column in found] == ["id", "name", "age"]
+
+
+def test_ddl_refreshes_the_schema(db_path):
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            assert await db.get_table_names() == ["people"]
+            assert await db.insert_record("people", {"id": 1, "name": "John", "age": 25})
+            await db.execute_query("CREATE TABLE pets (id INTEGER PRIMARY KEY, name TEXT)")
+            await db.execute_query("ALTER TABLE people ADD COLUMN email TEXT")
+            inserted = await db.insert_record("people", {"id": 2, "name": "Jane", "age": 31, "email": "j@x.io"})
+            return await db.get_table_names(), inserted
+        finally:
+            await db.close_all()
+
+    tables, inserted = run(scenario())
+    assert tables == ["people", "pets"]
+    assert inserted
+
+
+def test_refresh_during_a_lookup_is_not_undone(db_path):
+    # the listing loading while the table is created must not be cached over the refresh
+    async def scenario():
+        db = await connected(db_path)
+        try:
+            loading = asyncio.ensure_future(db.get_table_names())
+            await asyncio.sleep(0)
+            await db.execute_query("CREATE TABLE pets (id INTEGER PRIMARY KEY, name TEXT)")
+            await loading
+            return await db.get_table_names()
+        finally:
+            await db.close_all()
+
+    assert run(scenario()) == ["people", "pets"]
@@ -0,0 +1,75 @@
+"""_summary_ : DatabaseManager.import_file and the CSV parsing behind it
+"""
+
+# import necessary modules
+import pytest
+
+from database import bulk, importer
+from database.database_manager import DatabaseManager
+
+
+# a CSV with a line that isn't UTF-8 and a record with a quoted line break
+ROWS = [
+    b"id,name\n",
+    b"1,alpha\n",
+    b"2,\xff\xfe broken\n",
+    b'3,"multi\nline"\n',
+    b"4,delta\n",
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_bytes(b"".join(ROWS))
+    return path
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = DatabaseManager()
+    assert db.connect(f"sqlite:///{tmp_path / 'people.db'}")
+    assert db.create_table("people", [("id", "Integer", "primary_key"), ("name", "String", "nullable")])
+    yield db
+    db.disconnect()
+
+
+def offset_of(index: int) -> int:
+    return sum(len(row) for row in ROWS[:index])
+
+
+def test_sequential_offsets_skip_a_line_that_is_not_utf8(csv_path):
+    sample = importer.read_sample(str(csv_path), "csv")
+    assert sample.multiline
+    fields = [(0, "id", "int"), (1, "name", "str")]
+    chunks = list(importer.parse_file(str(csv_path), "csv", fields, sample.data_start, sample.dialect,
+                                      multiline=True, chunk_bytes=1))
+
+    assert [chunk.end for chunk in chunks] == [offset_of(i) for i in range(2, len(ROWS) + 1)]
+    assert [offset for chunk in chunks for offset in chunk.offsets] == [offset_of(1), offset_of(3), offset_of(4)]
+    assert [offset for chunk in chunks for offset, _, _ in chunk.bad] == [offset_of(2)]
+
+
+def test_resume_after_a_crash_inserts_every_row_once(csv_path, db, monkeypatch):
+    saved = []
+    save_import_state = bulk.save_import_state
+
+    def crash_on_third_chunk(*args):
+        saved.append(args)
+        if len(saved) == 3:
+            raise RuntimeError("crashed")
+        save_import_state(*args)
+
+    monkeypatch.setattr(bulk, "save_import_state", crash_on_third_chunk)
+    report = db.import_file(str(csv_path), "people", workers=1, chunk_bytes=1)
+    assert not report.finished
+    assert report.bytes_done == offset_of(3)
+
+    monkeypatch.setattr(bulk, "save_import_state", save_import_state)
+    report = db.import_file(str(csv_path), "people", workers=1, chunk_bytes=1)
+    assert report.finished
+    assert report.resumed_from == offset_of(3)
+    assert (report.inserted, report.failed) == (3, 1)
+    rows = db.execute_query("SELECT id, name FROM people ORDER BY id")
+    assert [tuple(row) for row in rows] == [(1, "alpha"), (3, "multi\nline"), (4, "delta")]
+    assert (csv_path.parent / "people.rejected.csv").read_bytes().count(b"broken") == 1